@@ -1,7 +1,11 @@
 
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, session
 import os
-from rdbms.pydb import Database
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from rdbms.pydb import Database, Session, SessionPool
 from rdbms.executor import Executor
 
 app = Flask(__name__)
@@ -32,18 +36,98 @@ except Exception as e:
     # print(f"Init Error: {e}")
     pass
 
+# Items per inventory page
+PAGE_SIZE = 50
+
+# Each request runs on a pooled session of its own (transaction state and prepared
+# statements), so requests can be served from several threads at once
+pool = SessionPool(db, size=8)
+
+# The query console instead keeps one session per browser session, so a BEGIN,
+# the statements after it and the COMMIT or ROLLBACK share one transaction. An
+# open transaction's snapshot keeps old row versions and pins the tables it read,
+# so consoles idle for CONSOLE_IDLE_SECONDS are dropped, rolling back what they
+# left open; so is the least recently used beyond MAX_CONSOLES.
+MAX_CONSOLES = 32
+CONSOLE_IDLE_SECONDS = 300
+
+class Console:
+    """A browser's console session; `with console:` uses it one request at a time."""
+
+    def __init__(self):
+        self.conn: Session = db.connect()
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+    def __enter__(self) -> Session:
+        self.lock.acquire()
+        return self.conn
+
+    def __exit__(self, *exc):
+        self.last_used = time.monotonic()
+        self.lock.release()
+
+    def close(self):
+        with self:
+            self.conn.reset()
+
+consoles: "OrderedDict[str, Console]" = OrderedDict()
+consoles_lock = threading.Lock()
+
+def console_session() -> Console:
+    """This browser's console, created on its first use."""
+    key = session.get('console')
+    if key is None:
+        key = session['console'] = uuid.uuid4().hex
+    dropped = []
+    with consoles_lock:
+        console = consoles.get(key)
+        if console is None:
+            console = consoles[key] = Console()
+            while len(consoles) > MAX_CONSOLES:
+                dropped.append(consoles.popitem(last=False)[1])
+        consoles.move_to_end(key)
+        console.last_used = time.monotonic()
+    for old in dropped:
+        old.close()
+    return console
+
+@app.before_request
+def drop_idle_consoles():
+    now = time.monotonic()
+    with consoles_lock:
+        idle = [key for key, console in consoles.items() if now - console.last_used > CONSOLE_IDLE_SECONDS]
+        dropped = [consoles.pop(key) for key in idle]
+    for console in dropped:
+        console.close()
+
+# Statements run on every request: each session parses them once; values are bound, not formatted into SQL
+LIST_ITEMS = """
+    SELECT inventory.id, inventory.name, inventory.price, inventory.quantity, inventory.restocked, categories.name 
+    FROM inventory 
+    LEFT JOIN categories ON inventory.category_id = categories.id
+    LIMIT ? OFFSET ?
+"""
+MAX_ITEM_ID = "SELECT MAX(id) FROM inventory"
+INSERT_ITEM = "INSERT INTO inventory VALUES (?, ?, ?, ?, ?, ?)"
+UPDATE_ITEM = ("UPDATE inventory SET name = :name, price = :price, quantity = :quantity, "
+               "restocked = :restocked, category_id = :category_id WHERE id = :id")
+GET_ITEM = "SELECT * FROM inventory WHERE id = ?"
+DELETE_ITEM = "DELETE FROM inventory WHERE id = ?"
+LIST_CATEGORIES = "SELECT * FROM categories"
+
 @app.route('/')
 def index():
     # Fetch inventory with JOIN to get Category Name
     items = []
+    page = max(request.args.get('page', 1, type=int), 1)
+    has_next = False
     try:
-        # JOIN Query
-        sql = """
-        SELECT inventory.id, inventory.name, inventory.price, inventory.quantity, inventory.restocked, categories.name 
-        FROM inventory 
-        LEFT JOIN categories ON inventory.category_id = categories.id
-        """
-        raw_data = db.query(sql)
+        # JOIN Query, one page at a time (one extra row tells us if there is a next page)
+        with pool.session() as conn:
+            raw_data = conn.prepare(LIST_ITEMS).query((PAGE_SIZE + 1, (page - 1) * PAGE_SIZE))
+        has_next = len(raw_data) > PAGE_SIZE
+        raw_data = raw_data[:PAGE_SIZE]
         # Map list to dict for template
         for row in raw_data:
              items.append({
@@ -57,7 +141,7 @@ def index():
     except Exception as e:
         flash(f"Error loading inventory: {e}", "danger")
     
-    return render_template('inventory_list.html', items=items)
+    return render_template('inventory_list.html', items=items, page=page, has_next=has_next)
 
 @app.route('/add', methods=['GET', 'POST'])
 def add_item():
@@ -69,15 +153,13 @@ def add_item():
             date = request.form['restocked']
             cat_id = request.form['category_id']
             
-            # Simple ID generation: max + 1
-            existing = db.query("SELECT id FROM inventory")
-            new_id = 1
-            if existing:
-                ids = [r[0] for r in existing]
-                new_id = max(ids) + 1
-            
-            sql = f"INSERT INTO inventory VALUES ({new_id}, '{name}', {price}, {qty}, '{date}', {cat_id})"
-            db.execute(sql)
+            with pool.session() as conn:
+                # Simple ID generation: max + 1, computed by the engine. A concurrent
+                # add taking the same id fails on the primary key and is reported.
+                max_id = conn.prepare(MAX_ITEM_ID).query()[0][0]
+                new_id = 1 if max_id is None else max_id + 1
+                
+                conn.prepare(INSERT_ITEM).execute((new_id, name, price, qty, date, cat_id))
             flash("Item added successfully!", "success")
             return redirect(url_for('index'))
         except Exception as e:
@@ -86,7 +168,8 @@ def add_item():
     # Load categories for dropdown
     categories = []
     try:
-        categories = db.query("SELECT * FROM categories")
+        with pool.session() as conn:
+            categories = conn.prepare(LIST_CATEGORIES).query()
     except:
         pass
     return render_template('add_item.html', categories=categories)
@@ -102,8 +185,9 @@ def edit_item(item_id):
             cat_id = request.form['category_id']
             
             # Update Query
-            sql = f"UPDATE inventory SET name='{name}', price={price}, quantity={qty}, restocked='{date}', category_id={cat_id} WHERE id={item_id}"
-            db.execute(sql)
+            with pool.session() as conn:
+                conn.prepare(UPDATE_ITEM).execute({'name': name, 'price': price, 'quantity': qty, 'restocked': date,
+                                                   'category_id': cat_id, 'id': item_id})
             
             flash("Item updated successfully!", "success")
             return redirect(url_for('index'))
@@ -114,7 +198,8 @@ def edit_item(item_id):
     item = {}
     try:
         # We need raw category_id here
-        raw = db.query(f"SELECT * FROM inventory WHERE id={item_id}")
+        with pool.session() as conn:
+            raw = conn.prepare(GET_ITEM).query((item_id,))
         if raw:
             r = raw[0]
             item = {
@@ -131,7 +216,8 @@ def edit_item(item_id):
     # Categories for dropdown
     categories = []
     try:
-         categories = db.query("SELECT * FROM categories")
+         with pool.session() as conn:
+             categories = conn.prepare(LIST_CATEGORIES).query()
     except:
          pass
          
@@ -140,12 +226,16 @@ def edit_item(item_id):
 @app.route('/delete/<int:item_id>', methods=['POST'])
 def delete_item(item_id):
     try:
-        db.execute(f"DELETE FROM inventory WHERE id = {item_id}")
+        with pool.session() as conn:
+            conn.prepare(DELETE_ITEM).execute((item_id,))
         flash("Item deleted.", "success")
     except Exception as e:
         flash(f"Error deleting: {e}", "danger")
     return redirect(url_for('index'))
 
+# Rows shown by the query console
+QUERY_ROW_LIMIT = 500
+
 @app.route('/query', methods=['GET', 'POST'])
 def query_interface():
     result = None
@@ -160,7 +250,16 @@ def query_interface():
             sql = request.form['sql']
             
         try:
-            result = db.execute(sql)
+            # Stream the result so a SELECT on a large table only reads what is shown.
+            # A transaction begun here stays open for the next request from this browser.
+            with console_session() as conn:
+                cursor = conn.cursor(sql)
+                if cursor.status is not None:
+                    result = cursor.status
+                else:
+                    result = cursor.fetchmany(QUERY_ROW_LIMIT)
+                    if cursor.fetchone() is not None:
+                        flash(f"Showing the first {QUERY_ROW_LIMIT} rows.", "warning")
             if quick:
                  flash(f"Executed: {quick}", "success")
         except Exception as e:
@@ -0,0 +1,112 @@
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+class _Count:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def add(self, value):
+        if value is not None:
+            self.value += 1
+
+    def result(self):
+        return self.value
+
+
+class _Sum:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = None
+
+    def add(self, value):
+        if value is not None:
+            self.value = value if self.value is None else self.value + value
+
+    def result(self):
+        return self.value
+
+
+class _Min:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = None
+
+    def add(self, value):
+        if value is not None and (self.value is None or value < self.value):
+            self.value = value
+
+    def result(self):
+        return self.value
+
+
+class _Max:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = None
+
+    def add(self, value):
+        if value is not None and (self.value is None or value > self.value):
+            self.value = value
+
+    def result(self):
+        return self.value
+
+
+class _Avg:
+    __slots__ = ('total', 'count')
+
+    def __init__(self):
+        self.total = 0
+        self.count = 0
+
+    def add(self, value):
+        if value is not None:
+            self.total += value
+            self.count += 1
+
+    def result(self):
+        return self.total / self.count if self.count else None
+
+
+class AggregateExecutor:
+    """
+    Executes aggregate functions, optionally per GROUP BY group, in a single
+    pass over the input with a hash table from group key to accumulators.
+
+    Semantics follow SQL: every function but COUNT(*) ignores NULLs, and
+    returns NULL (COUNT: 0) for a group with no non-NULL values. NULL group
+    values form one group. Without GROUP BY there is exactly one result row,
+    even for an empty input. Groups come out in first-seen order.
+    """
+
+    ACCUMULATORS = {'COUNT': _Count, 'SUM': _Sum, 'MIN': _Min, 'MAX': _Max, 'AVG': _Avg}
+    # Functions that only make sense on numbers
+    NUMERIC = ('SUM', 'AVG')
+
+    @staticmethod
+    def aggregate(rows: Iterable[tuple], group_keys: List[int],
+                  aggregates: List[Tuple[str, Optional[int]]]) -> Iterator[Tuple[tuple, List[Any]]]:
+        """
+        Yields (group values, aggregate results) per group. `group_keys` and
+        the aggregates' keys are row positions; a key of None stands for '*'
+        (every row counts).
+        """
+        accumulators = AggregateExecutor.ACCUMULATORS
+        groups: Dict[tuple, list] = {}
+        if not group_keys:
+            groups[()] = [accumulators[func]() for func, _ in aggregates]
+
+        for row in rows:
+            group = tuple(row[k] for k in group_keys)
+            state = groups.get(group)
+            if state is None:
+                state = groups[group] = [accumulators[func]() for func, _ in aggregates]
+            for acc, (_, key) in zip(state, aggregates):
+                acc.add(True if key is None else row[key])
+
+        for group, state in groups.items():
+            yield group, [acc.result() for acc in state]
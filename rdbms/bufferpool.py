@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Iterable, Optional, Tuple
+
+class BufferPool:
+    """
+    LRU cache of loaded tables, bounded by an estimated memory budget.
+
+    A table's cost is estimated from the size of its file on disk. Tables for
+    which `pinned(name)` is true hold changes that only exist in memory and
+    the log, so they are never evicted; they become evictable once a
+    checkpoint has written them out. `on_evict(name)` lets the storage engine
+    drop anything else it keeps for the table.
+    """
+
+    def __init__(self, capacity_bytes: int, pinned: Callable[[str], bool],
+                 on_evict: Optional[Callable[[str], None]] = None):
+        self.capacity = capacity_bytes
+        self.pinned = pinned
+        self.on_evict = on_evict
+        self.entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self.used = 0
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached table (marking it recently used) and counts a hit or miss."""
+        with self.lock:
+            entry = self.entries.get(table_name)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(table_name)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def peek(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """Like get() but without touching LRU order or the counters."""
+        entry = self.entries.get(table_name)
+        return entry[0] if entry is not None else None
+
+    def put(self, table_name: str, data: Dict[str, Any], size: int):
+        with self.lock:
+            old = self.entries.pop(table_name, None)
+            if old is not None:
+                self.used -= old[1]
+            self.entries[table_name] = (data, size)
+            self.used += size
+            self._evict()
+
+    def resize(self, table_name: str, size: int):
+        with self.lock:
+            entry = self.entries.get(table_name)
+            if entry is not None:
+                self.used += size - entry[1]
+                self.entries[table_name] = (entry[0], size)
+            self._evict()
+
+    def invalidate(self, table_name: str):
+        with self.lock:
+            entry = self.entries.pop(table_name, None)
+            if entry is not None:
+                self.used -= entry[1]
+
+    def _evict(self):
+        # Least recently used first; the most recent entry always stays
+        for name in list(self.entries)[:-1]:
+            if self.used <= self.capacity:
+                break
+            if self.pinned(name):
+                continue
+            _, size = self.entries.pop(name)
+            self.used -= size
+            self.stats['evictions'] += 1
+            if self.on_evict is not None:
+                self.on_evict(name)
+
+    def reclaimable(self, names: Iterable[str]) -> bool:
+        """
+        True if the pool is over budget and unpinning `names` would let
+        eviction free memory: one of them is cached and not the most recent
+        entry, which always stays.
+        """
+        with self.lock:
+            if self.used <= self.capacity or len(self.entries) < 2:
+                return False
+            mru = next(reversed(self.entries))
+            return any(name != mru and name in self.entries for name in names)
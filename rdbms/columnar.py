@@ -0,0 +1,209 @@
+import bisect
+from typing import Dict, Any, List, Optional, Tuple
+from rdbms.predicates import PredicateCompiler, ColumnMap
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without NumPy every query takes the row-at-a-time path
+    np = None
+
+
+class Column:
+    """
+    One column as a typed array plus a NULL mask. INTEGER -> int64,
+    BOOLEAN -> bool, DATE -> datetime64[D]; VARCHAR is dictionary-encoded:
+    `values` holds int32 codes into the sorted `dictionary`, so comparing
+    codes orders the same way as comparing the strings.
+    """
+    __slots__ = ('type', 'values', 'nulls', 'dictionary')
+
+    def __init__(self, col_type: str, values, nulls, dictionary: Optional[List[str]] = None):
+        self.type = col_type
+        self.values = values
+        self.nulls = nulls
+        self.dictionary = dictionary
+
+    def encode(self, literal: Any) -> Tuple[Any, bool]:
+        """
+        Returns (array-comparable form of literal, exact). For VARCHAR a
+        literal missing from the dictionary maps to the code it would sort at,
+        which is right for ranges but matches nothing for '='.
+        """
+        if self.dictionary is not None:
+            i = bisect.bisect_left(self.dictionary, literal)
+            return i, i < len(self.dictionary) and self.dictionary[i] == literal
+        if self.type == 'DATE':
+            date = np.datetime64(literal, 'D')
+            if str(date) != literal:
+                # Rows compare dates as strings, which only orders canonical ones
+                raise ValueError(f"Non-canonical date: {literal}")
+            return date, True
+        return literal, True
+
+    def decode(self, value: Any) -> Any:
+        """Converts one array element back to the row representation."""
+        if self.dictionary is not None:
+            return self.dictionary[int(value)]
+        if self.type == 'DATE':
+            return str(value)
+        return value.item()
+
+
+class ColumnarTable:
+    """
+    Column-oriented copy of a table's rows for analytical scans.
+
+    Built on demand from table_data['rows'] and cached as
+    table_data['columnar'] (columns are converted the first time a query
+    uses them). Any row change drops the cache (see IndexManager's
+    maintenance functions), so it always matches the rows.
+
+    WHERE clauses become NumPy boolean masks, one vectorized comparison per
+    condition, and ungrouped aggregates reduce the masked arrays. Only
+    conditions whose result is certain to match PredicateCompiler's are
+    vectorized; for anything else `mask` returns None and the caller falls
+    back to the row path.
+    """
+
+    # Smaller tables are not worth converting
+    MIN_ROWS = 1024
+    TYPES = ('INTEGER', 'BOOLEAN', 'DATE', 'VARCHAR')
+
+    def __init__(self, table_data: Dict[str, Any]):
+        self.rows = table_data['rows']
+        self.meta = table_data['meta']
+        self.rids = np.fromiter(self.rows.keys(), dtype=np.int64, count=len(self.rows))
+        self.columns: Dict[int, Optional[Column]] = {}
+
+    @staticmethod
+    def get(table_data: Dict[str, Any]) -> Optional['ColumnarTable']:
+        """The table's columnar copy, built if needed; None without NumPy or for small tables."""
+        if np is None or len(table_data['rows']) < ColumnarTable.MIN_ROWS:
+            return None
+        table = table_data.get('columnar')
+        if table is None or table.rows is not table_data['rows']:
+            table = table_data['columnar'] = ColumnarTable(table_data)
+        return table
+
+    def column(self, pos: int) -> Optional[Column]:
+        """Returns the arrays of the column at row position `pos`, or None if its type (or values) can't be stored in one."""
+        if pos not in self.columns:
+            self.columns[pos] = self._build(pos)
+        return self.columns[pos]
+
+    def _build(self, pos: int) -> Optional[Column]:
+        meta = self.meta.columns[pos]
+        if meta.type not in self.TYPES:
+            return None
+        values = [row[pos] for row in self.rows.values()]
+        nulls = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+        try:
+            if meta.type == 'INTEGER':
+                return Column(meta.type, np.array([0 if v is None else v for v in values], dtype=np.int64), nulls)
+            if meta.type == 'BOOLEAN':
+                return Column(meta.type, np.array([bool(v) for v in values], dtype=bool), nulls)
+            if meta.type == 'DATE':
+                if any(v is not None and len(v) != 10 for v in values):
+                    # Not all YYYY-MM-DD: string order differs from date order
+                    return None
+                return Column(meta.type, np.array(['NaT' if v is None else v for v in values], dtype='datetime64[D]'), nulls)
+            dictionary = sorted({v for v in values if v is not None})
+            codes = {v: i for i, v in enumerate(dictionary)}
+            return Column(meta.type, np.array([-1 if v is None else codes[v] for v in values], dtype=np.int32),
+                          nulls, dictionary)
+        except (OverflowError, TypeError, ValueError):
+            # e.g. integers beyond 64 bits: leave this column to the row path
+            return None
+
+    # --- Filters ---
+
+    def mask(self, conditions: List[Dict[str, Any]], columns: ColumnMap):
+        """Boolean mask of the rows satisfying every condition, or None if one can't be vectorized."""
+        mask = np.ones(len(self.rids), dtype=bool)
+        for cond in conditions:
+            try:
+                term = self._condition(cond, columns)
+            except (OverflowError, TypeError, ValueError):
+                # e.g. a literal outside int64
+                term = None
+            if term is None:
+                return None
+            mask &= term
+        return mask
+
+    def _condition(self, cond: Dict[str, Any], columns: ColumnMap):
+        op = cond['operator']
+        key, meta = columns.get(cond['column'], (None, None))
+        if key is None:
+            return None
+        literal, typed = PredicateCompiler.literal(cond['value'], meta)
+        if not typed:
+            # Compared by string form (or uncomparable) in the row path
+            return None
+        col = self.column(key)
+        if col is None:
+            return None
+
+        if literal is None:
+            # '= NULL' matches NULLs, ranges never match
+            if op == '=':
+                return col.nulls.copy()
+            if op == '!=':
+                return ~col.nulls
+            return np.zeros(len(self.rids), dtype=bool)
+
+        value, exact = col.encode(literal)
+        present = ~col.nulls
+        if op in ('=', '!='):
+            equal = present & (col.values == value) if exact else np.zeros(len(self.rids), dtype=bool)
+            return equal if op == '=' else ~equal
+        if col.dictionary is not None and not exact:
+            # Between two dictionary entries: `value` is the first code above the literal
+            op = {'>': '>=', '<=': '<'}.get(op, op)
+        if op == '>':
+            return present & (col.values > value)
+        if op == '>=':
+            return present & (col.values >= value)
+        if op == '<':
+            return present & (col.values < value)
+        if op == '<=':
+            return present & (col.values <= value)
+        return None
+
+    def select(self, mask) -> List[int]:
+        """Row ids under the mask, in table order."""
+        return self.rids[mask].tolist()
+
+    # --- Aggregates ---
+
+    def aggregate(self, func: str, key: Optional[int], mask) -> Tuple[Any, bool]:
+        """
+        Computes one aggregate over the masked rows. Returns (value, True),
+        or (None, False) if the column can't be aggregated here.
+        """
+        if key is None:
+            return int(np.count_nonzero(mask)), True
+        col = self.column(key)
+        if col is None:
+            return None, False
+        present = mask & ~col.nulls
+        count = int(np.count_nonzero(present))
+        if func == 'COUNT':
+            return count, True
+        if count == 0:
+            return None, True
+        values = col.values[present]
+        if func == 'MIN':
+            return col.decode(values.min()), True
+        if func == 'MAX':
+            return col.decode(values.max()), True
+        if col.type != 'INTEGER':
+            return None, False
+        if max(int(values.max()), -int(values.min())) * count >= 2 ** 63:
+            # int64 could overflow: sum as Python ints
+            total = sum(values.tolist())
+        else:
+            total = int(values.sum())
+        if func == 'SUM':
+            return total, True
+        return total / count, True
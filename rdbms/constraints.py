@@ -1,5 +1,6 @@
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from rdbms.indexes import IndexManager
 
 class ConstraintManager:
     """
@@ -39,33 +40,119 @@ class ConstraintManager:
             
         return constraints
 
-    def validate_insert(self, table_name: str, row: Dict[str, Any], table_data: Dict[str, Any]):
+    @classmethod
+    def unique_columns(cls, schema: Dict[str, str]) -> List[str]:
+        """Returns the columns declared PRIMARY KEY or UNIQUE."""
+        return [col for col, type_def in schema.items() if cls.parse_constraints(type_def)['unique']]
+
+    @staticmethod
+    def ensure_unique_indexes(table_data: Dict[str, Any]):
         """
-        Validates a row against the table's schema constraints before insertion.
+        Makes sure every PRIMARY KEY / UNIQUE column is backed by an index so
+        uniqueness checks are O(1). Tables created before these indexes existed
+        get them on load.
         """
-        schema = table_data.get('schema', {})
-        existing_rows = table_data.get('rows', [])
-        
-        # We need extended schema info. 
-        # Since currently schema is just {col: type_str}, we have to re-parse the type_str 
-        # to check constraints on every insert? 
-        # Optimization: Ideally schema should store parsed constraints. 
-        # For this implementation, we will parse on the fly or rely on updated storage structure.
-        # Let's assume we proceed with on-the-fly parsing of the stored schema string for simplicity 
-        # strictly avoiding massive refactor of storage format if possible.
+        indexes = table_data.setdefault('indexes', {})
+        for col in table_data['meta'].unique_columns:
+            if col not in indexes:
+                IndexManager.create_index(table_data, col, 'HASH', unique=True)
+
+    def _check_unique(self, col: str, val: Any, table_data: Dict[str, Any], ignore=()):
+        idx = table_data.get('indexes', {}).get(col)
+        if idx is not None:
+            holders = IndexManager.find(idx, val)
+            rows = table_data.get('rows')
+            if hasattr(rows, 'unique_holders'):
+                # A transaction's view: its own writes replace the committed rows they rewrite
+                holders = rows.unique_holders(table_data['meta'].positions[col], val, holders)
+        else:
+            # No index to consult (O(N) fallback)
+            pos = table_data['meta'].positions[col]
+            holders = [rid for rid, r in table_data.get('rows', {}).items() if r[pos] == val]
+        for rid in holders:
+            if rid not in ignore:
+                raise ValueError(f"Constraint Violation: Duplicate value '{val}' for unique column '{col}'.")
+
+    def validate_insert(self, table_name: str, rows: List[Tuple[Any, ...]], table_data: Dict[str, Any]):
+        """
+        Validates a batch of new rows against the table's schema constraints
+        before any is inserted, so a failing INSERT leaves the table untouched.
+        Uses the compiled schema (table_data['meta']) so nothing is re-parsed per row.
+        """
+        meta = table_data['meta']
+        positions = meta.positions
         
-        for col, type_def in schema.items():
-            constraints = self.parse_constraints(type_def)
-            val = row.get(col)
-            
-            # 1. NOT NULL Check
-            if constraints['not_null'] and val is None:
-                 raise ValueError(f"Constraint Violation: Column '{col}' cannot be NULL.")
+        # 1. NOT NULL Check
+        for col in meta.not_null_columns:
+            pos = positions[col]
+            for row in rows:
+                if row[pos] is None:
+                     raise ValueError(f"Constraint Violation: Column '{col}' cannot be NULL.")
             
-            # 2. UNIQUE / PRIMARY KEY Check
-            if (constraints['unique'] or constraints['primary_key']) and val is not None:
-                # Scan existing rows (O(N) - slow but functional for this challenge)
-                # In real DB, would use Index.
-                for r in existing_rows:
-                    if r.get(col) == val:
-                        raise ValueError(f"Constraint Violation: Duplicate value '{val}' for unique column '{col}'.")
+        # 2. UNIQUE / PRIMARY KEY Check (index probe, plus duplicates within the batch)
+        for col in meta.unique_columns:
+            pos = positions[col]
+            seen = set()
+            for row in rows:
+                val = row[pos]
+                if val is None:
+                    continue
+                if val in seen:
+                    raise ValueError(f"Constraint Violation: Duplicate value '{val}' for unique column '{col}'.")
+                seen.add(val)
+                self._check_unique(col, val, table_data)
+
+    def validate_update(self, table_name: str, changes: List[Tuple[int, tuple, tuple]], table_data: Dict[str, Any]):
+        """
+        Validates a batch of (rid, old_row, new_row) changes before any is applied,
+        so a failing UPDATE leaves the table untouched.
+        """
+        meta = table_data['meta']
+        positions = meta.positions
+
+        for col in meta.not_null_columns:
+            pos = positions[col]
+            for rid, old, new in changes:
+                if new[pos] is None:
+                    raise ValueError(f"Constraint Violation: Column '{col}' cannot be NULL.")
+
+        for col in meta.unique_columns:
+            pos = positions[col]
+            changed = [(rid, new) for rid, old, new in changes if new[pos] != old[pos]]
+            # Rows moving off their old value no longer hold it
+            moving = {rid for rid, _ in changed}
+            seen = set()
+            for rid, new in changed:
+                val = new[pos]
+                if val is None:
+                    continue
+                if val in seen:
+                    raise ValueError(f"Constraint Violation: Duplicate value '{val}' for unique column '{col}'.")
+                seen.add(val)
+                self._check_unique(col, val, table_data, ignore=moving)
+
+    def validate_commit(self, table_name: str, written: Dict[int, Optional[tuple]], table_data: Dict[str, Any]):
+        """
+        Re-checks UNIQUE / PRIMARY KEY at COMMIT for the rows a transaction
+        wrote (final image by rid, None if deleted) against the table as now
+        committed: another transaction may have committed the same values
+        since the statements were checked.
+        """
+        meta = table_data['meta']
+        rows = table_data['rows']
+        for col in meta.unique_columns:
+            pos = meta.positions[col]
+            # Committed rows the transaction moves off their value no longer hold it
+            moving = {rid for rid, new in written.items()
+                      if rid in rows and (new is None or new[pos] != rows[rid][pos])}
+            seen = set()
+            for rid, new in written.items():
+                if new is None or new[pos] is None:
+                    continue
+                val = new[pos]
+                if val in seen:
+                    raise ValueError(f"Constraint Violation: Duplicate value '{val}' for unique column '{col}'.")
+                seen.add(val)
+                if rid in rows and rid not in moving:
+                    continue
+                self._check_unique(col, val, table_data, ignore=moving)
@@ -5,27 +5,41 @@ from rdbms.transactions import TransactionManager
 from rdbms.indexes import IndexManager
 from rdbms.typesystem import TypeSystem
 from rdbms.constraints import ConstraintManager
+from rdbms.schema import TableSchema
 from rdbms.joins import JoinExecutor
+from rdbms.planner import QueryPlanner
+from rdbms.predicates import PredicateCompiler
+from rdbms.sorting import SortExecutor
+from rdbms.aggregates import AggregateExecutor
+from rdbms.columnar import ColumnarTable
 import datetime
+import itertools
 
 class Executor:
-    def __init__(self, transaction_manager: TransactionManager):
+    # Statements that change one table, and their handlers
+    WRITES = {
+        'CREATE_TABLE': '_execute_create_table',
+        'INSERT': '_execute_insert',
+        'UPDATE': '_execute_update',
+        'DELETE': '_execute_delete',
+        'CREATE_INDEX': '_execute_create_index',
+        'DROP_INDEX': '_execute_drop_index',
+    }
+    def __init__(self, transaction_manager: TransactionManager, columnar: bool = False):
         self.tm = transaction_manager
         self.cm = ConstraintManager()
+        # Vectorized scans and aggregates over columnar copies of large tables (needs NumPy)
+        self.columnar = columnar
 
     def execute(self, ast: Dict[str, Any]) -> Any:
         cmd_type = ast['type']
         
-        if cmd_type == 'CREATE_TABLE':
-            return self._execute_create_table(ast)
-        elif cmd_type == 'INSERT':
-            return self._execute_insert(ast)
-        elif cmd_type == 'SELECT':
+        if cmd_type == 'SELECT':
             return self._execute_select(ast)
-        elif cmd_type == 'UPDATE':
-            return self._execute_update(ast)
-        elif cmd_type == 'DELETE':
-            return self._execute_delete(ast)
+        elif cmd_type in self.WRITES:
+            # The table is held exclusively for the whole statement, read-modify-write included
+            with self.tm.storage.locks.hold(exclusive=[ast['table']]):
+                return getattr(self, self.WRITES[cmd_type])(ast)
         elif cmd_type == 'BEGIN':
             self.tm.begin()
             return "Transaction Started"
@@ -35,6 +49,15 @@ class Executor:
         elif cmd_type == 'ROLLBACK':
             self.tm.rollback()
             return "Transaction Rolled Back"
+        elif cmd_type == 'SAVEPOINT':
+            self.tm.savepoint(ast['name'])
+            return f"Savepoint {ast['name']} set"
+        elif cmd_type == 'ROLLBACK_TO':
+            self.tm.rollback_to(ast['name'])
+            return f"Rolled Back to Savepoint {ast['name']}"
+        elif cmd_type == 'RELEASE':
+            self.tm.release(ast['name'])
+            return f"Savepoint {ast['name']} released"
         
         raise ValueError(f"Unknown command type: {cmd_type}")
 
@@ -44,130 +67,466 @@ class Executor:
         # Delegate to storage via TM? TM handles data, Storage handles creation structure.
         # Ideally TM should handle this to rollback table creation, but simple approach:
         # direct storage call, no rollback for DDL.
-        self.tm.storage.create_table(table_name, schema)
+        # PRIMARY KEY / UNIQUE columns get a backing hash index up front.
+        indexes = {col: {'type': 'HASH', 'unique': True} for col in ConstraintManager.unique_columns(schema)}
+        # Compile the schema now so a bad column type fails here, not on every later load
+        TableSchema(schema)
+        self.tm.storage.create_table(table_name, schema, indexes)
         return f"Table {table_name} created."
 
-    def _execute_insert(self, ast):
+    def _execute_create_index(self, ast):
         table_name = ast['table']
-        values = ast['values']
-        
+        column = ast['column']
+        index_type = ast.get('index_type', 'HASH')
+        if index_type not in IndexManager.TYPES:
+            raise ValueError(f"Unsupported index type: {index_type}")
+
         table_data = self.tm.get_table_data(table_name)
-        schema = table_data['schema']
+        if column not in table_data['schema']:
+            raise ValueError(f"Column '{column}' does not exist in table {table_name}.")
+        if column in table_data['indexes']:
+            raise ValueError(f"Index on {table_name}({column}) already exists.")
+
+        self.tm.apply(table_name, table_data, [['CI', table_name, column, {'type': index_type}]])
+        return f"Index on {table_name}({column}) created."
+
+    def _execute_drop_index(self, ast):
+        table_name = ast['table']
+        column = ast['column']
+
+        table_data = self.tm.get_table_data(table_name)
+        if column not in table_data['indexes']:
+            raise ValueError(f"No index on {table_name}({column}).")
+        if table_data['indexes'][column].get('unique'):
+            raise ValueError(f"Index on {table_name}({column}) backs a PRIMARY KEY / UNIQUE constraint and cannot be dropped.")
+
+        self.tm.apply(table_name, table_data, [['DI', table_name, column]])
+        return f"Index on {table_name}({column}) dropped."
+
+    def _candidate_rows(self, table_name, table_data, conditions, limit=None):
+        """
+        Yields (rid, row) pairs that may satisfy the conditions: an index lookup
+        when an equality or range predicate is indexed, otherwise every row in the table.
+        Row ids are read up front (or walked safely from an ordered index), so
+        rows deleted while a cursor is still reading are skipped instead of
+        breaking the scan. `limit` caps how many are read when the caller knows
+        every candidate is a result.
+        """
         rows = table_data['rows']
+        rids = IndexManager.lookup(table_data, conditions, table_name)
+        if rids is None:
+            rids = list(rows) if limit is None else list(itertools.islice(rows, limit))
+        elif self._changed(table_data):
+            # Indexes hold the latest committed rows; a transaction's view also
+            # has to check the rows that differ from those
+            rids = rows.candidates(rids, self._equality(table_name, table_data, conditions))
+        elif isinstance(rids, list):
+            # A hash bucket: copy it, the index may change while we read
+            rids = list(rids)
+        # Ordered index walks are lazy and safe to resume, so a LIMIT ends them early
+        for rid in rids:
+            row = rows.get(rid)
+            if row is not None:
+                yield rid, row
+
+    def _execute_insert(self, ast):
+        table_name = ast['table']
         
-        if len(values) != len(schema):
-            raise ValueError(f"Column count mismatch. Expected {len(schema)}, got {len(values)}")
+        table_data = self.tm.get_table_data(table_name)
+        meta = table_data['meta']
         
-        row = {}
-        for (col, col_def), val in zip(schema.items(), values):
-             # Extract pure type for validation (e.g., "INTEGER PRIMARY KEY" -> "INTEGER")
-             # ConstraintManager.parse_constraints can help or simple split
-             type_only = col_def.split()[0] 
-             row[col] = TypeSystem.validate(val, type_only)
+        # Validators are compiled once per table (see TableSchema)
+        new_rows = []
+        for values in ast['rows']:
+            if len(values) != len(meta.columns):
+                raise ValueError(f"Column count mismatch. Expected {len(meta.columns)}, got {len(values)}")
+            new_rows.append(tuple(validate(val) for validate, val in zip(meta.validators, values)))
         
-        # Validate Constraints
-        self.cm.validate_insert(table_name, row, table_data)
+        # Validate Constraints for the whole batch before anything changes
+        self.cm.validate_insert(table_name, new_rows, table_data)
+        self.tm.storage.check_rows(new_rows)
 
-        rows.append(row)
-        table_data['rows'] = rows
-        self.tm.mark_modified(table_name, table_data)
-        return "1 row inserted."
+        rid = table_data['next_rid']
+        table_data['next_rid'] = rid + len(new_rows)
+        # One set of changes: logged as a single record however many rows there are
+        self.tm.apply(table_name, table_data, [['I', table_name, rid, row] for rid, row in enumerate(new_rows, rid)])
+        if len(new_rows) == 1:
+            return "1 row inserted."
+        return f"{len(new_rows)} rows inserted."
 
     def _execute_select(self, ast):
+        with self.tm.storage.locks.hold(shared=self._tables(ast)):
+            return list(self._select(ast))
+
+    def stream(self, ast):
+        """
+        Runs a SELECT and returns a generator over its result rows. Tables are
+        loaded and the query planned here; rows are then produced lazily by a
+        generator pipeline (scan -> filter -> join -> project) as they are read.
+        Shared locks on the tables are held while planning and while each row
+        is produced, but not between rows, so an open cursor never blocks
+        writers (and each row reflects the tables when it is read).
+        """
+        tables = self._tables(ast)
+        locks = self.tm.storage.locks
+        with locks.hold(shared=tables):
+            rows = self._select(ast)
+        return self._locked_rows(rows, tables)
+
+    def _locked_rows(self, rows, tables):
+        locks = self.tm.storage.locks
+        while True:
+            with locks.hold(shared=tables):
+                # Result rows are lists, never None
+                row = next(rows, None)
+            if row is None:
+                return
+            yield row
+
+    @staticmethod
+    def _tables(ast):
+        join_def = ast.get('join')
+        return [ast['table'], join_def['table']] if join_def else [ast['table']]
+
+    def _select(self, ast):
+        """Plans a SELECT and returns the lazy pipeline producing its rows. Caller holds the table locks."""
         table_name = ast['table']
         columns = ast['columns']
         where = ast['where']
         join_def = ast.get('join')
-        print("AST JOIN:", join_def) # DEBUG
         
-        table_data = self.tm.get_table_data(table_name)
-        rows = table_data['rows']
+        order_by = ast.get('order_by')
+        limit, offset = ast.get('limit'), ast.get('offset', 0)
+        for count in (limit, offset):
+            # Bound parameters are only known to be integers here
+            if count is not None and (not isinstance(count, int) or isinstance(count, bool) or count < 0):
+                raise ValueError(f"LIMIT and OFFSET must be non-negative integers, got {count!r}")
+        # Rows needed from the pipeline; everything below stops pulling rows once this many are out
+        needed = None if limit is None else offset + limit
+        # With aggregates, ORDER BY and LIMIT apply to the groups rather than the rows read
+        grouped = bool(ast.get('group_by')) or any(ast.get('aggregates') or ())
+        row_order = None if grouped else order_by
+        row_limit = None if grouped else needed
         
-        # Handle JOIN
-        if join_def:
+        table_data = self.tm.get_table_data(table_name)
+        if not join_def:
+            names = PredicateCompiler.columns([(table_name, table_data['meta'])])
+            rows = None
+            if row_order:
+                # A BTREE index on the ORDER BY column yields rows already sorted
+                rows = self._ordered_scan(table_name, table_data, where, row_order)
+                if rows is not None:
+                    order_by = None
+            if rows is None and where and self.columnar:
+                rows = self._vector_scan(table_name, table_data, where, names)
+            if rows is None:
+                # Single table: an indexed predicate narrows the rows scanned
+                rows = self._scan(table_name, table_data, where, None if row_order else row_limit)
+        else:
             right_table = join_def['table']
             right_data = self.tm.get_table_data(right_table)
-            right_rows = right_data['rows']
-            
-            rows = JoinExecutor.nested_loop_join(
-                rows, table_name,
-                right_rows, right_table,
-                join_def,
-                join_def['type']
-            )
-            # FROM now on, rows have keys like 'table.col'
-            # We need to adjust WHERE and SELECT to handle this.
-            # Currently Query Executor _apply_filtering uses simple keys.
-            # We need to make it smarter or map keys.
-        
-        # If joined, keys are 'table.col'. If not, keys are 'col'.
-        # To unify, if not joined, maybe aliasing rows is safer?
-        # Or just handle lookup logic.
-        
-        # Validating Columns if they have dots (e.g. users.name)
-        # If executor receives 'name' but row has 'users.name', we need to match.
-        
-        filtered_rows = self._apply_filtering(rows, where, table_data.get('indexes'), is_joined=bool(join_def), primary_table=table_name)
+            # Single-table conditions filter each side before the join; the rest run on joined rows
+            plan = QueryPlanner.plan_join(ast, table_data['meta'].names, right_data['meta'].names)
+            rows = self._join(table_name, table_data, plan['left'], right_table, right_data, plan['right'], plan['join'],
+                              streamed=row_limit is not None and not row_order)
+            # From here on, rows hold the left table's columns followed by the right table's
+            names = PredicateCompiler.columns([(table_name, table_data['meta']), (right_table, right_data['meta'])])
+            if plan['where']:
+                predicate = PredicateCompiler.compile(plan['where'], names)
+                rows = (row for row in rows if predicate(row))
+
+        if grouped:
+            # Result rows are now one per group: group values, then aggregate values
+            rows, names = self._aggregate(table_name, table_data, ast, rows, names, indexed=not join_def)
         
-        # Project columns
-        result = []
-        for row in filtered_rows:
-            if not columns:
-                result.append(list(row.values()))
+        if order_by:
+            column = order_by['column']
+            if column not in names:
+                raise ValueError(f"Unknown column in ORDER BY: {column}")
+            # With a LIMIT only the first `needed` rows are kept (top-K)
+            rows = SortExecutor.sort(rows, names[column][0], order_by['descending'], needed)
+
+        if needed is not None or offset:
+            rows = itertools.islice(rows, offset, needed)
+
+        # Project columns, resolved to row positions once; unknown columns read as NULL
+        if not columns:
+            return (list(row) for row in rows)
+        keys = [names[col][0] if col in names else None for col in columns]
+        return ([None if key is None else row[key] for key in keys] for row in rows)
+
+    def _scan(self, table_name, table_data, conditions, limit=None):
+        """
+        Yields rows of one table satisfying the conditions, using an index to
+        narrow them when one applies. Without conditions every candidate is a
+        result, so at most `limit` rows are read.
+        """
+        if not conditions:
+            return (row for _, row in self._candidate_rows(table_name, table_data, conditions, limit))
+        candidates = self._candidate_rows(table_name, table_data, conditions)
+        predicate = self._predicate(table_name, table_data, conditions)
+        return (row for _, row in candidates if predicate(row))
+
+    def _aggregate(self, table_name, table_data, ast, rows, names, indexed=False):
+        """
+        Groups and aggregates the filtered rows. Returns the result rows (one
+        tuple per group: its group values, then the aggregates) and the names
+        ORDER BY and the projection can use for them. `indexed`: the rows come from a single
+        table, so MIN/MAX can be read from a BTREE index instead.
+        """
+        columns = ast['columns']
+        if not columns:
+            raise ValueError("SELECT * cannot be combined with GROUP BY.")
+
+        group_keys = []
+        for col in ast.get('group_by') or []:
+            if col not in names:
+                raise ValueError(f"Unknown column in GROUP BY: {col}")
+            group_keys.append(names[col][0])
+
+        aggregates = []
+        for col, agg in zip(columns, ast['aggregates']):
+            if agg is None:
+                if col not in names or names[col][0] not in group_keys:
+                    raise ValueError(f"Column '{col}' must appear in GROUP BY or be used in an aggregate function.")
+                continue
+            func, arg = agg['func'], agg['column']
+            if arg == '*':
+                if func != 'COUNT':
+                    raise ValueError(f"{func}(*) is not supported.")
+                aggregates.append((col, func, None))
+                continue
+            if arg not in names:
+                raise ValueError(f"Unknown column in {col}")
+            key, meta = names[arg]
+            if func in AggregateExecutor.NUMERIC and meta.type != 'INTEGER':
+                raise ValueError(f"{func} requires an INTEGER column, got {arg} ({meta.type}).")
+            aggregates.append((col, func, key))
+
+        # Group columns keep every name they had; aggregates are named by their text
+        out_names = {name: (group_keys.index(ref[0]), ref[1]) for name, ref in names.items() if ref[0] in group_keys}
+        out_names.update((col, (len(group_keys) + j, None)) for j, (col, _, _) in enumerate(aggregates))
+
+        if indexed and not group_keys:
+            values = self._indexed_aggregates(table_name, table_data, ast['where'], aggregates)
+            if values is None and self.columnar:
+                values = self._vector_aggregates(table_name, table_data, ast['where'], names, aggregates)
+            if values is not None:
+                return iter([tuple(values)]), out_names
+
+        groups = AggregateExecutor.aggregate(rows, group_keys, [(func, key) for _, func, key in aggregates])
+        return (group + tuple(values) for group, values in groups), out_names
+
+    def _indexed_aggregates(self, table_name, table_data, conditions, aggregates):
+        """
+        Answers MIN/MAX over BTREE-indexed columns with the first matching
+        entry of an ordered index walk, and COUNT(*) without WHERE from the
+        row count. Returns None if any of the aggregates needs a scan.
+        """
+        values = []
+        for _, func, key in aggregates:
+            if func == 'COUNT' and key is None and not conditions:
+                values.append(len(table_data['rows']))
+            elif func in ('MIN', 'MAX'):
+                column = table_data['meta'].names[key]
+                rows = self._ordered_scan(table_name, table_data, conditions,
+                                          {'column': column, 'descending': func == 'MAX'}, nulls=False)
+                if rows is None:
+                    return None
+                first = next(rows, None)
+                values.append(None if first is None else first[key])
             else:
-                row_res = []
-                for col in columns:
-                    # lookup
-                    val = self._resolve_col(row, col, table_name)
-                    row_res.append(val)
-                result.append(row_res)
-        
-        return result
-
-    def _resolve_col(self, row, col_name, primary_table):
-        if col_name in row: return row[col_name]
-        # try table.col
-        # try table.col
-        if '.' in col_name: return row.get(col_name) # Exact match
-        # Try prepending primary table
-        if f"{primary_table}.{col_name}" in row: return row[f"{primary_table}.{col_name}"]
-        # Try finding suffix 
-        # (Ambiguous columns issue? For now pick first match)
-        for k, v in row.items():
-            if k.endswith(f".{col_name}"):
-                return v
-        return None
+                return None
+        return values
+
+    @staticmethod
+    def _vector_mask(table_name, table_data, conditions, names):
+        """
+        Returns (columnar table, mask of the rows satisfying the conditions),
+        or None when an index narrows the rows instead or the conditions (or
+        table) can't be handled by the columnar path.
+        """
+        if conditions and IndexManager.lookup(table_data, conditions, table_name) is not None:
+            return None
+        if 'snapshot' in table_data:
+            # Columnar copies are of the shared table, not a transaction's view
+            return None
+        table = ColumnarTable.get(table_data)
+        if table is None:
+            return None
+        mask = table.mask(conditions, names)
+        return None if mask is None else (table, mask)
 
-    def _apply_filtering(self, rows, conditions, indexes, is_joined=False, primary_table=""):
+    def _vector_scan(self, table_name, table_data, conditions, names):
+        """
+        Yields the rows satisfying the conditions found with NumPy masks over
+        the table's columnar copy. Like index candidates, rows are checked
+        again as they are read. None if the columnar path doesn't apply.
+        """
+        found = self._vector_mask(table_name, table_data, conditions, names)
+        if found is None:
+            return None
+        table, mask = found
+        rows = table_data['rows']
+        predicate = self._predicate(table_name, table_data, conditions)
+        return (row for row in map(rows.get, table.select(mask)) if row is not None and predicate(row))
+
+    def _vector_aggregates(self, table_name, table_data, conditions, names, aggregates):
+        """Computes ungrouped aggregates over the masked columnar arrays; None if any can't be."""
+        found = self._vector_mask(table_name, table_data, conditions, names)
+        if found is None:
+            return None
+        table, mask = found
+        values = []
+        for _, func, key in aggregates:
+            value, ok = table.aggregate(func, key, mask)
+            if not ok:
+                return None
+            values.append(value)
+        return values
+
+    def _ordered_scan(self, table_name, table_data, conditions, order_by, nulls=True):
+        """
+        Yields rows satisfying the conditions in ORDER BY order by walking a
+        BTREE index on the column, so nothing has to be sorted. Returns None
+        when there is no such index, or when another index narrows the rows
+        and sorting those few is cheaper than walking this one.
+        `nulls=False` leaves out rows whose value is NULL.
+        """
+        column = order_by['column']
+        if '.' in column:
+            table, column = column.split('.', 1)
+            if table != table_name:
+                return None
+        idx = table_data['indexes'].get(column)
+        if idx is None or idx['type'] != 'BTREE' or self._changed(table_data):
+            return None
+        own = [c for c in conditions if c['column'] in (column, f"{table_name}.{column}")]
+        others = [c for c in conditions if c not in own]
+        if IndexManager.lookup(table_data, others, table_name) is not None:
+            return None
+
+        descending = order_by['descending']
+        # NULLs are not in the index: they sort last, and no range on the column matches them
+        with_nulls = nulls and not table_data['meta'].by_name[column].not_null and not any(
+            c['operator'] in IndexManager.RANGE_OPERATORS and c['value'] is not None for c in own)
+        rows = self._ordered_rows(table_data, idx, table_data['meta'].positions[column], own, descending, with_nulls)
         if not conditions:
             return rows
-            
-        results = []
-        for row in rows:
-            match = True
-            for cond in conditions:
-                col = cond['column']
-                op = cond['operator']
-                val = cond['value']
-                
-                row_val = self._resolve_col(row, col, primary_table)
-                
-                # ... same comparison logic ...
-                if op == '=' and str(row_val) != str(val): match = False
-                elif op == '!=' and str(row_val) == str(val): match = False
-                elif op == '>':
-                     if row_val is None or not (row_val > val): match = False
-                elif op == '<':
-                     if row_val is None or not (row_val < val): match = False
-                elif op == '>=':
-                     if row_val is None or not (row_val >= val): match = False
-                elif op == '<=':
-                     if row_val is None or not (row_val <= val): match = False
-                
-                if not match: break
-            if match:
-                results.append(row)
-        return results
+        predicate = self._predicate(table_name, table_data, conditions)
+        return (row for row in rows if predicate(row))
+
+    @staticmethod
+    def _ordered_rows(table_data, idx, pos, conditions, descending, with_nulls):
+        rows = table_data['rows']
+
+        def nulls():
+            for rid in list(rows):
+                row = rows.get(rid)
+                if row is not None and row[pos] is None:
+                    yield row
+
+        if with_nulls and descending:
+            yield from nulls()
+        for rid in IndexManager.ordered_scan(idx, conditions, descending):
+            row = rows.get(rid)
+            if row is not None:
+                yield row
+        if with_nulls and not descending:
+            yield from nulls()
+
+    @staticmethod
+    def _changed(table_data) -> bool:
+        """True for a transaction's view with rows the indexes don't describe."""
+        return 'snapshot' in table_data and table_data['rows'].has_changes()
+
+    @staticmethod
+    def _equality(table_name, table_data, conditions):
+        """(position, value) of an '=' condition on one of the table's columns, or None."""
+        positions = table_data['meta'].positions
+        for cond in conditions:
+            if cond['operator'] != '=':
+                continue
+            col = cond['column']
+            if '.' in col:
+                table, col = col.split('.', 1)
+                if table != table_name:
+                    continue
+            if col in positions:
+                return positions[col], cond['value']
+        return None
+
+    @staticmethod
+    def _predicate(table_name, table_data, conditions):
+        return PredicateCompiler.compile(conditions, PredicateCompiler.columns([(table_name, table_data['meta'])]))
+
+    def _join(self, left_table, left_data, left_conds, right_table, right_data, right_conds, join_def, streamed=False):
+        """
+        Joins two tables after applying the conditions pushed down to each side,
+        with the algorithm that suits the input sizes and the indexes on the join columns.
+        `streamed`: only part of the result will be read (LIMIT), so keep the
+        left side lazy even when filtered.
+        """
+        left_col, right_col = join_def['left_col'], join_def['right_col']
+        for table, data, col in ((left_table, left_data, left_col), (right_table, right_data, right_col)):
+            if col not in data['meta'].positions:
+                raise ValueError(f"Unknown column in JOIN condition: {table}.{col}")
+        condition = {'left_pos': left_data['meta'].positions[left_col],
+                     'right_pos': right_data['meta'].positions[right_col],
+                     'right_width': len(right_data['meta'].columns)}
+        left_index = left_data['indexes'].get(left_col)
+        right_index = right_data['indexes'].get(right_col)
+        left_meta = left_data['meta'].by_name.get(left_col)
+        right_meta = right_data['meta'].by_name.get(right_col)
+        # Ordered indexes compare values directly, so both columns must share a type
+        same_type = left_meta is not None and right_meta is not None and left_meta.type == right_meta.type
+        # Index order only holds for a transaction's view if none of its rows differ
+        presorted = (same_type and left_index is not None and right_index is not None
+                     and left_index['type'] == right_index['type'] == 'BTREE'
+                     and not self._changed(left_data) and not self._changed(right_data))
+        # Hash index keys use the same string form as the join itself. Probed rows
+        # skip the right side's own filter, so only probe an unfiltered right side.
+        probe = None
+        if (right_index is not None and not right_conds and (right_index['type'] == 'HASH' or same_type)
+                and not self._changed(right_data)):
+            probe = right_index
+
+        # The left side is streamed unless it was filtered, in which case its size is known exactly
+        left_rows = self._scan(left_table, left_data, left_conds)
+        left_count = len(left_data['rows'])
+        if left_conds and not streamed:
+            left_rows = list(left_rows)
+            left_count = len(left_rows)
+        right_rows = list(self._scan(right_table, right_data, right_conds)) if right_conds else None
+        right_count = len(right_rows) if right_rows is not None else len(right_data['rows'])
+
+        algorithm = JoinExecutor.choose(left_count, right_count, presorted, probe is not None)
+        join_type = join_def['type']
+        if algorithm == 'INDEX':
+            return JoinExecutor.index_nested_loop_join(left_rows, right_data['rows'], probe, condition, join_type)
+        if algorithm == 'MERGE':
+            return JoinExecutor.merge_join(self._sorted_rows(left_table, left_data, left_col, left_conds),
+                                           self._sorted_rows(right_table, right_data, right_col, right_conds),
+                                           condition, join_type, presorted=True)
+        if right_rows is None:
+            right_rows = list(right_data['rows'].values())
+        if algorithm == 'HASH':
+            return JoinExecutor.hash_join(left_rows, right_rows, condition, join_type,
+                                          build_left=left_count < right_count)
+        return JoinExecutor.nested_loop_join(left_rows, right_rows, condition, join_type)
+
+    def _sorted_rows(self, table_name, table_data, col, conditions):
+        """Rows satisfying the conditions, ordered by col (NULLs last) via the BTREE index on it."""
+        idx = table_data['indexes'][col]
+        rows = table_data['rows']
+        ordered = [rows[rid] for rids in idx['rids'] for rid in rids]
+        # NULLs are not in the index
+        pos = table_data['meta'].positions[col]
+        ordered.extend(row for row in rows.values() if row[pos] is None)
+        if not conditions:
+            return ordered
+        predicate = self._predicate(table_name, table_data, conditions)
+        return [row for row in ordered if predicate(row)]
 
     def _execute_update(self, ast):
         table_name = ast['table']
@@ -175,28 +534,27 @@ class Executor:
         where = ast['where']
         
         table_data = self.tm.get_table_data(table_name)
-        rows = table_data['rows']
-        schema = table_data['schema']
+        meta = table_data['meta']
+        # SET values are constants: validate them once, not per matched row
+        new_values = [(meta.positions[col], meta.by_name[col].validate(val))
+                      for col, val in updates.items() if col in meta.positions]
         
-        count = 0
-        for row in rows:
-            match = True
-            for cond in where:
-                # Same filtering logic - duplicated for brevity
-                col = cond['column']; op = cond['operator']; val = cond['value']
-                row_val = row.get(col)
-                if op == '=' and row_val != val: match = False; break
-                if op == '!=' and row_val == val: match = False; break
-                # ... others skipped for brevity in update ...
-            
-            if match:
-                for col, new_val in updates.items():
-                    if col in schema:
-                        row[col] = TypeSystem.validate(new_val, schema[col])
-                count += 1
+        # Compute every new row first so constraints are checked before anything changes
+        changes = []
+        predicate = self._predicate(table_name, table_data, where)
+        for rid, row in self._candidate_rows(table_name, table_data, where):
+            if predicate(row):
+                new_row = list(row)
+                for pos, value in new_values:
+                    new_row[pos] = value
+                changes.append((rid, row, tuple(new_row)))
         
+        self.cm.validate_update(table_name, changes, table_data)
+        self.tm.storage.check_rows(new_row for _, _, new_row in changes)
+
+        count = len(changes)
         if count > 0:
-            self.tm.mark_modified(table_name, table_data)
+            self.tm.apply(table_name, table_data, [['U', table_name, rid, new_row] for rid, _, new_row in changes])
         return f"{count} rows updated."
 
     def _execute_delete(self, ast):
@@ -204,44 +562,12 @@ class Executor:
         where = ast['where']
         
         table_data = self.tm.get_table_data(table_name)
-        rows = table_data['rows']
         
-        initial_len = len(rows)
-        # Filter keep rows
-        new_rows = []
-        for row in rows:
-            match = True
-            for cond in where:
-                col = cond['column']; op = cond['operator']; val = cond['value']
-                row_val = row.get(col)
-                if op == '=' and row_val != val: match = False; break
-                # ...
-            if not match: # If NOT match conditions, keep it (Logic inverted)
-                 # Wait, logic: Delete WHERE conditions ARE Met.
-                 # So if match is True, we DELETE (do not add to new_rows)
-                 pass
-            else:
-                 # Match found, so we delete.
-                 pass
-
-        # Re-implement clearer delete logic
-        kept_rows = []
-        deleted_count = 0
-        for row in rows:
-            match = True
-            for cond in where:
-                col = cond['column']; op = cond['operator']; val = cond['value']
-                row_val = row.get(col)
-                if op == '=' and row_val != val: match = False; break
-                if op == '!=' and row_val == val: match = False; break
-                if op == '>' and not (row_val > val): match = False; break
-                if op == '<' and not (row_val < val): match = False; break
-            
-            if match:
-                deleted_count += 1
-            else:
-                kept_rows.append(row)
+        deleted = []
+        predicate = self._predicate(table_name, table_data, where)
+        for rid, row in self._candidate_rows(table_name, table_data, where):
+            if predicate(row):
+                deleted.append(['D', table_name, rid])
         
-        table_data['rows'] = kept_rows
-        self.tm.mark_modified(table_name, table_data)
-        return f"{deleted_count} rows deleted."
+        self.tm.apply(table_name, table_data, deleted)
+        return f"{len(deleted)} rows deleted."
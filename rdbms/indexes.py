@@ -1,26 +1,352 @@
-
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+import bisect
 
 class IndexManager:
     """
-    Manages Hash Indexes for tables.
+    Manages Hash and ordered (BTREE) Indexes for tables.
     """
-    # In-memory Structure: indexes[table][column] = {value: [row_indices]}
-    
+    # In-memory Structure: table_data['indexes'][column] =
+    #   HASH:  {'type': 'HASH', 'map': {key: [row_ids]}}
+    #   BTREE: {'type': 'BTREE', 'keys': [sorted values], 'rids': [[row_ids] per key]}
+    # Only the definition ('type') is persisted; entries are rebuilt when the table is loaded.
+    # Hash keys are str(value) so lookups agree with the executor's '=' semantics.
+    # The BTREE is a sorted array searched with bisect: O(log n) to find a bound,
+    # O(k) to walk the matches. NULLs are not stored since no range matches them.
+    # Rows are tuples; an index reads its column at table_data['meta'].positions[column].
+    # Every row change goes through insert_row(s)/delete_row/update_row, which also
+    # drop the table's columnar copy (rdbms/columnar.py) since it is now stale.
+
+    TYPES = ('HASH', 'BTREE')
+    ENTRY_FIELDS = ('map', 'keys', 'rids')
+    RANGE_OPERATORS = ('=', '>', '>=', '<', '<=')
+    # Batches this large are merged into an ordered index instead of inserted one by one
+    MERGE_MIN_ROWS = 64
+
+    @staticmethod
+    def key(value: Any) -> str:
+        return str(value)
+
     @staticmethod
-    def build_index(rows: List[Dict[str, Any]], column: str) -> Dict[Any, List[int]]:
+    def build_index(rows: Dict[int, tuple], pos: int) -> Dict[str, List[int]]:
         """
-        Builds a hash index for a specific column.
-        Returns Dict: value -> list of row indices in the 'rows' list.
+        Builds a hash index for the column at row position `pos`.
+        Returns Dict: key -> list of row ids in table_data['rows'].
         """
         index = {}
-        for i, row in enumerate(rows):
-            val = row.get(column)
-            if val not in index:
-                index[val] = []
-            index[val].append(i)
+        for rid, row in rows.items():
+            key = IndexManager.key(row[pos])
+            if key not in index:
+                index[key] = []
+            index[key].append(rid)
         return index
 
     @staticmethod
-    def search(index: Dict[Any, List[int]], value: Any) -> List[int]:
-        return index.get(value, [])
+    def build_sorted_index(rows: Dict[int, tuple], pos: int, column: str) -> Dict[str, list]:
+        """
+        Builds an ordered index for the column at row position `pos`.
+        Returns Dict with parallel lists 'keys' (sorted, distinct) and 'rids'.
+        """
+        groups = {}
+        for rid, row in rows.items():
+            val = row[pos]
+            if val is None:
+                continue
+            groups.setdefault(val, []).append(rid)
+        try:
+            keys = sorted(groups)
+        except TypeError:
+            raise ValueError(f"Cannot build ordered index on '{column}': values are not mutually comparable.")
+        return {'keys': keys, 'rids': [groups[k] for k in keys]}
+
+    @staticmethod
+    def search(index: Dict[str, List[int]], value: Any) -> List[int]:
+        return index.get(IndexManager.key(value), [])
+
+    @staticmethod
+    def find(idx: Dict[str, Any], value: Any) -> List[int]:
+        """Returns the row ids holding exactly `value` in any index type."""
+        if idx['type'] == 'BTREE':
+            if value is None:
+                return []
+            keys = idx['keys']
+            try:
+                i = bisect.bisect_left(keys, value)
+            except TypeError:
+                return []
+            if i < len(keys) and keys[i] == value:
+                return idx['rids'][i]
+            return []
+        return IndexManager.search(idx['map'], value)
+
+    @staticmethod
+    def range_search(idx: Dict[str, Any], conditions: List[Dict[str, Any]],
+                     descending: bool = False) -> Optional[Iterator[int]]:
+        """
+        Returns row ids (in key order, or reverse key order if descending) whose
+        value satisfies every range/equality condition, or None if none of the
+        conditions can use the ordered index.
+        The ids are produced lazily, so a LIMIT stops the walk early.
+        """
+        try:
+            bounds = IndexManager._bounds(idx, conditions)
+        except TypeError:
+            # Literal not comparable with the indexed values: let the scan decide
+            return None
+        if bounds is None:
+            return None
+        return IndexManager._walk(idx, *bounds, descending)
+
+    @staticmethod
+    def ordered_scan(idx: Dict[str, Any], conditions: List[Dict[str, Any]],
+                     descending: bool = False) -> Iterator[int]:
+        """
+        Like range_search, but walks the whole index when the conditions don't
+        bound it. Rows whose value is NULL are not in the index.
+        """
+        rids = IndexManager.range_search(idx, conditions, descending)
+        if rids is None:
+            rids = IndexManager._walk(idx, None, True, None, True, descending)
+        return rids
+
+    @staticmethod
+    def _bounds(idx: Dict[str, Any], conditions: List[Dict[str, Any]]) -> Optional[tuple]:
+        """
+        Folds the conditions into (lo, lo_inclusive, hi, hi_inclusive), or None
+        if none of them bounds the index. Raises TypeError if a literal doesn't
+        compare with the indexed values.
+        """
+        lo = hi = None
+        lo_inclusive = hi_inclusive = True
+        bounded = False
+        for cond in conditions:
+            op = cond['operator']
+            val = cond['value']
+            if op not in IndexManager.RANGE_OPERATORS or val is None:
+                continue
+            bounded = True
+            if op in ('=', '>', '>='):
+                inclusive = op != '>'
+                if lo is None or val > lo or (val == lo and not inclusive):
+                    lo, lo_inclusive = val, inclusive
+            if op in ('=', '<', '<='):
+                inclusive = op != '<'
+                if hi is None or val < hi or (val == hi and not inclusive):
+                    hi, hi_inclusive = val, inclusive
+        if not bounded:
+            return None
+        # Fails here, not mid-walk, if a bound doesn't compare with the keys
+        for bound in (lo, hi):
+            if bound is not None:
+                bisect.bisect_left(idx['keys'], bound)
+        return lo, lo_inclusive, hi, hi_inclusive
+
+    @staticmethod
+    def _walk(idx: Dict[str, Any], lo: Any, lo_inclusive: bool, hi: Any, hi_inclusive: bool,
+              descending: bool = False) -> Iterator[int]:
+        """
+        Yields row ids key by key between the bounds (None: unbounded). After
+        each key the position is found again by value, so the walk stays
+        correct if rows are inserted or deleted while a cursor is reading.
+        """
+        keys = idx['keys']
+        if not descending:
+            i = 0
+            if lo is not None:
+                i = bisect.bisect_left(keys, lo) if lo_inclusive else bisect.bisect_right(keys, lo)
+            while i < len(keys):
+                key = keys[i]
+                if hi is not None and (key > hi or (key == hi and not hi_inclusive)):
+                    return
+                yield from list(idx['rids'][i])
+                i = bisect.bisect_right(keys, key)
+        else:
+            i = len(keys) - 1
+            if hi is not None:
+                i = (bisect.bisect_right(keys, hi) if hi_inclusive else bisect.bisect_left(keys, hi)) - 1
+            while i >= 0:
+                key = keys[i]
+                if lo is not None and (key < lo or (key == lo and not lo_inclusive)):
+                    return
+                yield from list(idx['rids'][i])
+                i = bisect.bisect_left(keys, key) - 1
+
+    @staticmethod
+    def create_index(table_data: Dict[str, Any], column: str, index_type: str = 'HASH', unique: bool = False):
+        """Builds and registers an index on table_data (caller persists it)."""
+        indexes = table_data.setdefault('indexes', {})
+        idx = {'type': index_type}
+        if unique:
+            # Backs a PRIMARY KEY / UNIQUE constraint
+            idx['unique'] = True
+        pos = table_data['meta'].positions[column]
+        if index_type == 'BTREE':
+            idx.update(IndexManager.build_sorted_index(table_data['rows'], pos, column))
+        else:
+            idx['map'] = IndexManager.build_index(table_data['rows'], pos)
+        indexes[column] = idx
+
+    @staticmethod
+    def drop_index(table_data: Dict[str, Any], column: str):
+        del table_data['indexes'][column]
+
+    @staticmethod
+    def rebuild_all(table_data: Dict[str, Any]):
+        """Rebuilds every index from its persisted definition."""
+        for column, idx in list(table_data.get('indexes', {}).items()):
+            IndexManager.create_index(table_data, column, idx.get('type', 'HASH'), idx.get('unique', False))
+
+    @staticmethod
+    def definitions(indexes: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Returns the persistable part of each index (everything but the entries)."""
+        return {
+            col: {k: v for k, v in idx.items() if k not in IndexManager.ENTRY_FIELDS}
+            for col, idx in indexes.items()
+        }
+
+    # --- Incremental maintenance ---
+
+    @staticmethod
+    def _add(idx: Dict[str, Any], value: Any, rid: int):
+        if idx['type'] == 'BTREE':
+            if value is None:
+                return
+            keys = idx['keys']
+            i = bisect.bisect_left(keys, value)
+            if i < len(keys) and keys[i] == value:
+                idx['rids'][i].append(rid)
+            else:
+                keys.insert(i, value)
+                idx['rids'].insert(i, [rid])
+        else:
+            idx['map'].setdefault(IndexManager.key(value), []).append(rid)
+
+    @staticmethod
+    def _remove(idx: Dict[str, Any], value: Any, rid: int):
+        if idx['type'] == 'BTREE':
+            if value is None:
+                return
+            keys = idx['keys']
+            i = bisect.bisect_left(keys, value)
+            if i == len(keys) or keys[i] != value:
+                return
+            bucket = idx['rids'][i]
+            bucket.remove(rid)
+            if not bucket:
+                del keys[i]
+                del idx['rids'][i]
+        else:
+            key = IndexManager.key(value)
+            bucket = idx['map'].get(key)
+            if bucket is None:
+                return
+            bucket.remove(rid)
+            if not bucket:
+                del idx['map'][key]
+
+    @staticmethod
+    def insert_row(table_data: Dict[str, Any], rid: int, row: tuple):
+        table_data.pop('columnar', None)
+        positions = table_data['meta'].positions
+        for column, idx in table_data.get('indexes', {}).items():
+            IndexManager._add(idx, row[positions[column]], rid)
+
+    @staticmethod
+    def insert_rows(table_data: Dict[str, Any], added: List[Tuple[int, tuple]]):
+        """
+        Indexes a batch of new (rid, row) pairs. Ordered indexes take a large
+        batch as one sorted run merged into their arrays, O(n + k log k),
+        rather than k inserts that each shift the arrays.
+        """
+        table_data.pop('columnar', None)
+        positions = table_data['meta'].positions
+        for column, idx in table_data.get('indexes', {}).items():
+            pos = positions[column]
+            if idx['type'] == 'BTREE' and len(added) >= IndexManager.MERGE_MIN_ROWS:
+                IndexManager._merge(idx, added, pos, column)
+            else:
+                for rid, row in added:
+                    IndexManager._add(idx, row[pos], rid)
+
+    @staticmethod
+    def _merge(idx: Dict[str, Any], added: List[Tuple[int, tuple]], pos: int, column: str):
+        new = IndexManager.build_sorted_index(dict(added), pos, column)
+        old_keys, old_rids = idx['keys'], idx['rids']
+        keys, rids = [], []
+        i = j = 0
+        try:
+            while i < len(old_keys) and j < len(new['keys']):
+                if old_keys[i] < new['keys'][j]:
+                    keys.append(old_keys[i])
+                    rids.append(old_rids[i])
+                    i += 1
+                elif new['keys'][j] < old_keys[i]:
+                    keys.append(new['keys'][j])
+                    rids.append(new['rids'][j])
+                    j += 1
+                else:
+                    keys.append(old_keys[i])
+                    rids.append(old_rids[i] + new['rids'][j])
+                    i += 1
+                    j += 1
+        except TypeError:
+            raise ValueError(f"Cannot build ordered index on '{column}': values are not mutually comparable.")
+        keys.extend(old_keys[i:])
+        rids.extend(old_rids[i:])
+        keys.extend(new['keys'][j:])
+        rids.extend(new['rids'][j:])
+        idx['keys'], idx['rids'] = keys, rids
+
+    @staticmethod
+    def delete_row(table_data: Dict[str, Any], rid: int, row: tuple):
+        table_data.pop('columnar', None)
+        positions = table_data['meta'].positions
+        for column, idx in table_data.get('indexes', {}).items():
+            IndexManager._remove(idx, row[positions[column]], rid)
+
+    @staticmethod
+    def update_row(table_data: Dict[str, Any], rid: int, old_row: tuple, new_row: tuple):
+        table_data.pop('columnar', None)
+        positions = table_data['meta'].positions
+        for column, idx in table_data.get('indexes', {}).items():
+            pos = positions[column]
+            old_val = old_row[pos]
+            new_val = new_row[pos]
+            if old_val == new_val and type(old_val) is type(new_val):
+                continue
+            IndexManager._remove(idx, old_val, rid)
+            IndexManager._add(idx, new_val, rid)
+
+    # --- Planning ---
+
+    @staticmethod
+    def lookup(table_data: Dict[str, Any], conditions: List[Dict[str, Any]], table_name: str = "") -> Optional[Iterable[int]]:
+        """
+        Returns candidate row ids for the conditions using the best available
+        index (hash equality first, then an ordered range scan), or None when
+        no index applies and the caller has to scan.
+        """
+        indexes = table_data.get('indexes', {})
+        by_column = {}
+        for cond in conditions:
+            col = cond['column']
+            if '.' in col:
+                table, col = col.split('.', 1)
+                if table != table_name:
+                    continue
+            if col in indexes:
+                by_column.setdefault(col, []).append(cond)
+
+        for col, conds in by_column.items():
+            idx = indexes[col]
+            if idx['type'] == 'HASH':
+                for cond in conds:
+                    if cond['operator'] == '=':
+                        return IndexManager.search(idx['map'], cond['value'])
+
+        for col, conds in by_column.items():
+            idx = indexes[col]
+            if idx['type'] == 'BTREE':
+                rids = IndexManager.range_search(idx, conds)
+                if rids is not None:
+                    return rids
+        return None
@@ -1,68 +1,199 @@
-
-from typing import List, Dict, Any, Tuple
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from rdbms.indexes import IndexManager
 # from rdbms.executor import Executor -- circular import avoided
 
+# A row: column values in schema order (joined rows: left values, then right)
+Row = Tuple[Any, ...]
+
 class JoinExecutor:
     """
-    Executes JOIN operations (Nested Loop Join).
+    Executes equi-JOIN operations (INNER and LEFT).
+
+    Four algorithms return the same rows: the left row's values followed by
+    the right row's (NULLs for the right side of an unmatched LEFT JOIN row),
+    so joining builds one tuple per output row and never renames columns:
+      - nested loop: compares every pair; cheapest for tiny inputs
+      - index nested loop: probes an existing index on the right join column
+        once per left row, O(L) without touching unmatched right rows
+      - hash join: builds a hash table on the smaller input, O(L + R)
+      - sort-merge join: walks both inputs in join-column order; used when
+        both are already sorted (e.g. read from BTREE indexes)
+    Join values compare like '=' in WHERE (by string form); NULL never matches.
+    Merge join returns rows in join-column order, the others keep the left
+    input's order.
+
+    `join_condition` gives the join columns' row positions: {'left_pos',
+    'right_pos', 'right_width'} (right_width: number of right columns).
+
+    Each algorithm is a generator: joined rows are produced as the left input
+    is consumed, so a cursor reading the result never holds all of it.
+    Inputs that are read more than once (the right side of a nested loop or
+    hash join, both sides of a merge join) must be lists.
     """
-    
+
+    # Up to this many row pairs, a plain nested loop beats building a hash table
+    NESTED_LOOP_MAX_PAIRS = 64
+
+    @staticmethod
+    def join_key(value: Any) -> Optional[str]:
+        return None if value is None else str(value)
+
+    @staticmethod
+    def choose(left_count: int, right_count: int, presorted: bool = False, right_indexed: bool = False) -> str:
+        """
+        Picks a join algorithm from the input sizes. `presorted`: both inputs
+        can be read in join-column order; `right_indexed`: the right join
+        column has an index that can be probed.
+        """
+        if left_count * right_count <= JoinExecutor.NESTED_LOOP_MAX_PAIRS:
+            return 'NESTED_LOOP'
+        if right_indexed and left_count <= right_count:
+            # One probe per left row beats reading every right row
+            return 'INDEX'
+        if presorted:
+            return 'MERGE'
+        return 'HASH'
+
+    @staticmethod
+    def _emit(l_row, matches, null_right, join_type):
+        # Yields the joined rows for one left row (or it NULL-extended for an unmatched LEFT JOIN)
+        if matches:
+            for r_row in matches:
+                yield l_row + r_row
+        elif join_type == 'LEFT':
+            yield l_row + null_right
+
     @staticmethod
     def nested_loop_join(
-            left_rows: List[Dict[str, Any]], 
-            left_table_name: str,
-            right_rows: List[Dict[str, Any]], 
-            right_table_name: str,
+            left_rows: Iterable[Row],
+            right_rows: List[Row],
             join_condition: Dict[str, Any],
             join_type: str = 'INNER'
-    ) -> List[Dict[str, Any]]:
+    ) -> Iterator[Row]:
         """
         Performs a Nested Loop Join.
-        Returns a list of flattened rows with keys 'tablename.colname'.
         """
-        results = []
-        
-        # Parse condition: table1.col = table2.col
-        # condition dict: {'left_col': ..., 'right_col': ...} derived from parser?
-        # Or Just pass the raw condition and evaluate it?
-        # Let's assume parser gives us: left_col, right_col (simple equality join for now)
-        
-        left_key = join_condition['left_col']
-        right_key = join_condition['right_col'] 
-        
-        # Pre-process rows to have "table.col" keys to avoid collisions
-        # This is expensive but necessary for result set
-        processed_left = []
-        for r in left_rows:
-            new_r = {f"{left_table_name}.{k}": v for k, v in r.items()}
-            processed_left.append(new_r)
-            
-        processed_right = []
-        for r in right_rows:
-            new_r = {f"{right_table_name}.{k}": v for k, v in r.items()}
-            processed_right.append(new_r)
-            
-        for l_row in processed_left:
-            matched = False
-            l_val = l_row.get(f"{left_table_name}.{left_key}")
-            
-            for r_row in processed_right:
-                r_val = r_row.get(f"{right_table_name}.{right_key}")
-                
-                # Check match
-                if str(l_val) == str(r_val):
-                    # Merge
-                    merged = {**l_row, **r_row}
-                    results.append(merged)
-                    matched = True
-            
-            if join_type == 'LEFT' and not matched:
-                # Add left row with NULLs for right cols
-                # Need to know right schema or just fill what we can?
-                # Just adding l_row is fine if we handle missing keys as None later, 
-                # but better to explicitly add None for right keys if we knew schema.
-                # For dynamic dicts, just adding l_row is enough, keys from right won't exist.
-                results.append(l_row)
-                
-        return results
+        left_pos = join_condition['left_pos']
+        right_pos = join_condition['right_pos']
+        null_right = (None,) * join_condition['right_width']
+        right_vals = [JoinExecutor.join_key(r[right_pos]) for r in right_rows]
+
+        for l_row in left_rows:
+            l_val = JoinExecutor.join_key(l_row[left_pos])
+            matches = []
+            if l_val is not None:
+                matches = [r_row for r_row, r_val in zip(right_rows, right_vals) if r_val == l_val]
+            yield from JoinExecutor._emit(l_row, matches, null_right, join_type)
+
+    @staticmethod
+    def index_nested_loop_join(
+            left_rows: Iterable[Row],
+            right_rows: Dict[int, Row],
+            right_index: Dict[str, Any],
+            join_condition: Dict[str, Any],
+            join_type: str = 'INNER'
+    ) -> Iterator[Row]:
+        """
+        Performs an Index Nested Loop Join: each left row looks up its matches
+        in `right_index` (an IndexManager index on the right join column) and
+        fetches them from the right table's rows by row id.
+        """
+        left_pos = join_condition['left_pos']
+        null_right = (None,) * join_condition['right_width']
+        for l_row in left_rows:
+            l_val = l_row[left_pos]
+            matches = []
+            if l_val is not None:
+                matches = [right_rows[rid] for rid in IndexManager.find(right_index, l_val)]
+            yield from JoinExecutor._emit(l_row, matches, null_right, join_type)
+
+    @staticmethod
+    def hash_join(
+            left_rows: Iterable[Row],
+            right_rows: List[Row],
+            join_condition: Dict[str, Any],
+            join_type: str = 'INNER',
+            build_left: Optional[bool] = None
+    ) -> Iterator[Row]:
+        """
+        Performs a Hash Join, building the hash table on the smaller input and
+        probing it with the other. Output follows the left input's order.
+        `build_left` overrides the size comparison (which needs a left list);
+        building on the right lets a streamed left input be probed lazily.
+        """
+        left_pos = join_condition['left_pos']
+        right_pos = join_condition['right_pos']
+        null_right = (None,) * join_condition['right_width']
+        key = JoinExecutor.join_key
+        if build_left is None:
+            build_left = len(left_rows) < len(right_rows)
+        if build_left:
+            left_rows = list(left_rows)
+
+        if not build_left:
+            # Build on the right, probe with each left row
+            table: Dict[str, List[Row]] = {}
+            for r_row in right_rows:
+                r_val = key(r_row[right_pos])
+                if r_val is not None:
+                    table.setdefault(r_val, []).append(r_row)
+            matches_for = lambda i, l_row: table.get(key(l_row[left_pos]), ())
+        else:
+            # Build on the left, probe with each right row; collect matches per left row
+            positions: Dict[str, List[int]] = {}
+            for i, l_row in enumerate(left_rows):
+                l_val = key(l_row[left_pos])
+                if l_val is not None:
+                    positions.setdefault(l_val, []).append(i)
+            matched: Dict[int, List[Row]] = {}
+            for r_row in right_rows:
+                for i in positions.get(key(r_row[right_pos]), ()):
+                    matched.setdefault(i, []).append(r_row)
+            matches_for = lambda i, l_row: matched.get(i, ())
+
+        for i, l_row in enumerate(left_rows):
+            yield from JoinExecutor._emit(l_row, matches_for(i, l_row), null_right, join_type)
+
+    @staticmethod
+    def merge_join(
+            left_rows: List[Row],
+            right_rows: List[Row],
+            join_condition: Dict[str, Any],
+            join_type: str = 'INNER',
+            presorted: bool = False
+    ) -> Iterator[Row]:
+        """
+        Performs a Sort-Merge Join. Presorted inputs are compared by value
+        (both join columns must then have the same type); otherwise both
+        sides are sorted by the string form of their join values first.
+        """
+        left_pos = join_condition['left_pos']
+        right_pos = join_condition['right_pos']
+        null_right = (None,) * join_condition['right_width']
+        if presorted:
+            key = lambda v: v
+        else:
+            key = JoinExecutor.join_key
+
+        left = [(key(r[left_pos]), r) for r in left_rows if r[left_pos] is not None]
+        right = [(key(r[right_pos]), r) for r in right_rows if r[right_pos] is not None]
+        if not presorted:
+            left.sort(key=lambda pair: pair[0])
+            right.sort(key=lambda pair: pair[0])
+
+        j = 0
+        for l_val, l_row in left:
+            # Skip right rows below this key; equal keys stay available for the next left row
+            while j < len(right) and right[j][0] < l_val:
+                j += 1
+            k = j
+            matches = []
+            while k < len(right) and right[k][0] == l_val:
+                matches.append(right[k][1])
+                k += 1
+            yield from JoinExecutor._emit(l_row, matches, null_right, join_type)
+
+        if join_type == 'LEFT':
+            for l_row in left_rows:
+                if l_row[left_pos] is None:
+                    yield l_row + null_right
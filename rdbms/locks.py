@@ -0,0 +1,84 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable
+
+class RWLock:
+    """
+    Shared/exclusive lock: any number of readers, or one writer.
+
+    Writers are preferred: once a writer is waiting, new readers wait behind
+    it, so a steady stream of SELECTs cannot starve an UPDATE. Not reentrant;
+    a thread must not acquire a lock it already holds.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    def acquire_shared(self):
+        with self.cond:
+            while self.writer or self.waiting_writers:
+                self.cond.wait()
+            self.readers += 1
+
+    def release_shared(self):
+        with self.cond:
+            self.readers -= 1
+            if not self.readers:
+                self.cond.notify_all()
+
+    def acquire_exclusive(self):
+        with self.cond:
+            self.waiting_writers += 1
+            try:
+                while self.writer or self.readers:
+                    self.cond.wait()
+            finally:
+                self.waiting_writers -= 1
+            self.writer = True
+
+    def release_exclusive(self):
+        with self.cond:
+            self.writer = False
+            self.cond.notify_all()
+
+
+class LockManager:
+    """
+    Per-table shared/exclusive locks, held by the executor for a whole
+    statement: SELECTs share their tables, writes take their table
+    exclusively. A statement acquires all its locks at once, in table-name
+    order, so two statements can never wait on each other in a cycle.
+    """
+
+    def __init__(self):
+        self.guard = threading.Lock()
+        self.locks: Dict[str, RWLock] = {}
+
+    def get(self, table_name: str) -> RWLock:
+        with self.guard:
+            lock = self.locks.get(table_name)
+            if lock is None:
+                lock = self.locks[table_name] = RWLock()
+            return lock
+
+    @contextmanager
+    def hold(self, shared: Iterable[str] = (), exclusive: Iterable[str] = ()):
+        """Holds shared locks on `shared` and exclusive ones on `exclusive` (which wins for a table in both)."""
+        exclusive = set(exclusive)
+        held = []
+        try:
+            for name in sorted(exclusive.union(shared)):
+                lock = self.get(name)
+                if name in exclusive:
+                    lock.acquire_exclusive()
+                    held.append(lock.release_exclusive)
+                else:
+                    lock.acquire_shared()
+                    held.append(lock.release_shared)
+            yield
+        finally:
+            for release in reversed(held):
+                release()
@@ -0,0 +1,261 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from rdbms.indexes import IndexManager
+
+Row = Tuple[Any, ...]
+
+
+class VersionStore:
+    """
+    Commit timestamps and old row versions for multi-version concurrency
+    control. Owned by the storage manager; every method expects the caller
+    to hold its commit_lock.
+
+    Each commit (an autocommitted statement or a COMMIT) gets the next
+    timestamp from `clock`. A transaction's snapshot is the clock value when
+    it began: it sees every commit up to that timestamp and none after.
+
+    Shared tables only ever hold the latest committed rows. While snapshots
+    are open, a commit first keeps the images of the rows it replaces in
+    table_data['versions']: {rid: [(commit_ts, row before that commit), ...]}
+    (None where the row did not exist yet). Versions no open snapshot can
+    read are dropped, and all of them once the last snapshot ends. Tables
+    holding versions, or read by an open transaction, stay pinned in the
+    buffer pool.
+    """
+
+    def __init__(self):
+        self.clock = 0
+        # Open snapshots by timestamp
+        self.snapshots: Counter = Counter()
+        # Tables holding old versions
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        # Tables read by open transactions
+        self.in_use: Counter = Counter()
+
+    def begin(self) -> int:
+        """Opens a snapshot of everything committed so far and returns its timestamp."""
+        self.snapshots[self.clock] += 1
+        return self.clock
+
+    def end(self, ts: int, tables: Iterable[str]):
+        """Closes a snapshot opened by begin() and unpins the tables its transaction read."""
+        self.snapshots[ts] -= 1
+        if not self.snapshots[ts]:
+            del self.snapshots[ts]
+        self.release(tables)
+        if not self.snapshots:
+            # Nobody can read an old version any more
+            for data in self.tables.values():
+                data.pop('versions', None)
+            self.tables.clear()
+
+    def use(self, table_name: str):
+        """Pins a table a transaction is about to read, so it keeps reading the one shared copy."""
+        self.in_use[table_name] += 1
+
+    def release(self, tables: Iterable[str]):
+        for name in tables:
+            self.in_use[name] -= 1
+            if not self.in_use[name]:
+                del self.in_use[name]
+
+    def pinned(self, table_name: str) -> bool:
+        return table_name in self.tables or table_name in self.in_use
+
+    def keep(self, table_name: str, data: Dict[str, Any], changes: List[List[Any]], ts: int):
+        """
+        Before the commit at `ts` applies `changes` to `data`, keeps the row
+        images they replace for the open snapshots (nothing if there are none).
+        """
+        if not self.snapshots:
+            return
+        oldest = min(self.snapshots)
+        self.tables[table_name] = data
+        versions = data.setdefault('versions', {})
+        rows = data['rows']
+        for change in changes:
+            if change[0] not in ('I', 'U', 'D'):
+                continue
+            rid = change[2]
+            chain = versions.get(rid)
+            if chain is None:
+                versions[rid] = [(ts, rows.get(rid))]
+                continue
+            if chain[-1][0] == ts:
+                # Changed twice in one commit: the image before the first change is the version
+                continue
+            # Versions replaced before the oldest snapshot began are visible to no one
+            while chain and chain[0][0] <= oldest:
+                chain.pop(0)
+            chain.append((ts, rows.get(rid)))
+
+    @staticmethod
+    def visible(data: Dict[str, Any], rid: int, ts: int) -> Optional[Row]:
+        """The row `rid` as of snapshot `ts`, or None if it did not exist then."""
+        chain = data.get('versions', {}).get(rid)
+        if chain and chain[-1][0] > ts:
+            # The first commit after the snapshot replaced the version it sees
+            for commit_ts, row in chain:
+                if commit_ts > ts:
+                    return row
+        return data['rows'].get(rid)
+
+    @staticmethod
+    def changed_since(data: Dict[str, Any], rid: int, ts: int) -> bool:
+        """True if a commit after snapshot `ts` changed the row `rid`."""
+        chain = data.get('versions', {}).get(rid)
+        return bool(chain) and chain[-1][0] > ts
+
+
+class SnapshotRows:
+    """
+    A table's rows as one transaction sees them: committed as of its snapshot,
+    overlaid with its own uncommitted writes. Read like the rows dict of
+    ordinary table data (get, [], in, len, iteration, items, values); nothing
+    is copied.
+
+    Shared indexes describe the latest committed rows, so an index lookup on
+    a view must also consider the rows the transaction wrote and those other
+    transactions changed since its snapshot (see candidates()). The
+    transaction's writes are kept by column value, so a lookup on a value
+    only checks the writes holding it.
+    """
+
+    def __init__(self, data: Dict[str, Any], ts: int):
+        self.data = data
+        self.ts = ts
+        # rid -> row written by the transaction (None: deleted)
+        self.writes: Dict[int, Optional[Row]] = {}
+        # Written rows the transaction inserted itself
+        self.inserted: Set[int] = set()
+        # Written rows by index key, for every column (position -> key -> rids)
+        self.keyed: Dict[int, Dict[str, Set[int]]] = {pos: {} for pos in range(len(data['meta'].columns))}
+
+    def get(self, rid: int, default=None) -> Optional[Row]:
+        if rid in self.writes:
+            row = self.writes[rid]
+        else:
+            row = VersionStore.visible(self.data, rid, self.ts)
+        return default if row is None else row
+
+    def __getitem__(self, rid: int) -> Row:
+        row = self.get(rid)
+        if row is None:
+            raise KeyError(rid)
+        return row
+
+    def __contains__(self, rid: int) -> bool:
+        return self.get(rid) is not None
+
+    def committed_since(self) -> Set[int]:
+        """Row ids other transactions changed after the snapshot."""
+        return {rid for rid, chain in self.data.get('versions', {}).items() if chain[-1][0] > self.ts}
+
+    def changed(self) -> Set[int]:
+        """Row ids whose row here may differ from the shared table's."""
+        changed = self.committed_since()
+        changed.update(self.writes)
+        return changed
+
+    def has_changes(self) -> bool:
+        return bool(self.writes) or any(chain[-1][0] > self.ts for chain in self.data.get('versions', {}).values())
+
+    def candidates(self, rids: Iterable[int], equal: Optional[Tuple[int, Any]] = None) -> List[int]:
+        """
+        Row ids to check for a lookup whose shared index found `rids`: those,
+        plus the rows that may differ here. `equal`, the (position, value) of
+        an equality every match satisfies, narrows the transaction's own
+        writes to those holding that value.
+        """
+        extra = self.committed_since()
+        if equal is None:
+            extra.update(self.writes)
+        else:
+            pos, value = equal
+            extra.update(self.keyed[pos].get(IndexManager.key(value), ()))
+        return [rid for rid in rids if rid not in extra] + sorted(extra)
+
+    def __iter__(self):
+        base = self.data['rows']
+        changed = self.changed()
+        if not changed:
+            return iter(base)
+        return self._merged(base, changed)
+
+    def _merged(self, base, changed):
+        for rid in base:
+            if rid not in changed or self.get(rid) is not None:
+                yield rid
+        # Rows deleted since the snapshot, and the transaction's own inserts
+        for rid in sorted(changed.difference(base)):
+            if self.get(rid) is not None:
+                yield rid
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        if not self.writes and not self.data.get('versions'):
+            return iter(self.data['rows'].values())
+        return (self[rid] for rid in self)
+
+    def items(self):
+        if not self.writes and not self.data.get('versions'):
+            return iter(self.data['rows'].items())
+        return ((rid, self[rid]) for rid in self)
+
+    def __len__(self) -> int:
+        base = self.data['rows']
+        count = len(base)
+        for rid in self.changed():
+            count += (self.get(rid) is not None) - (rid in base)
+        return count
+
+    def write(self, rid: int, row: Optional[Row], inserted: bool = False):
+        """Records the transaction's new image of `rid` (None: deleted); `inserted` for a row it adds."""
+        self._unindex(rid)
+        self.writes[rid] = row
+        self._index(rid, row)
+        if inserted:
+            self.inserted.add(rid)
+
+    def undo_entry(self, rid: int) -> tuple:
+        """What restore() needs to undo the writes of `rid` that follow."""
+        return rid, rid in self.writes, self.writes.get(rid), rid in self.inserted
+
+    def restore(self, rid: int, written: bool, row: Optional[Row], inserted: bool):
+        """Puts `rid` back as an undo_entry() recorded it, undoing the writes since."""
+        self._unindex(rid)
+        if written:
+            self.writes[rid] = row
+            self._index(rid, row)
+        else:
+            self.writes.pop(rid, None)
+        if not inserted:
+            self.inserted.discard(rid)
+
+    def _index(self, rid: int, row: Optional[Row]):
+        if row is None:
+            return
+        for pos, by_key in self.keyed.items():
+            if row[pos] is not None:
+                by_key.setdefault(IndexManager.key(row[pos]), set()).add(rid)
+
+    def _unindex(self, rid: int):
+        row = self.writes.get(rid)
+        if row is None:
+            return
+        for pos, by_key in self.keyed.items():
+            if row[pos] is not None:
+                by_key.get(IndexManager.key(row[pos]), set()).discard(rid)
+
+    def unique_holders(self, pos: int, value: Any, committed: Iterable[int]) -> List[int]:
+        """
+        Rows holding `value` in the UNIQUE column at `pos`: the committed
+        holders found in the shared index, except rows the transaction has
+        rewritten, plus the rows it wrote with that value.
+        """
+        holders = [rid for rid in committed if rid not in self.writes]
+        holders.extend(self.keyed[pos].get(IndexManager.key(value), ()))
+        return holders
@@ -0,0 +1,344 @@
+import json
+import os
+import struct
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from rdbms.storage import StorageManager
+from rdbms.indexes import IndexManager
+
+PAGE_SIZE = 4096
+
+# Header page: magic, format version, page size, page count, catalog length; then the catalog JSON
+HEADER = struct.Struct('<4sHIII')
+MAGIC = b'PYDB'
+VERSION = 1
+
+# Data page: slot count and the offset where row data starts (data grows down from the end)
+PAGE_HEADER = struct.Struct('<HH')
+# Slot directory entry: offset and length of a record (length 0 = free slot)
+SLOT = struct.Struct('<HH')
+
+# Value tags in the record encoding
+T_NULL, T_INT, T_STR, T_TRUE, T_FALSE, T_FLOAT, T_BIGINT = range(7)
+INT64 = struct.Struct('<q')
+FLOAT64 = struct.Struct('<d')
+LEN16 = struct.Struct('<H')
+
+# Largest record a page can hold: an empty page less its header and one slot
+MAX_RECORD = PAGE_SIZE - PAGE_HEADER.size - SLOT.size
+
+
+def _length(raw: bytes) -> bytes:
+    if len(raw) > 0xFFFF:
+        raise ValueError(f"Value of {len(raw)} bytes is too large for a {PAGE_SIZE}-byte page.")
+    return LEN16.pack(len(raw))
+
+
+def encode_row(rid: int, row: Tuple[Any, ...]) -> bytes:
+    """
+    Record format: rid (int64) followed by one tagged value per column.
+    Raises ValueError for a row too large to fit in one page.
+    """
+    out = [INT64.pack(rid)]
+    for val in row:
+        if val is None:
+            out.append(b'\x00')
+        elif val is True:
+            out.append(b'\x03')
+        elif val is False:
+            out.append(b'\x04')
+        elif isinstance(val, int):
+            if -2**63 <= val < 2**63:
+                out.append(b'\x01' + INT64.pack(val))
+            else:
+                raw = str(val).encode()
+                out.append(b'\x06' + _length(raw) + raw)
+        elif isinstance(val, float):
+            out.append(b'\x05' + FLOAT64.pack(val))
+        else:
+            raw = str(val).encode('utf-8')
+            out.append(b'\x02' + _length(raw) + raw)
+    rec = b''.join(out)
+    if len(rec) > MAX_RECORD:
+        raise ValueError(f"Row of {len(rec)} bytes is too large for a {PAGE_SIZE}-byte page.")
+    return rec
+
+
+def decode_row(buf: bytes, width: int) -> Tuple[int, Tuple[Any, ...]]:
+    rid = INT64.unpack_from(buf, 0)[0]
+    pos = 8
+    row = []
+    for _ in range(width):
+        tag = buf[pos]
+        pos += 1
+        if tag == T_NULL:
+            row.append(None)
+        elif tag == T_INT:
+            row.append(INT64.unpack_from(buf, pos)[0])
+            pos += 8
+        elif tag == T_TRUE:
+            row.append(True)
+        elif tag == T_FALSE:
+            row.append(False)
+        elif tag == T_FLOAT:
+            row.append(FLOAT64.unpack_from(buf, pos)[0])
+            pos += 8
+        else:
+            length = LEN16.unpack_from(buf, pos)[0]
+            pos += 2
+            raw = bytes(buf[pos:pos + length])
+            pos += length
+            row.append(int(raw) if tag == T_BIGINT else raw.decode('utf-8'))
+    return rid, tuple(row)
+
+
+class Page:
+    """
+    A slotted data page. The slot directory grows from the front, record bytes
+    from the back; deleted slots keep their number so other rows never move.
+    """
+
+    def __init__(self, buf: Optional[bytearray] = None):
+        if buf is None:
+            buf = bytearray(PAGE_SIZE)
+            PAGE_HEADER.pack_into(buf, 0, 0, PAGE_SIZE)
+        self.buf = buf
+
+    @property
+    def slot_count(self) -> int:
+        return PAGE_HEADER.unpack_from(self.buf, 0)[0]
+
+    def _slot(self, slot: int) -> Tuple[int, int]:
+        return SLOT.unpack_from(self.buf, PAGE_HEADER.size + slot * SLOT.size)
+
+    def _set_slot(self, slot: int, offset: int, length: int):
+        SLOT.pack_into(self.buf, PAGE_HEADER.size + slot * SLOT.size, offset, length)
+
+    def records(self):
+        """Yields (slot, record bytes) for every live slot, in slot order."""
+        for slot in range(self.slot_count):
+            offset, length = self._slot(slot)
+            if length:
+                yield slot, self.buf[offset:offset + length]
+
+    def get(self, slot: int) -> bytes:
+        offset, length = self._slot(slot)
+        return self.buf[offset:offset + length]
+
+    def _free_space(self, new_slot: bool) -> int:
+        slot_count, free_end = PAGE_HEADER.unpack_from(self.buf, 0)
+        directory_end = PAGE_HEADER.size + (slot_count + new_slot) * SLOT.size
+        return free_end - directory_end
+
+    def _reclaimable(self, new_slot: bool) -> int:
+        slot_count = self.slot_count
+        live = sum(self._slot(s)[1] for s in range(slot_count))
+        directory_end = PAGE_HEADER.size + (slot_count + new_slot) * SLOT.size
+        return PAGE_SIZE - directory_end - live
+
+    def compact(self):
+        """Moves live records together at the end of the page, keeping slot numbers."""
+        slot_count = self.slot_count
+        live = [(s, bytes(self.get(s))) for s in range(slot_count) if self._slot(s)[1]]
+        free_end = PAGE_SIZE
+        for slot, rec in live:
+            free_end -= len(rec)
+            self.buf[free_end:free_end + len(rec)] = rec
+            self._set_slot(slot, free_end, len(rec))
+        PAGE_HEADER.pack_into(self.buf, 0, slot_count, free_end)
+
+    def _write_record(self, rec: bytes) -> int:
+        slot_count, free_end = PAGE_HEADER.unpack_from(self.buf, 0)
+        free_end -= len(rec)
+        self.buf[free_end:free_end + len(rec)] = rec
+        PAGE_HEADER.pack_into(self.buf, 0, slot_count, free_end)
+        return free_end
+
+    def insert(self, rec: bytes) -> Optional[int]:
+        """Stores rec in a free or new slot; returns the slot or None if it doesn't fit."""
+        slot_count = self.slot_count
+        free_slot = next((s for s in range(slot_count) if self._slot(s)[1] == 0), None)
+        new_slot = free_slot is None
+        if self._free_space(new_slot) < len(rec):
+            if self._reclaimable(new_slot) < len(rec):
+                return None
+            self.compact()
+        offset = self._write_record(rec)
+        if new_slot:
+            free_slot = slot_count
+            _, free_end = PAGE_HEADER.unpack_from(self.buf, 0)
+            PAGE_HEADER.pack_into(self.buf, 0, slot_count + 1, free_end)
+        self._set_slot(free_slot, offset, len(rec))
+        return free_slot
+
+    def replace(self, slot: int, rec: bytes) -> bool:
+        """Overwrites a record in place; False if the page can't hold the new size."""
+        offset, length = self._slot(slot)
+        if len(rec) <= length:
+            self.buf[offset:offset + len(rec)] = rec
+            self._set_slot(slot, offset, len(rec))
+            return True
+        self._set_slot(slot, 0, 0)
+        if self._free_space(False) < len(rec):
+            if self._reclaimable(False) < len(rec):
+                self._set_slot(slot, offset, length)
+                return False
+            self.compact()
+        self._set_slot(slot, self._write_record(rec), len(rec))
+        return True
+
+    def delete(self, slot: int):
+        self._set_slot(slot, 0, 0)
+
+
+class TableFile:
+    """
+    In-memory image of one table file: its pages and where each row id lives.
+    """
+
+    def __init__(self, catalog: Dict[str, Any], pages: List[Optional[Page]]):
+        self.catalog = catalog
+        self.pages = pages  # pages[0] is the header page, kept as None
+        self.pages_on_disk = len(pages)
+        self.locations: Dict[int, Tuple[int, int]] = {}
+
+
+class PageStorageManager(StorageManager):
+    """
+    Binary storage engine: each table is a file of fixed-size slotted pages.
+    Writing a table re-encodes rows but only writes the pages whose bytes
+    changed, so checkpointing a one-row INSERT touches the tail page instead
+    of rewriting the whole table. Index entries are not stored; they are
+    rebuilt from the catalog on load.
+    """
+
+    def __init__(self, data_dir: str = "data", **kwargs):
+        super().__init__(data_dir, **kwargs)
+        self.files: Dict[str, TableFile] = {}
+        self.stats = {'pages_written': 0}
+
+    def _path(self, table_name: str) -> str:
+        return os.path.join(self.data_dir, f"{table_name}.db")
+
+    def _header(self, catalog: Dict[str, Any], page_count: int) -> bytes:
+        raw = json.dumps(catalog).encode('utf-8')
+        if HEADER.size + len(raw) > PAGE_SIZE:
+            raise ValueError("Table catalog does not fit in the header page.")
+        buf = bytearray(PAGE_SIZE)
+        HEADER.pack_into(buf, 0, MAGIC, VERSION, PAGE_SIZE, page_count, len(raw))
+        buf[HEADER.size:HEADER.size + len(raw)] = raw
+        return bytes(buf)
+
+    def _read_file(self, table_name: str) -> Dict[str, Any]:
+        """Reads a table file and keeps its page images for later saves. Caller holds the lock."""
+        filepath = self._path(table_name)
+        if not os.path.exists(filepath):
+            raise ValueError(f"Table {table_name} does not exist.")
+
+        with open(filepath, 'rb') as f:
+            header = f.read(PAGE_SIZE)
+            magic, version, page_size, page_count, catalog_len = HEADER.unpack_from(header, 0)
+            if magic != MAGIC or page_size != PAGE_SIZE:
+                raise ValueError(f"Table {table_name} is not a page file.")
+            catalog = json.loads(header[HEADER.size:HEADER.size + catalog_len])
+            pages = [None] + [Page(bytearray(f.read(PAGE_SIZE))) for _ in range(page_count - 1)]
+
+        table_file = TableFile(catalog, pages)
+        width = len(catalog['schema'])
+        rows = {}
+        for page_no in range(1, page_count):
+            for slot, rec in pages[page_no].records():
+                rid, row = decode_row(rec, width)
+                rows[rid] = row
+                table_file.locations[rid] = (page_no, slot)
+        self.files[table_name] = table_file
+
+        return {
+            'schema': catalog['schema'],
+            'rows': rows,
+            'indexes': catalog.get('indexes', {}),
+            # Row ids are stored in the records, so new ones continue after the largest
+            'next_rid': max(rows, default=-1) + 1,
+            'lsn': catalog.get('lsn', 0)
+        }
+
+    def _write_file(self, table_name: str, data: Dict[str, Any]):
+        """Writes only the pages whose contents changed. Caller holds the lock."""
+        table_file = self.files.get(table_name)
+        if table_file is None:
+            self._read_file(table_name)
+            table_file = self.files[table_name]
+
+        pages = table_file.pages
+        locations = table_file.locations
+        dirty = set()
+
+        live = data['rows']
+        # Encode every row before touching the page images, so a failure leaves them as they were
+        records = [(rid, encode_row(rid, row)) for rid, row in live.items()]
+
+        for rid in [rid for rid in locations if rid not in live]:
+            page_no, slot = locations.pop(rid)
+            pages[page_no].delete(slot)
+            dirty.add(page_no)
+
+        for rid, rec in records:
+            loc = locations.get(rid)
+            if loc is not None:
+                page_no, slot = loc
+                if pages[page_no].get(slot) == rec:
+                    continue
+                dirty.add(page_no)
+                if pages[page_no].replace(slot, rec):
+                    continue
+                pages[page_no].delete(slot)
+            # New row (or one that outgrew its page): append at the tail page
+            page_no = len(pages) - 1
+            slot = pages[page_no].insert(rec) if page_no > 0 else None
+            if slot is None:
+                pages.append(Page())
+                page_no = len(pages) - 1
+                slot = pages[page_no].insert(rec)
+            locations[rid] = (page_no, slot)
+            dirty.add(page_no)
+
+        catalog = {
+            'schema': data['schema'],
+            'indexes': IndexManager.definitions(data.get('indexes', {})),
+            'lsn': data.get('lsn', 0)
+        }
+        header_changed = catalog != table_file.catalog or len(pages) != table_file.pages_on_disk
+
+        with open(self._path(table_name), 'r+b') as f:
+            for page_no in sorted(dirty):
+                f.seek(page_no * PAGE_SIZE)
+                f.write(pages[page_no].buf)
+            if header_changed:
+                f.seek(0)
+                f.write(self._header(catalog, len(pages)))
+            if self.sync:
+                f.flush()
+                os.fsync(f.fileno())
+        table_file.catalog = catalog
+        table_file.pages_on_disk = len(pages)
+        self.stats['pages_written'] += len(dirty) + header_changed
+
+    def check_rows(self, rows: Iterable[Tuple[Any, ...]]):
+        for row in rows:
+            encode_row(0, row)
+
+    def _create_file(self, table_name: str, schema: Dict[str, str], indexes: Dict[str, Any], lsn: int):
+        catalog = {'schema': schema, 'indexes': indexes, 'lsn': lsn}
+        header = self._header(catalog, 1)
+        self._write_atomic(self._path(table_name), lambda f: f.write(header), 'wb')
+        self.files.pop(table_name, None)
+
+    def drop_table(self, table_name: str):
+        super().drop_table(table_name)
+        self.files.pop(table_name, None)
+
+    def _evicted(self, table_name: str):
+        # Page images are re-read with the rows on the next load
+        self.files.pop(table_name, None)
+
+    def _list_files(self) -> List[str]:
+        return [f[:-3] for f in os.listdir(self.data_dir) if f.endswith(".db")]
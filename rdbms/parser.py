@@ -1,46 +1,252 @@
 
 import re
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
 
+class Parameter:
+    """
+    A placeholder for a value in a parsed statement: ':name' (named) or
+    '?' / '?N' (positional, numbered from 1 in order of appearance).
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Parameter) and other.name == self.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __repr__(self):
+        return f"Parameter({self.name!r})"
+
+
 class SQLParser:
     """
     Parses simplified SQL commands into a structured dictionary (AST).
+
+    Statements are dispatched on their first keyword, so each is matched
+    against only the patterns for its kind. Parsed ASTs are kept in an LRU
+    cache keyed by the normalized statement text (see normalize()), so an
+    application repeating the same statements parses each once, however it
+    spaces them. Cached ASTs are shared between callers and must not be
+    modified.
+
+    Values may be given as placeholders ('?', '?N' or ':name') in INSERT
+    values, SET values, WHERE conditions and LIMIT / OFFSET; they are parsed
+    into Parameter objects and replaced with values by bind(), so a
+    statement is parsed once and run with any number of value sets. The AST
+    of a statement with placeholders lists their names under 'parameters'.
     """
 
     # Regex patterns for tokens
     PATTERNS = {
         'CREATE': r'^\s*CREATE\s+TABLE\s+(\w+)\s*\((.+)\)',
-        'INSERT': r'^\s*INSERT\s+INTO\s+(\w+)\s+VALUES\s*\((.+)\)',
-        'SELECT': r'^\s*SELECT\s+(.+)\s+FROM\s+(\w+)(?:\s+WHERE\s+(.+))?',
+        'INSERT': r'(?s)^\s*INSERT\s+INTO\s+(\w+)\s+VALUES\s*(\(.+\))\s*$',
+        'SELECT': r'^\s*SELECT\s+(.+)\s+FROM\s+(\w+)(?:\s+(INNER|LEFT)?\s*JOIN\s+(\w+)\s+ON\s+(.+))?',
         'UPDATE': r'^\s*UPDATE\s+(\w+)\s+SET\s+(.+?)\s+WHERE\s+(.+)',
         'DELETE': r'^\s*DELETE\s+FROM\s+(\w+)\s+WHERE\s+(.+)',
-        'BEGIN': r'^\s*BEGIN',
-        'COMMIT': r'^\s*COMMIT',
-        'ROLLBACK': r'^\s*ROLLBACK',
-        'CREATE_INDEX': r'^\s*CREATE\s+INDEX\s+ON\s+(\w+)\s*\(\s*(\w+)\s*\)',
-        'DROP_INDEX': r'^\s*DROP\s+INDEX\s+ON\s+(\w+)\s*\(\s*(\w+)\s*\)'
+        'BEGIN': r'^\s*BEGIN\s*$',
+        'COMMIT': r'^\s*COMMIT\s*$',
+        'ROLLBACK': r'^\s*ROLLBACK\s*$',
+        'SAVEPOINT': r'^\s*SAVEPOINT\s+(\w+)\s*$',
+        'ROLLBACK_TO': r'^\s*ROLLBACK\s+TO\s+(?:SAVEPOINT\s+)?(\w+)\s*$',
+        'RELEASE': r'^\s*RELEASE\s+(?:SAVEPOINT\s+)?(\w+)\s*$',
+        'CREATE_INDEX': r'^\s*CREATE\s+INDEX\s+ON\s+(\w+)\s*\(\s*(\w+)\s*\)(?:\s+USING\s+(\w+))?',
+        'DROP_INDEX': r'^\s*DROP\s+INDEX\s+ON\s+(\w+)\s*\(\s*(\w+)\s*\)',
+        'LIMIT': r'\s+LIMIT\s+(\d+|\?\d*|:\w+)(?:\s+OFFSET\s+(\d+|\?\d*|:\w+))?\s*$',
+        'ORDER_BY': r'\s+ORDER\s+BY\s+([\w.]+(?:\s*\([^)]*\))?)(?:\s+(ASC|DESC))?\s*$',
+        'GROUP_BY': r'\s+GROUP\s+BY\s+([\w.]+(?:\s*,\s*[\w.]+)*)\s*$',
+        'AGGREGATE': r'^(COUNT|SUM|MIN|MAX|AVG)\s*\(\s*(\*|[\w.]+)\s*\)$',
+        'KEYWORD': r'^\s*(\w+)',
+        'WHERE': r'\s+WHERE\s+',
+        'AND': r'\s+AND\s+',
+        # Order matters: check >=, <=, != before >, <, =
+        'OPERATOR': r'(>=|<=|!=|=|>|<)',
+        # Bare '?' outside string literals (which are matched to be skipped)
+        'POSITIONAL': r"'[^']*'|\?(?!\d)",
+        'PARAMETER': r'^(?:\?(\d+)|:(\w+))$',
+        # Characters that delimit list items, with string literals skipped whole
+        'LIST': r"'[^']*'|[(),]",
+        # Tokens normalize() rewrites, with string literals skipped whole
+        'NORMALIZE': r"('[^']*')|\s+",
+    }
+    # Compiled once, shared by every parser
+    REGEX = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in PATTERNS.items()}
+
+    # Statements parsed per first keyword
+    STATEMENTS = {
+        'CREATE': '_parse_create',
+        'DROP': '_parse_drop_index',
+        'INSERT': '_parse_insert',
+        'SELECT': '_parse_select',
+        'UPDATE': '_parse_update',
+        'DELETE': '_parse_delete',
+        'BEGIN': '_parse_transaction',
+        'COMMIT': '_parse_transaction',
+        'ROLLBACK': '_parse_transaction',
+        'SAVEPOINT': '_parse_transaction',
+        'RELEASE': '_parse_transaction',
     }
 
+    def __init__(self, cache_size: int = 256):
+        # Most parsed statements kept; 0 disables the cache
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
     def parse(self, sql: str) -> Dict[str, Any]:
         sql = sql.strip().replace(';', '')
-        
+        with self.lock:
+            # Text already in normal form (the usual case) skips normalizing
+            key = sql if sql in self.cache else None
+        if key is None:
+            key = self.normalize(sql)
+        with self.lock:
+            ast = self.cache.get(key)
+            if ast is not None:
+                self.cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return ast
+            self.stats['misses'] += 1
+
+        ast = self._parse(self._number_placeholders(sql))
+        parameters = self.parameters(ast)
+        if parameters:
+            ast['parameters'] = parameters
+        if self.cache_size > 0:
+            with self.lock:
+                self.cache[key] = ast
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+                    self.stats['evictions'] += 1
+        return ast
+
+    @classmethod
+    def normalize(cls, sql: str) -> str:
+        """
+        Cache key for a statement: runs of whitespace outside string literals
+        collapsed to one space. Case is kept: an unquoted word may be a value
+        or identifier whose case matters, not a keyword.
+        """
+        return cls.REGEX['NORMALIZE'].sub(lambda match: match.group(1) or ' ', sql)
+
+    def hit_rate(self) -> float:
+        """Fraction of parse() calls answered from the cache."""
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+
+    def _number_placeholders(self, sql: str) -> str:
+        # 'a = ? AND b = ?' -> 'a = ?1 AND b = ?2', so the rest of the parser sees numbered placeholders
+        if '?' not in sql:
+            return sql
+        count = 0
+
+        def number(match):
+            nonlocal count
+            if match.group(0) != '?':
+                return match.group(0)
+            count += 1
+            return f"?{count}"
+        return self.REGEX['POSITIONAL'].sub(number, sql)
+
+    @staticmethod
+    def parameters(ast: Any) -> List[Any]:
+        """Names of the placeholders in an AST: positions ('?') in order, then names (':name')."""
+        found = []
+
+        def walk(node):
+            if isinstance(node, Parameter):
+                if node.name not in found:
+                    found.append(node.name)
+            elif isinstance(node, dict):
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+        walk(ast)
+        return sorted(p for p in found if isinstance(p, int)) + [p for p in found if isinstance(p, str)]
+
+    @staticmethod
+    def bind(ast: Dict[str, Any], params: Any) -> Dict[str, Any]:
+        """
+        Returns a copy of the AST with its placeholders replaced by values:
+        `params` is a sequence for positional placeholders or a mapping for
+        named ones. The cached AST itself is left untouched.
+        """
+        if isinstance(params, dict):
+            values = params
+        else:
+            values = {i: value for i, value in enumerate(params, 1)}
+
+        def substitute(node):
+            if isinstance(node, Parameter):
+                if node.name not in values:
+                    raise ValueError(f"No value bound for parameter {node.name}")
+                return values[node.name]
+            if isinstance(node, dict):
+                return {key: substitute(value) for key, value in node.items()}
+            if isinstance(node, list):
+                return [substitute(value) for value in node]
+            return node
+
+        names = ast.get('parameters', [])
+        if len(values) != len(names):
+            raise ValueError(f"Statement takes {len(names)} parameters, {len(values)} given")
+        bound = substitute(ast)
+        bound.pop('parameters', None)
+        return bound
+
+    def _parse(self, sql: str) -> Dict[str, Any]:
+        keyword = self.REGEX['KEYWORD'].match(sql)
+        handler = self.STATEMENTS.get(keyword.group(1).upper()) if keyword else None
+        ast = getattr(self, handler)(sql) if handler else None
+        if ast is None:
+            raise ValueError(f"Syntax error or unsupported command: {sql}")
+        return ast
+
+    def _parse_create(self, sql: str) -> Optional[Dict[str, Any]]:
         # CREATE TABLE
-        match = re.match(self.PATTERNS['CREATE'], sql, re.IGNORECASE)
+        match = self.REGEX['CREATE'].match(sql)
         if match:
             table_name = match.group(1)
             schema_str = match.group(2)
             schema = self._parse_schema(schema_str)
             return {'type': 'CREATE_TABLE', 'table': table_name, 'schema': schema}
 
-        # INSERT
-        match = re.match(self.PATTERNS['INSERT'], sql, re.IGNORECASE)
+        # CREATE INDEX
+        match = self.REGEX['CREATE_INDEX'].match(sql)
+        if match:
+            index_type = (match.group(3) or 'HASH').upper()
+            return {'type': 'CREATE_INDEX', 'table': match.group(1), 'column': match.group(2), 'index_type': index_type}
+        return None
+
+    def _parse_drop_index(self, sql: str) -> Optional[Dict[str, Any]]:
+        match = self.REGEX['DROP_INDEX'].match(sql)
+        if match:
+            return {'type': 'DROP_INDEX', 'table': match.group(1), 'column': match.group(2)}
+        return None
+
+    def _parse_insert(self, sql: str) -> Optional[Dict[str, Any]]:
+        # VALUES (...)[, (...) ...]: one row per parenthesized list
+        match = self.REGEX['INSERT'].match(sql)
         if match:
             table_name = match.group(1)
-            values_str = match.group(2)
-            values = self._parse_values(values_str)
-            return {'type': 'INSERT', 'table': table_name, 'values': values}
+            rows = []
+            for item in self._split_list(match.group(2)):
+                item = item.strip()
+                if not (item.startswith('(') and item.endswith(')')):
+                    return None
+                rows.append(self._parse_values(item[1:-1]))
+            return {'type': 'INSERT', 'table': table_name, 'rows': rows}
+        return None
 
-        # SELECT
+    def _parse_select(self, sql: str) -> Optional[Dict[str, Any]]:
         # Logic: Split WHERE clause first for robustness
         
         # 1. Extract WHERE 
@@ -48,65 +254,99 @@ class SQLParser:
         # A simple split by " WHERE " (case insensitive) might be safe enough for this simplified SQL.
         # But be careful about values containing " WHERE ". assuming simple SQL.
         
+        # 0. Trailing [GROUP BY cols] [ORDER BY col [ASC|DESC]] [LIMIT n [OFFSET m]]
+        limit, offset = None, 0
+        order_by = None
+        group_by = []
+        limit_match = self.REGEX['LIMIT'].search(sql)
+        if limit_match:
+            limit = self._clean_value(limit_match.group(1))
+            offset = self._clean_value(limit_match.group(2) or '0')
+            sql = sql[:limit_match.start()]
+
+        # ORDER BY comes before the LIMIT
+        order_match = self.REGEX['ORDER_BY'].search(sql)
+        if order_match:
+            order_by = {
+                'column': self._select_item(order_match.group(1))[0],
+                'descending': (order_match.group(2) or '').upper() == 'DESC'
+            }
+            sql = sql[:order_match.start()]
+
+        # GROUP BY comes before the ORDER BY
+        group_match = self.REGEX['GROUP_BY'].search(sql)
+        if group_match:
+            group_by = [c.strip() for c in group_match.group(1).split(',')]
+            sql = sql[:group_match.start()]
+
         where_clause = None
         sql_base = sql
         
         # Case insensitive split
-        params = re.split(r'\s+WHERE\s+', sql, flags=re.IGNORECASE, maxsplit=1)
+        params = self.REGEX['WHERE'].split(sql, maxsplit=1)
         if len(params) > 1:
             sql_base = params[0]
             where_clause = params[1]
             
         # 2. Match Base: SELECT cols FROM table [JOIN ...]
         # Note: INNER|LEFT group is optional.
-        base_pattern = r'^\s*SELECT\s+(.+)\s+FROM\s+(\w+)(?:\s+(INNER|LEFT)?\s*JOIN\s+(\w+)\s+ON\s+(.+))?'
-        match = re.match(base_pattern, sql_base, re.IGNORECASE)
+        match = self.REGEX['SELECT'].match(sql_base)
+        if not match:
+            return None
+
+        columns_str = match.group(1).strip()
+        table_name = match.group(2)
         
-        if match:
-            columns_str = match.group(1).strip()
-            table_name = match.group(2)
-            
-            # Join groups
-            join_type_raw = match.group(3)
-            join_table = match.group(4)
-            join_on = match.group(5)
-            
-            columns = [c.strip() for c in columns_str.split(',')]
-            if columns == ['*']:
-                columns = [] 
-            
-            conditions = self._parse_where(where_clause) if where_clause else []
-            
-            join_def = None
-            if join_table:
-                # Parse ON clause: t1.col = t2.col
-                # Assume simple equality
-                on_parts = join_on.split('=')
-                if len(on_parts) == 2:
-                    left_operand = on_parts[0].strip()
-                    right_operand = on_parts[1].strip()
-                    
-                    def clean_col(s):
-                         return s.split('.')[-1] if '.' in s else s
-
-                    join_def = {
-                        'type': 'LEFT' if join_type_raw and join_type_raw.upper() == 'LEFT' else 'INNER',
-                        'table': join_table,
-                        'left_col': clean_col(left_operand),
-                        'right_col': clean_col(right_operand),
-                        'raw_on': join_on
-                    }
-
-            return {
-                'type': 'SELECT', 
-                'table': table_name, 
-                'columns': columns, 
-                'where': conditions,
-                'join': join_def
-            }
+        # Join groups
+        join_type_raw = match.group(3)
+        join_table = match.group(4)
+        join_on = match.group(5)
+        
+        columns = [c.strip() for c in columns_str.split(',')]
+        if columns == ['*']:
+            columns = [] 
+        # Aggregate items are normalized to e.g. 'COUNT(*)', their name in results
+        items = [self._select_item(c) for c in columns]
+        columns = [name for name, _ in items]
+        aggregates = [agg for _, agg in items]
+        
+        conditions = self._parse_where(where_clause) if where_clause else []
+        
+        join_def = None
+        if join_table:
+            # Parse ON clause: t1.col = t2.col
+            # Assume simple equality
+            on_parts = join_on.split('=')
+            if len(on_parts) == 2:
+                left_operand = on_parts[0].strip()
+                right_operand = on_parts[1].strip()
+                
+                def clean_col(s):
+                     return s.split('.')[-1] if '.' in s else s
+
+                join_def = {
+                    'type': 'LEFT' if join_type_raw and join_type_raw.upper() == 'LEFT' else 'INNER',
+                    'table': join_table,
+                    'left_col': clean_col(left_operand),
+                    'right_col': clean_col(right_operand),
+                    'raw_on': join_on
+                }
 
-        # UPDATE
-        match = re.match(self.PATTERNS['UPDATE'], sql, re.IGNORECASE)
+        return {
+            'type': 'SELECT', 
+            'table': table_name, 
+            'columns': columns, 
+            'where': conditions,
+            'join': join_def,
+            'aggregates': aggregates,
+            'group_by': group_by,
+            'order_by': order_by,
+            'limit': limit,
+            'offset': offset
+        }
+
+    def _parse_update(self, sql: str) -> Optional[Dict[str, Any]]:
+        match = self.REGEX['UPDATE'].match(sql)
         if match:
             table_name = match.group(1)
             set_clause = match.group(2)
@@ -119,24 +359,35 @@ class SQLParser:
             
             conditions = self._parse_where(where_clause)
             return {'type': 'UPDATE', 'table': table_name, 'updates': updates, 'where': conditions}
+        return None
 
-        # DELETE
-        match = re.match(self.PATTERNS['DELETE'], sql, re.IGNORECASE)
+    def _parse_delete(self, sql: str) -> Optional[Dict[str, Any]]:
+        match = self.REGEX['DELETE'].match(sql)
         if match:
             table_name = match.group(1)
             where_clause = match.group(2)
             conditions = self._parse_where(where_clause)
             return {'type': 'DELETE', 'table': table_name, 'where': conditions}
+        return None
 
+    def _parse_transaction(self, sql: str) -> Optional[Dict[str, Any]]:
         # TRANSACTIONS
-        if re.match(self.PATTERNS['BEGIN'], sql, re.IGNORECASE):
-            return {'type': 'BEGIN'}
-        if re.match(self.PATTERNS['COMMIT'], sql, re.IGNORECASE):
-            return {'type': 'COMMIT'}
-        if re.match(self.PATTERNS['ROLLBACK'], sql, re.IGNORECASE):
-            return {'type': 'ROLLBACK'}
+        for command in ('SAVEPOINT', 'ROLLBACK_TO', 'RELEASE'):
+            match = self.REGEX[command].match(sql)
+            if match:
+                return {'type': command, 'name': match.group(1)}
+        for command in ('BEGIN', 'COMMIT', 'ROLLBACK'):
+            if self.REGEX[command].match(sql):
+                return {'type': command}
+        return None
 
-        raise ValueError(f"Syntax error or unsupported command: {sql}")
+    def _select_item(self, item: str):
+        """Returns (name, aggregate) for a select-list item; aggregate is None for a plain column."""
+        match = self.REGEX['AGGREGATE'].match(item.strip())
+        if not match:
+            return item, None
+        func, column = match.group(1).upper(), match.group(2)
+        return f"{func}({column})", {'func': func, 'column': column}
 
     def _parse_schema(self, schema_str: str) -> Dict[str, str]:
         # Example: id INTEGER PRIMARY KEY, name VARCHAR(50) NOT NULL
@@ -154,17 +405,37 @@ class SQLParser:
         return schema
 
     def _parse_values(self, values_str: str) -> List[Any]:
-        # Split by comma but respect quotes? Simplification: split by comma
-        # Creating a robust CSV parser is hard, assume simple values
+        # Commas inside quoted strings belong to the value
         vals = []
-        for v in values_str.split(','):
+        for v in self._split_list(values_str):
             vals.append(self._clean_value(v.strip()))
         return vals
 
+    def _split_list(self, text: str) -> List[str]:
+        """Splits text on the commas outside string literals and parentheses."""
+        parts = []
+        depth = 0
+        start = 0
+        for match in self.REGEX['LIST'].finditer(text):
+            token = match.group(0)
+            if token == '(':
+                depth += 1
+            elif token == ')':
+                depth -= 1
+            elif token == ',' and depth == 0:
+                parts.append(text[start:match.start()])
+                start = match.end()
+        parts.append(text[start:])
+        return parts
+
     def _clean_value(self, val: str) -> Any:
         # constant handling
         if val.startswith("'") and val.endswith("'"):
             return val[1:-1]
+        placeholder = self.REGEX['PARAMETER'].match(val)
+        if placeholder:
+            position, name = placeholder.groups()
+            return Parameter(int(position) if position else name)
         if val.lower() == 'true': return True
         if val.lower() == 'false': return False
         if val.lower() == 'null': return None
@@ -185,11 +456,10 @@ class SQLParser:
             return conditions
         
         # Split by AND
-        parts = re.split(r'\s+AND\s+', where_clause, flags=re.IGNORECASE)
+        parts = self.REGEX['AND'].split(where_clause)
         for part in parts:
             # simple regex for operator
-            # Order matters: check >=, <=, != before >, <, =
-            op_match = re.search(r'(>=|<=|!=|=|>|<)', part)
+            op_match = self.REGEX['OPERATOR'].search(part)
             if op_match:
                 op = op_match.group(1)
                 left, right = part.split(op)
@@ -0,0 +1,63 @@
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+
+class QueryPlanner:
+    """
+    Rewrites a parsed SELECT with a JOIN before it is executed.
+
+    WHERE conjuncts that reference a single table are pushed below the join,
+    so they filter (and can use indexes on) that table's rows before the join
+    instead of the joined result. For a LEFT JOIN only left-table conditions
+    are pushed: filtering the right side first would turn rows that should be
+    dropped into NULL-extended ones.
+    """
+
+    @staticmethod
+    def plan_join(ast: Dict[str, Any], left_columns: Iterable[str], right_columns: Iterable[str]) -> Dict[str, Any]:
+        """
+        Returns {'join': join_def, 'left': [...], 'right': [...], 'where': [...]}:
+        the join definition with its columns oriented to (FROM table, JOIN table),
+        the conditions pushed to each side (with bare column names), and the
+        conditions left to evaluate on joined rows.
+        """
+        left_table = ast['table']
+        join_def = QueryPlanner._orient(ast['join'], left_table)
+        right_table = join_def['table']
+        left_columns, right_columns = set(left_columns), set(right_columns)
+
+        plan = {'join': join_def, 'left': [], 'right': [], 'where': []}
+        for cond in ast['where']:
+            side, col = QueryPlanner._owner(cond['column'], left_table, left_columns, right_table, right_columns)
+            if side == 'right' and join_def['type'] == 'LEFT':
+                side = None
+            if side is None:
+                plan['where'].append(cond)
+            else:
+                plan[side].append(dict(cond, column=col))
+        return plan
+
+    @staticmethod
+    def _owner(column: str, left_table: str, left_columns: set, right_table: str,
+               right_columns: set) -> Tuple[Optional[str], str]:
+        # Same precedence as PredicateCompiler.columns: a bare name belongs to the FROM table first
+        if '.' in column:
+            table, col = column.split('.', 1)
+            if table == left_table and col in left_columns:
+                return 'left', col
+            if table == right_table and col in right_columns:
+                return 'right', col
+            return None, column
+        if column in left_columns:
+            return 'left', column
+        if column in right_columns:
+            return 'right', column
+        return None, column
+
+    @staticmethod
+    def _orient(join_def: Dict[str, Any], left_table: str) -> Dict[str, Any]:
+        # "FROM a JOIN b ON b.x = a.y" names the columns right-to-left
+        operands = [part.strip() for part in join_def.get('raw_on', '').split('=')]
+        if len(operands) == 2 and all('.' in op for op in operands):
+            first, second = (op.split('.', 1)[0] for op in operands)
+            if first == join_def['table'] and second == left_table and first != second:
+                return dict(join_def, left_col=join_def['right_col'], right_col=join_def['left_col'])
+        return join_def
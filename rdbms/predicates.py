@@ -0,0 +1,105 @@
+from typing import Dict, Any, List, Callable, Optional, Tuple
+from rdbms.schema import TableSchema, ColumnMeta
+
+# How a query can name a column ('col' or 'table.col') -> (position in the row tuple, column metadata)
+ColumnMap = Dict[str, Tuple[int, Optional[ColumnMeta]]]
+
+
+class PredicateCompiler:
+    """
+    Compiles a WHERE clause (the parser's list of AND-ed conditions) into a
+    single Python function row -> bool, once per statement. Column names are
+    resolved to row positions and literals converted to the column's type up
+    front, so evaluating a row is a handful of tuple indexing and comparisons.
+
+    SELECT, UPDATE and DELETE all filter through this, with one set of rules:
+      =, !=        same result as comparing str(value) with str(literal). When
+                   the literal converts losslessly to the column's type it is
+                   compared as that type instead, which is equivalent and
+                   avoids converting every row
+      >, >=, <, <= NULL never matches; the literal is converted to the
+                   column's type when it converts losslessly, and one that
+                   does not convert at all is a ValueError
+      Columns the tables don't have read as NULL.
+    """
+
+    RANGE_OPERATORS = ('>', '>=', '<', '<=')
+
+    @staticmethod
+    def columns(tables: List[Tuple[str, TableSchema]]) -> ColumnMap:
+        """
+        Maps the names a query may use for the tables' columns to row positions.
+        Joined rows are the tables' rows concatenated in this order; a bare
+        name belongs to the first table that has it (the FROM table before
+        the JOIN table).
+        """
+        mapping = {}
+        offset = 0
+        for table_name, meta in tables:
+            for i, col in enumerate(meta.columns):
+                mapping.setdefault(col.name, (offset + i, col))
+                mapping.setdefault(f"{table_name}.{col.name}", (offset + i, col))
+            offset += len(meta.columns)
+        return mapping
+
+    @staticmethod
+    def literal(value: Any, meta: Optional[ColumnMeta]) -> Tuple[Any, bool]:
+        """Returns (value converted to the column type, True) if that is lossless, else (value, False)."""
+        if meta is None:
+            return value, False
+        try:
+            converted = meta.validate(value)
+        except ValueError:
+            return value, False
+        if str(converted) != str(value):
+            # e.g. 1.5 -> 1 for an INTEGER column, or 'yes' -> True
+            return value, False
+        return converted, True
+
+    @staticmethod
+    def compile(conditions: List[Dict[str, Any]], columns: ColumnMap) -> Callable[[tuple], bool]:
+        if not conditions:
+            return lambda row: True
+
+        env: Dict[str, Any] = {}
+        terms = []
+        for i, cond in enumerate(conditions):
+            op = cond['operator']
+            key, meta = columns.get(cond['column'], (None, None))
+            literal, typed = PredicateCompiler.literal(cond['value'], meta)
+            const = f"c{i}"
+            if key is None:
+                ref = "None"
+            else:
+                ref = f"(v{i} := row[{int(key)}])"
+                value = f"v{i}"
+
+            if op in ('=', '!='):
+                if typed and literal is None:
+                    expr = f"{ref} is None"
+                elif typed:
+                    env[const] = literal
+                    expr = f"{ref} == {const}"
+                else:
+                    env[const] = str(cond['value'])
+                    expr = f"str({ref}) == {const}"
+                terms.append(f"({expr})" if op == '=' else f"(not {expr})")
+            elif op in PredicateCompiler.RANGE_OPERATORS:
+                if key is None or literal is None:
+                    terms.append("False")
+                    continue
+                if not typed and meta is not None:
+                    # A literal of another type would fail on every row (or not at
+                    # all, if an index answers the query): reject it up front
+                    try:
+                        meta.validate(literal)
+                    except ValueError as e:
+                        raise ValueError(f"Cannot compare {cond['column']} {op} {literal!r}: {e}")
+                env[const] = literal
+                terms.append(f"({ref} is not None and {value} {op} {const})")
+            else:
+                raise ValueError(f"Unsupported operator: {op}")
+
+        source = "def predicate(row):\n    return " + " and ".join(terms) + "\n"
+        exec(compile(source, "<where>", "exec"), env)
+        return env['predicate']
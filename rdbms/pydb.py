@@ -1,35 +1,238 @@
 
 from rdbms.storage import StorageManager
+from rdbms.pages import PageStorageManager
 from rdbms.parser import SQLParser
 from rdbms.transactions import TransactionManager
 from rdbms.executor import Executor
 from rdbms.typesystem import TypeSystem
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
 import datetime
+import itertools
+import queue
+import threading
 
 class DatabaseResult:
-    def __init__(self, data):
-        self.data = data
+    """
+    Cursor over a statement's result, returned by Database.cursor().
+
+    SELECT rows are produced lazily as they are fetched, so reading a large
+    table in batches (fetchmany or iteration) keeps memory bounded. Rows
+    reflect the tables as they are when read. Other statements run
+    immediately; their message is in `status` and they have no rows.
+    """
+    def __init__(self, data, status=None):
+        self.data = iter(data)
+        self.status = status
+        self.rowcount = 0  # Rows fetched so far
+
+    def fetchone(self):
+        row = next(self.data, None)
+        if row is not None:
+            self.rowcount += 1
+        return row
+
+    def fetchmany(self, size=100):
+        rows = list(itertools.islice(self.data, size))
+        self.rowcount += len(rows)
+        return rows
+
     def fetchall(self):
-        return self.data
+        rows = list(self.data)
+        self.rowcount += len(rows)
+        return rows
 
-class Database:
-    def __init__(self, data_dir="data"):
-        self.storage = StorageManager(data_dir)
-        self.tm = TransactionManager(self.storage)
-        self.parser = SQLParser()
-        self.executor = Executor(self.tm)
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self.data)
+        self.rowcount += 1
+        return row
+
+class PreparedStatement:
+    """
+    A statement parsed once by Session.prepare() and run many times with
+    different values for its placeholders ('?', '?N' or ':name'). Values are
+    bound into the parsed statement, never spliced into SQL text, so quotes
+    and commas in them need no escaping. It runs in the session that prepared it.
+    """
+    def __init__(self, session, sql, ast):
+        self.session = session
+        self.sql = sql
+        self.ast = ast
+        self.parameters = ast.get('parameters', [])
+
+    def execute(self, params=()) -> Any:
+        """Runs the statement; `params` is a sequence for '?' placeholders or a dict for named ones."""
+        return self.session._run(self.ast, params)
+
+    def cursor(self, params=()) -> DatabaseResult:
+        return self.session._cursor(self.ast, params)
+
+    def query(self, params=()) -> List[Any]:
+        return self.execute(params)
+
+class Session:
+    """
+    A connection to a Database, opened with Database.connect(). Each session
+    has its own transaction state, so BEGIN ... COMMIT covers only the
+    statements run through it, and its own cache of prepared statements.
+    Sessions share the database's storage, locks and parse cache, and are
+    cheap to open. A session is used by one thread at a time.
+    """
+    # Prepared statements kept per session (least recently used dropped first)
+    STATEMENT_CACHE_SIZE = 128
+
+    def __init__(self, db: 'Database'):
+        self.db = db
+        self.tm = TransactionManager(db.storage)
+        self.executor = Executor(self.tm, columnar=db.columnar)
+        self.statements: "OrderedDict[str, PreparedStatement]" = OrderedDict()
+
+    def __enter__(self):
+        return self
 
-    def execute(self, sql: str) -> Any:
+    def __exit__(self, *exc):
+        self.reset()
+
+    def reset(self):
+        """Rolls back a transaction left open, leaving the session ready for reuse."""
+        if self.tm.active_transaction:
+            self.tm.rollback()
+
+    def prepare(self, sql: str) -> PreparedStatement:
+        """Parses sql once for repeated execution with bound values; the same sql returns the same statement."""
+        statement = self.statements.get(sql)
+        if statement is not None:
+            self.statements.move_to_end(sql)
+            return statement
+        try:
+            statement = PreparedStatement(self, sql, self.db.parser.parse(sql))
+        except Exception as e:
+            print(f"Execution Error: {e}")
+            raise e
+        self.statements[sql] = statement
+        if len(self.statements) > self.STATEMENT_CACHE_SIZE:
+            self.statements.popitem(last=False)
+        return statement
+
+    def execute(self, sql: str, params=None) -> Any:
         try:
-            ast = self.parser.parse(sql)
-            result = self.executor.execute(ast)
-            return result
+            ast = self.db.parser.parse(sql)
         except Exception as e:
             print(f"Execution Error: {e}")
             raise e
+        return self._run(ast, params)
     
-    def query(self, sql: str) -> List[Any]:
+    def cursor(self, sql: str, params=None) -> DatabaseResult:
+        """Executes sql and returns a cursor; SELECT rows are streamed as they are fetched."""
+        try:
+            ast = self.db.parser.parse(sql)
+        except Exception as e:
+            print(f"Execution Error: {e}")
+            raise e
+        return self._cursor(ast, params)
+
+    def query(self, sql: str, params=None) -> List[Any]:
         # Helper for select specifically?
         # execute returns list for select, str for others
-        return self.execute(sql)
+        return self.execute(sql, params)
+
+    def insert_many(self, table: str, rows) -> str:
+        """
+        Inserts many rows (sequences of values in column order) as one
+        statement: validated together, all or nothing, and logged once.
+        """
+        return self._run({'type': 'INSERT', 'table': table, 'rows': list(rows)}, None)
+
+    def _bind(self, ast, params):
+        if params is None and 'parameters' not in ast:
+            return ast
+        return SQLParser.bind(ast, () if params is None else params)
+
+    def _run(self, ast, params) -> Any:
+        try:
+            return self.executor.execute(self._bind(ast, params))
+        except Exception as e:
+            print(f"Execution Error: {e}")
+            raise e
+
+    def _cursor(self, ast, params) -> DatabaseResult:
+        try:
+            ast = self._bind(ast, params)
+            if ast['type'] == 'SELECT':
+                return DatabaseResult(self.executor.stream(ast))
+            return DatabaseResult([], status=self.executor.execute(ast))
+        except Exception as e:
+            print(f"Execution Error: {e}")
+            raise e
+
+class Database(Session):
+    """
+    An open database directory. Statements run on the Database itself use
+    its default session; connect() opens independent ones for other threads.
+    """
+    # Storage engines selectable with Database(engine=...)
+    ENGINES = {
+        'json': StorageManager,
+        'page': PageStorageManager,
+    }
+
+    def __init__(self, data_dir="data", engine="json", checkpoint_bytes=4 * 1024 * 1024, sync=True,
+                 cache_bytes=64 * 1024 * 1024, columnar=False):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown storage engine: {engine}")
+        self.storage = self.ENGINES[engine](data_dir, checkpoint_bytes=checkpoint_bytes, sync=sync,
+                                              cache_bytes=cache_bytes)
+        # Bring table files up to date with the write-ahead log
+        self.storage.recover()
+        self.parser = SQLParser()
+        self.columnar = columnar
+        super().__init__(self)
+
+    def connect(self) -> Session:
+        """Opens a new session with its own transaction state and statement cache."""
+        return Session(self)
+
+    def close(self):
+        """Checkpoints the log into the table files."""
+        self.storage.close()
+
+class SessionPool:
+    """
+    A bounded set of sessions shared by the threads of a server. Each request
+    takes a session with `with pool.session() as session:` and gives it back
+    at the end, rolling back any transaction it left open. Sessions are
+    opened on demand, at most `size` of them; when all are taken, callers
+    wait up to `timeout` seconds (forever if None) for one to come back.
+    """
+    def __init__(self, db: Database, size: int = 8, timeout: Optional[float] = None):
+        self.db = db
+        self.timeout = timeout
+        self.idle: "queue.LifoQueue[Session]" = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+
+    def acquire(self) -> Session:
+        if not self.slots.acquire(timeout=self.timeout):
+            raise TimeoutError("No database session became free in time.")
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return self.db.connect()
+
+    def release(self, session: Session):
+        try:
+            session.reset()
+        finally:
+            self.idle.put(session)
+            self.slots.release()
+
+    @contextmanager
+    def session(self):
+        session = self.acquire()
+        try:
+            yield session
+        finally:
+            self.release(session)
@@ -0,0 +1,53 @@
+from typing import Dict, Any, List, Callable, Tuple
+from rdbms.typesystem import TypeSystem
+from rdbms.constraints import ConstraintManager
+
+class ColumnMeta:
+    """
+    Pre-parsed definition of a single column.
+    """
+    __slots__ = ('name', 'type', 'max_length', 'primary_key', 'unique', 'not_null', 'validate')
+
+    def __init__(self, name: str, column_def: str):
+        constraints = ConstraintManager.parse_constraints(column_def)
+        self.name = name
+        self.type = TypeSystem.base_type(constraints['type'])
+        self.max_length = TypeSystem.max_length(constraints['type'])
+        self.primary_key = constraints['primary_key']
+        self.unique = constraints['unique']
+        self.not_null = constraints['not_null']
+        self.validate: Callable[[Any], Any] = TypeSystem.compile(constraints['type'])
+
+
+class TableSchema:
+    """
+    Compiled form of a table's schema strings (e.g. "VARCHAR(100) UNIQUE NOT NULL").
+    Built once when a table is loaded and cached on the table data as
+    table_data['meta'], so INSERT/UPDATE validation does no string parsing.
+
+    Rows are kept in memory as tuples in schema column order; `positions`
+    maps a column name to its offset. Table files keep rows as dicts; row()
+    converts them on load.
+    """
+
+    def __init__(self, schema: Dict[str, str]):
+        self.source = schema
+        self.columns: List[ColumnMeta] = [ColumnMeta(name, col_def) for name, col_def in schema.items()]
+        self.by_name: Dict[str, ColumnMeta] = {c.name: c for c in self.columns}
+        self.names: List[str] = [c.name for c in self.columns]
+        self.positions: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.validators: List[Callable[[Any], Any]] = [c.validate for c in self.columns]
+        self.not_null_columns: List[str] = [c.name for c in self.columns if c.not_null]
+        self.unique_columns: List[str] = [c.name for c in self.columns if c.unique]
+
+    def row(self, values: Any) -> Tuple[Any, ...]:
+        """Internal row from a stored one: a {column: value} dict, or values in column order."""
+        if isinstance(values, dict):
+            return tuple(values.get(name) for name in self.names)
+        return tuple(values)
+
+    @staticmethod
+    def attach(table_data: Dict[str, Any]) -> 'TableSchema':
+        meta = TableSchema(table_data['schema'])
+        table_data['meta'] = meta
+        return meta
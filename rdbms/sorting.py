@@ -0,0 +1,92 @@
+import heapq
+import itertools
+import json
+import tempfile
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+class SortExecutor:
+    """
+    Executes ORDER BY on one column.
+
+    NULLs sort after every value, so they come last in ascending order and
+    first in descending order (the same place an index-ordered scan puts
+    them). Sorts are stable: rows with equal keys keep their input order.
+
+    Three strategies, picked from the LIMIT and the input size:
+      - top-K: with a LIMIT, a bounded heap keeps only the K best rows,
+        O(n log K) time and O(K) memory
+      - in-memory sort: the input fits in BUFFER_ROWS
+      - external merge sort: the input is sorted in runs of BUFFER_ROWS that
+        are spilled to temporary files, then merged lazily
+    """
+
+    # Rows held in memory at once before a sort spills to disk
+    BUFFER_ROWS = 100_000
+
+    @staticmethod
+    def sort_key(pos: int):
+        # (is NULL, value): NULLs compare after any value without comparing to it
+        def key(row: Sequence[Any]):
+            value = row[pos]
+            return (value is None, value)
+        return key
+
+    @staticmethod
+    def sort(rows: Iterable[Sequence[Any]], pos: int, descending: bool = False,
+             limit: Optional[int] = None) -> Iterator[Sequence[Any]]:
+        """
+        Returns the rows ordered by the column at position `pos`. `limit`:
+        only that many rows will be read, so only that many are kept.
+        """
+        key = SortExecutor.sort_key(pos)
+        if limit is not None and limit <= SortExecutor.BUFFER_ROWS:
+            return iter(SortExecutor.top_k(rows, key, limit, descending))
+
+        rows = iter(rows)
+        chunk = list(itertools.islice(rows, SortExecutor.BUFFER_ROWS))
+        chunk.sort(key=key, reverse=descending)
+        if len(chunk) < SortExecutor.BUFFER_ROWS:
+            return iter(chunk)
+        return SortExecutor.external_sort(chunk, rows, key, descending)
+
+    @staticmethod
+    def top_k(rows: Iterable[Sequence[Any]], key, k: int, descending: bool = False) -> List[Sequence[Any]]:
+        """The first k rows in sort order, keeping at most k in memory."""
+        if descending:
+            return heapq.nlargest(k, rows, key=key)
+        return heapq.nsmallest(k, rows, key=key)
+
+    @staticmethod
+    def external_sort(first_run: List[Sequence[Any]], rows: Iterator[Sequence[Any]], key,
+                      descending: bool = False) -> Iterator[Sequence[Any]]:
+        """
+        Merges sorted runs spilled to temporary files. `first_run` is already
+        sorted; the rest of `rows` is read BUFFER_ROWS at a time.
+        """
+        runs = []
+        try:
+            run = first_run
+            while run:
+                runs.append(SortExecutor._spill(run))
+                run = list(itertools.islice(rows, SortExecutor.BUFFER_ROWS))
+                run.sort(key=key, reverse=descending)
+            # Earlier runs win ties, so the merge keeps the sort stable
+            yield from heapq.merge(*(SortExecutor._read_run(f) for f in runs), key=key, reverse=descending)
+        finally:
+            for f in runs:
+                f.close()
+
+    @staticmethod
+    def _spill(run: List[Sequence[Any]]):
+        # One JSON list per row and line; the file is deleted when closed
+        f = tempfile.TemporaryFile('w+', encoding='utf-8')
+        for row in run:
+            f.write(json.dumps(row, separators=(',', ':')))
+            f.write('\n')
+        f.seek(0)
+        return f
+
+    @staticmethod
+    def _read_run(f) -> Iterator[Sequence[Any]]:
+        for line in f:
+            yield tuple(json.loads(line))
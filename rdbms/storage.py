@@ -1,63 +1,471 @@
-
 import json
 import os
 import shutil
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
 import threading
+from rdbms.indexes import IndexManager
+from rdbms.constraints import ConstraintManager
+from rdbms.schema import TableSchema
+from rdbms.wal import WriteAheadLog
+from rdbms.bufferpool import BufferPool
+from rdbms.locks import LockManager
+from rdbms.mvcc import VersionStore
 
 class StorageManager:
     """
     Handles file I/O and table-level locking.
+    Default engine: one JSON document per table.
+
+    `locks` holds the per-table shared/exclusive locks (see rdbms/locks.py)
+    that statements keep for their whole run; file reads and writes are
+    serialized per table separately.
+
+    Loaded tables are kept in a buffer pool (see rdbms/bufferpool.py), so
+    consecutive statements on a table don't re-read its file.
+
+    Writes go through the write-ahead log (see rdbms/wal.py): a commit appends
+    its row changes to the log and updates the cached table in place; table
+    files are only rewritten by checkpoints. Tables with changes that are not
+    yet checkpointed are pinned in the pool so reads see the logged state.
+
+    Transactions read snapshots (see rdbms/mvcc.py): `versions` numbers the
+    commits and keeps the row versions open snapshots still need.
     """
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", checkpoint_bytes: int = 4 * 1024 * 1024, sync: bool = True,
+                 cache_bytes: int = 64 * 1024 * 1024):
         self.data_dir = data_dir
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
-        # Simple in-memory locks for threadsafety (and rudimentary transaction simulation)
-        self.locks: Dict[str, threading.Lock] = {} 
+        # Statement-level shared/exclusive table locks, taken by the executor
+        self.locks = LockManager()
+        # Serialize reading and writing each table's file
+        self.file_locks: Dict[str, threading.Lock] = {}
+
+        self.dirty = set()
+        # Tables a running checkpoint has snapshotted but not yet written
+        self.saving = set()
+        self.pool = BufferPool(cache_bytes, pinned=self._pinned, on_evict=self._evicted)
+        # Orders in-memory application of commits with their position in the log
+        self.commit_lock = threading.Lock()
+        # Commit timestamps and old row versions; guarded by commit_lock
+        self.versions = VersionStore()
+        self.checkpoint_lock = threading.Lock()
+        self.checkpoint_bytes = checkpoint_bytes
+        self._checkpoint_requested = threading.Event()
+        self._checkpointer: Optional[threading.Thread] = None
+        self._closing = False
+        # fsync table files as checkpoints write them, before their log segments go
+        self.sync = sync
+        self.wal = WriteAheadLog(data_dir, sync=sync)
+
+    def _pinned(self, table_name: str) -> bool:
+        # Changes not yet in the table file must stay in memory, and so must
+        # tables open transactions read or that hold their row versions
+        return table_name in self.dirty or table_name in self.saving or self.versions.pinned(table_name)
+
+    def _evicted(self, table_name: str):
+        # Engines with per-table state beyond the pool entry release it here
+        pass
 
     def _get_lock(self, table_name: str):
-        if table_name not in self.locks:
-            self.locks[table_name] = threading.Lock()
-        return self.locks[table_name]
+        # setdefault is atomic, so concurrent callers always get the same lock
+        return self.file_locks.setdefault(table_name, threading.Lock())
 
-    def load_table(self, table_name: str) -> Dict[str, Any]:
-        """Loads table data (schema + rows) from disk."""
-        filepath = os.path.join(self.data_dir, f"{table_name}.json")
+    # --- Engine specific file format (JSON) ---
+
+    def _path(self, table_name: str) -> str:
+        return os.path.join(self.data_dir, f"{table_name}.json")
+
+    def _read_file(self, table_name: str) -> Dict[str, Any]:
+        """Reads a table file; rows come back keyed by row id. Caller holds the table lock."""
+        filepath = self._path(table_name)
         if not os.path.exists(filepath):
             raise ValueError(f"Table {table_name} does not exist.")
-        
+
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+
+        # In memory, rows are keyed by a stable row id so indexes survive deletes.
+        rows = data.get('rows', [])
+        rids = data.get('rids') or range(len(rows))
+        data['rows'] = dict(zip(rids, rows))
+        data['next_rid'] = max(data['rows'], default=-1) + 1
+        data.pop('rids', None)
+        return data
+
+    def _write_file(self, table_name: str, data: Dict[str, Any]):
+        """Writes a whole table file. Caller holds the table lock."""
+        filepath = self._path(table_name)
+        names = list(data['schema'])
+        on_disk = {
+            "schema": data['schema'],
+            # Rows are tuples in memory; the file keeps them as {column: value}
+            "rows": [dict(zip(names, row)) for row in data['rows'].values()],
+            # Row ids are kept so log records can be replayed against this file
+            "rids": list(data['rows'].keys()),
+            "indexes": IndexManager.definitions(data.get('indexes', {})),
+            "lsn": data.get('lsn', 0)
+        }
+        self._write_atomic(filepath, lambda f: json.dump(on_disk, f, indent=2))
+
+    def _write_atomic(self, filepath: str, write: Callable[[Any], None], mode: str = 'w'):
+        """
+        Writes a file through a temp file and a rename, so it is never seen
+        partly written (recover() removes temp files a crash left behind).
+        With `sync`, the file is durable on return.
+        """
+        tmp_path = filepath + ".tmp"
+        with open(tmp_path, mode) as f:
+            write(f)
+            if self.sync:
+                f.flush()
+                os.fsync(f.fileno())
+        shutil.move(tmp_path, filepath)
+        if self.sync:
+            # The rename itself is only durable once the directory is
+            self._sync_dir()
+
+    def _sync_dir(self):
+        fd = os.open(self.data_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _create_file(self, table_name: str, schema: Dict[str, str], indexes: Dict[str, Any], lsn: int):
+        data = {"schema": schema, "rows": [], "indexes": indexes, "lsn": lsn}
+        # No lock needed for creation as file doesn't exist yet
+        self._write_atomic(self._path(table_name), lambda f: json.dump(data, f))
+
+    def check_rows(self, rows: Iterable[Tuple[Any, ...]]):
+        """
+        Raises ValueError for new row images the file format cannot store, so
+        statements reject them before they are logged. JSON stores any row.
+        """
+        pass
+
+    def _list_files(self) -> List[str]:
+        return [f[:-5] for f in os.listdir(self.data_dir) if f.endswith(".json")]
+
+    # --- Tables ---
+
+    def load_table(self, table_name: str) -> Dict[str, Any]:
+        """Returns table data (schema + rows) from the buffer pool, loading it on a miss."""
+        data = self.pool.get(table_name)
+        if data is not None:
+            return data
+
         with self._get_lock(table_name):
-            with open(filepath, 'r') as f:
-                return json.load(f)
+            # Another thread may have loaded it while we waited
+            data = self.pool.peek(table_name)
+            if data is not None:
+                return data
+            data = self._prepare(self._read_file(table_name))
+            self.pool.put(table_name, data, self._file_size(table_name))
+        return data
+
+    def _file_size(self, table_name: str) -> int:
+        # Cost estimate for the buffer pool
+        try:
+            return os.path.getsize(self._path(table_name))
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _prepare(data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Builds the in-memory parts of a freshly loaded table (compiled schema
+        and index entries). Shared by every storage engine.
+        """
+        data.setdefault('indexes', {})
+        data.setdefault('lsn', 0)
+        meta = TableSchema.attach(data)
+        data['rows'] = {rid: meta.row(row) for rid, row in data['rows'].items()}
+        IndexManager.rebuild_all(data)
+        ConstraintManager.ensure_unique_indexes(data)
+        return data
 
     def save_table(self, table_name: str, data: Dict[str, Any]):
-        """Saves table data to disk."""
-        filepath = os.path.join(self.data_dir, f"{table_name}.json")
+        """
+        Writes the full table to disk immediately (used by checkpoints); with
+        `sync`, it is durable on return.
+        """
         with self._get_lock(table_name):
-            # Atomic write (write to temp then rename) to prevent corruption
-            tmp_path = filepath + ".tmp"
-            with open(tmp_path, 'w') as f:
-                json.dump(data, f, indent=2)
-            shutil.move(tmp_path, filepath)
-
-    def create_table(self, table_name: str, schema: Dict[str, str]):
-        filepath = os.path.join(self.data_dir, f"{table_name}.json")
-        if os.path.exists(filepath):
+            self._write_file(table_name, data)
+
+    def create_table(self, table_name: str, schema: Dict[str, str], indexes: Optional[Dict[str, Any]] = None):
+        if os.path.exists(self._path(table_name)):
             raise ValueError(f"Table {table_name} already exists.")
-        
-        data = {"schema": schema, "rows": [], "indexes": {}}
-        # No lock needed for creation as file doesn't exist yet
-        with open(filepath, 'w') as f:
-            json.dump(data, f)
+        self.pool.invalidate(table_name)
+        # Log records older than the table must never be replayed into it. CREATE
+        # TABLE is not logged: with `sync` the file is durable before later writes are.
+        self._create_file(table_name, schema, indexes or {}, self.wal.last_lsn)
 
     def drop_table(self, table_name: str):
-        filepath = os.path.join(self.data_dir, f"{table_name}.json")
         with self._get_lock(table_name):
+            filepath = self._path(table_name)
             if os.path.exists(filepath):
                 os.remove(filepath)
             else:
                 raise ValueError(f"Table {table_name} does not exist.")
-    
+        with self.commit_lock:
+            self.dirty.discard(table_name)
+            self.pool.invalidate(table_name)
+
     def list_tables(self) -> List[str]:
-        return [f[:-5] for f in os.listdir(self.data_dir) if f.endswith(".json")]
+        return self._list_files()
+
+    # --- Commits ---
+
+    @staticmethod
+    def apply_change(data: Dict[str, Any], change: List[Any]):
+        """
+        Applies one log record entry to table data, maintaining its indexes.
+        Entries carry full row images (values in column order; older logs
+        hold dicts), so applying one twice is harmless.
+          ['I'|'U', table, rid, row]   ['D', table, rid]
+          ['CI', table, column, definition]   ['DI', table, column]
+        """
+        op = change[0]
+        rows = data['rows']
+        if op in ('I', 'U'):
+            rid, row = change[2], data['meta'].row(change[3])
+            old = rows.get(rid)
+            rows[rid] = row
+            if old is None:
+                IndexManager.insert_row(data, rid, row)
+            else:
+                IndexManager.update_row(data, rid, old, row)
+            data['next_rid'] = max(data['next_rid'], rid + 1)
+        elif op == 'D':
+            old = rows.pop(change[2], None)
+            if old is not None:
+                IndexManager.delete_row(data, change[2], old)
+        elif op == 'CI':
+            column, definition = change[2], change[3]
+            if column not in data['indexes']:
+                IndexManager.create_index(data, column, definition.get('type', 'HASH'), definition.get('unique', False))
+        elif op == 'DI':
+            data['indexes'].pop(change[2], None)
+        else:
+            raise ValueError(f"Unknown log record: {op}")
+
+    @staticmethod
+    def apply_changes(data: Dict[str, Any], changes: List[List[Any]]):
+        """
+        apply_change() for a list of entries; runs of new rows are indexed as
+        one batch (see IndexManager.insert_rows).
+        """
+        rows = data['rows']
+        added = []
+
+        def flush():
+            IndexManager.insert_rows(data, added)
+            data['next_rid'] = max(data['next_rid'], max(rid for rid, _ in added) + 1)
+            added.clear()
+
+        for change in changes:
+            if change[0] == 'I' and change[2] not in rows:
+                row = data['meta'].row(change[3])
+                rows[change[2]] = row
+                added.append((change[2], row))
+                continue
+            if added:
+                flush()
+            StorageManager.apply_change(data, change)
+        if added:
+            flush()
+
+    def _apply(self, batches: List[tuple]):
+        """
+        Applies one commit's changes, as (table name, table data, changes)
+        per table, under the next commit timestamp. Caller holds commit_lock.
+        """
+        ts = self.versions.clock + 1
+        for table_name, data, changes in batches:
+            # Open snapshots keep seeing the rows as they were
+            self.versions.keep(table_name, data, changes, ts)
+            self.apply_changes(data, changes)
+            self.dirty.add(table_name)
+        self.versions.clock = ts
+
+    def log(self, table_name: str, data: Dict[str, Any], changes: List[List[Any]]):
+        """
+        Autocommit: applies `changes` to the table as one commit, makes them
+        durable and keeps the table resident until the next checkpoint.
+        """
+        if not changes:
+            return
+        with self.commit_lock:
+            resident = self.pool.peek(table_name)
+            if resident is None:
+                # Evicted while the statement ran: it is current again
+                self.dirty.add(table_name)
+                self.pool.put(table_name, data, self._file_size(table_name))
+                resident = data
+            self._apply([(table_name, resident, changes)])
+            lsn = self.wal.write(changes)
+        self.wal.wait(lsn)
+        self._maybe_checkpoint()
+
+    def commit(self, changes: List[List[Any]], snapshot: int):
+        """
+        Applies a transaction's changes to the shared tables and logs them as a
+        single record, so a multi-table COMMIT is atomic. Fails, changing
+        nothing, if a row it changed was changed by a commit after its
+        `snapshot` (first committer wins) or if its rows now clash with
+        committed ones on a UNIQUE column.
+        """
+        if not changes:
+            return
+        with self.commit_lock:
+            applied = []
+            tables = {}
+            # Row ids handed out inside the transaction may since have been used
+            rid_map = {}
+            next_rids = {}
+            for change in changes:
+                op, table_name = change[0], change[1]
+                if table_name not in tables:
+                    tables[table_name] = self.load_table(table_name)
+                    next_rids[table_name] = tables[table_name]['next_rid']
+                data = tables[table_name]
+                if op == 'I':
+                    rid = next_rids[table_name]
+                    next_rids[table_name] = rid + 1
+                    rid_map[(table_name, change[2])] = rid
+                    change = ['I', table_name, rid, change[3]]
+                elif op in ('U', 'D'):
+                    rid = rid_map.get((table_name, change[2]))
+                    if rid is None:
+                        rid = change[2]
+                        if self.versions.changed_since(data, rid, snapshot):
+                            raise ValueError("Transaction conflict: a row it changed was changed by another "
+                                             "transaction that committed first. Transaction rolled back.")
+                    change = [op, table_name, rid] + change[3:]
+                applied.append(change)
+
+            by_table = {}
+            for change in applied:
+                by_table.setdefault(change[1], []).append(change)
+            checker = ConstraintManager()
+            for table_name, table_changes in by_table.items():
+                data = tables[table_name]
+                written = {}
+                for change in table_changes:
+                    if change[0] in ('I', 'U'):
+                        written[change[2]] = data['meta'].row(change[3])
+                    elif change[0] == 'D':
+                        written[change[2]] = None
+                checker.validate_commit(table_name, written, data)
+
+            self._apply([(name, tables[name], table_changes) for name, table_changes in by_table.items()])
+            lsn = self.wal.write(applied)
+        self.wal.wait(lsn)
+        self._maybe_checkpoint()
+
+    # --- Checkpoints & recovery ---
+
+    def _maybe_checkpoint(self):
+        # Log too long, or pinned tables holding the pool over budget that a
+        # checkpoint would let it evict. A single table larger than the budget
+        # is never evicted (see BufferPool._evict), so it waits for the log.
+        if self.wal.size() < self.checkpoint_bytes:
+            with self.commit_lock:
+                dirty = list(self.dirty)
+            if not self.pool.reclaimable(dirty):
+                return
+        if self._checkpointer is None:
+            self._checkpointer = threading.Thread(target=self._checkpoint_loop, daemon=True)
+            self._checkpointer.start()
+        self._checkpoint_requested.set()
+
+    def _checkpoint_loop(self):
+        while True:
+            self._checkpoint_requested.wait()
+            self._checkpoint_requested.clear()
+            if self._closing:
+                return
+            try:
+                self.checkpoint()
+            except Exception as e:
+                print(f"Checkpoint Error: {e}")
+
+    def checkpoint(self):
+        """
+        Writes every table changed since the last checkpoint to its file and
+        drops the log segments those changes were in.
+        """
+        with self.checkpoint_lock:
+            while True:
+                # Shared locks keep writers from changing rows while they are copied. Table
+                # locks come before commit_lock (a writer's order), so retry if another
+                # table became dirty before commit_lock was taken.
+                with self.commit_lock:
+                    names = set(self.dirty)
+                with self.locks.hold(shared=names), self.commit_lock:
+                    if not self.dirty <= names:
+                        continue
+                    old_segments = self.wal.rotate()
+                    lsn = self.wal.last_lsn
+                    snapshots = {}
+                    for name in self.dirty:
+                        data = self.pool.peek(name)
+                        snapshots[name] = {
+                            'schema': data['schema'],
+                            'rows': dict(data['rows']),
+                            'indexes': IndexManager.definitions(data['indexes']),
+                            'next_rid': data['next_rid'],
+                            'lsn': lsn
+                        }
+                        data['lsn'] = lsn
+                    self.saving = set(snapshots)
+                    self.dirty = set()
+                break
+
+            try:
+                for name, snapshot in snapshots.items():
+                    self.save_table(name, snapshot)
+            except Exception:
+                with self.commit_lock:
+                    self.dirty.update(snapshots)
+                raise
+            finally:
+                self.saving = set()
+            for name in snapshots:
+                # Written out: evictable again, at its new size
+                self.pool.resize(name, self._file_size(name))
+            # The files are durable (see save_table), so the log they replace can go
+            self.wal.remove(old_segments)
+
+    def recover(self):
+        """
+        Replays log records newer than each table file, then checkpoints so
+        the log starts empty. A table file that exists but cannot be read
+        fails recovery rather than losing the records logged for it.
+        """
+        # Partly written files from a crash mid-write; the file they were replacing is intact
+        for name in os.listdir(self.data_dir):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.data_dir, name))
+        for lsn, changes in self.wal.records():
+            for change in changes:
+                table_name = change[1]
+                if not os.path.exists(self._path(table_name)):
+                    continue  # Table was dropped
+                data = self.load_table(table_name)
+                if lsn <= data['lsn']:
+                    continue
+                self.apply_change(data, change)
+                self.dirty.add(table_name)
+        self.checkpoint()
+
+    def close(self):
+        if self._checkpointer is not None:
+            # Let a running background checkpoint finish, then stop the thread
+            self._closing = True
+            self._checkpoint_requested.set()
+            self._checkpointer.join()
+            self._checkpointer = None
+        self.checkpoint()
+        self.wal.close()
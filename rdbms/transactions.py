@@ -1,70 +1,200 @@
 
-from typing import Dict, Any, List
-import copy
+from typing import Dict, Any, List, Optional, Tuple
+from rdbms.indexes import IndexManager
+from rdbms.mvcc import SnapshotRows
 
 class TransactionManager:
     """
-    Manages transaction state (BEGIN, COMMIT, ROLLBACK).
-    Uses a log/journal approach in memory for uncommitted changes.
+    Manages one session's transaction state (BEGIN, COMMIT, ROLLBACK).
+    Every session has its own manager over the shared storage, so any number
+    of transactions can be open at once.
+
+    Transactions use multi-version concurrency control (see rdbms/mvcc.py).
+    BEGIN takes a snapshot, a commit timestamp, and copies nothing; the
+    transaction then reads each table as committed at that point, through a
+    view that overlays its own uncommitted writes. Those writes stay in the
+    transaction as row-level deltas until COMMIT applies them to the shared
+    tables: one insert, update or delete per row changed, however many
+    statements changed it, so committing costs what the transaction changed
+    and nothing more. A COMMIT that would overwrite a row another transaction changed
+    and committed first fails and rolls back instead.
+
+    Savepoints mark points in the transaction to roll back to. While any is
+    set, each write first records what it replaces in an undo log, so
+    ROLLBACK TO undoes just the writes made since its savepoint, in
+    O(changes) and without copying anything. Without savepoints there is
+    nothing to undo partially and no undo log is kept.
     """
     def __init__(self, storage_manager):
         self.storage = storage_manager
         self.active_transaction = False
-        self.transaction_diffs: Dict[str, Dict[str, Any]] = {} 
-        # structure: {table_name: {rows: [new_rows], deleted_ids: []}}?
-        # Simpler approach: Load Modified Tables into Memory fully during transaction.
-        # On Commit: Save Memory tables to Disk.
-        # On Rollback: Discard Memory tables.
-        
-        self.temp_tables: Dict[str, Dict[str, Any]] = {} 
+        # Commit timestamp the open transaction reads at
+        self.snapshot: Optional[int] = None
+        # Views of the tables the open transaction has read, by table name
+        self.views: Dict[str, Dict[str, Any]] = {}
+        # Index changes made by the transaction, in order (row changes are kept in its views)
+        self.index_changes: List[List[Any]] = []
+        # Savepoints as (name, length of the undo log when set), oldest first
+        self.savepoints: List[Tuple[str, int]] = []
+        # Undo entries: ('row', view rows, undo_entry) or ('index', view, column, previous index, index_changes length)
+        self.undo: List[tuple] = []
 
     def begin(self):
         if self.active_transaction:
             raise ValueError("Transaction already in progress")
+        with self.storage.commit_lock:
+            self.snapshot = self.storage.versions.begin()
         self.active_transaction = True
-        self.temp_tables = {} # Cache for modified tables
+        self.views = {}
+        self.index_changes = []
+        self.savepoints = []
+        self.undo = []
 
     def commit(self):
         if not self.active_transaction:
             raise ValueError("No active transaction")
-        
-        # Persist all temp_tables
-        for table_name, data in self.temp_tables.items():
-            self.storage.save_table(table_name, data)
-        
-        self.active_transaction = False
-        self.temp_tables = {}
+
+        # Apply the deltas to the shared tables and log them atomically, holding
+        # every table they touch exclusively. If that fails the transaction is over.
+        changes = self.deltas()
+        tables = {change[1] for change in changes}
+        try:
+            with self.storage.locks.hold(exclusive=tables):
+                self.storage.commit(changes, self.snapshot)
+        finally:
+            self._end()
 
     def rollback(self):
         if not self.active_transaction:
             raise ValueError("No active transaction")
+        self._end()
+
+    def _end(self):
+        with self.storage.commit_lock:
+            self.storage.versions.end(self.snapshot, self.views)
         self.active_transaction = False
-        self.temp_tables = {}
+        self.snapshot = None
+        self.views = {}
+        self.index_changes = []
+        self.savepoints = []
+        self.undo = []
+
+    def savepoint(self, name: str):
+        if not self.active_transaction:
+            raise ValueError("SAVEPOINT can only be used in a transaction")
+        # A reused name refers to the newest savepoint with it
+        self.savepoints.append((name, len(self.undo)))
+
+    def _find_savepoint(self, name: str) -> int:
+        for i in range(len(self.savepoints) - 1, -1, -1):
+            if self.savepoints[i][0] == name:
+                return i
+        raise ValueError(f"No such savepoint: {name}")
+
+    def rollback_to(self, name: str):
+        """Undoes the writes made since the savepoint, which stays set; later savepoints are dropped."""
+        if not self.active_transaction:
+            raise ValueError("No active transaction")
+        i = self._find_savepoint(name)
+        mark = self.savepoints[i][1]
+        for entry in reversed(self.undo[mark:]):
+            if entry[0] == 'row':
+                entry[1].restore(*entry[2])
+            else:
+                _, view, column, previous, count = entry
+                if previous is None:
+                    view['indexes'].pop(column, None)
+                else:
+                    view['indexes'][column] = previous
+                del self.index_changes[count:]
+        del self.undo[mark:]
+        del self.savepoints[i + 1:]
+
+    def release(self, name: str):
+        """Forgets the savepoint and those set after it, keeping the writes made since."""
+        if not self.active_transaction:
+            raise ValueError("No active transaction")
+        del self.savepoints[self._find_savepoint(name):]
+        if self.savepoints:
+            return
+        # No savepoint left to roll back to
+        self.undo = []
 
     def get_table_data(self, table_name: str) -> Dict[str, Any]:
         """
-        Returns table data. If in transaction and modified, returns temp version.
-        Else loads from storage.
+        Returns table data: the shared table outside a transaction, or the
+        transaction's view of it (rows as of its snapshot plus its own writes).
         """
-        if self.active_transaction and table_name in self.temp_tables:
-            return self.temp_tables[table_name]
-        
-        # Load from storage
-        data = self.storage.load_table(table_name)
-        
-        # If in transaction but not yet modified, add to temp_tables to provide isolation (Snapshot)
-        if self.active_transaction:
-            self.temp_tables[table_name] = copy.deepcopy(data)
-            return self.temp_tables[table_name]
-            
-        return data
+        if not self.active_transaction:
+            return self.storage.load_table(table_name)
+
+        view = self.views.get(table_name)
+        if view is None:
+            with self.storage.commit_lock:
+                # Pinned before loading, so the view and later commits share one copy
+                self.storage.versions.use(table_name)
+                try:
+                    data = self.storage.load_table(table_name)
+                except Exception:
+                    self.storage.versions.release([table_name])
+                    raise
+            view = self.views[table_name] = {
+                'schema': data['schema'],
+                'meta': data['meta'],
+                'rows': SnapshotRows(data, self.snapshot),
+                # Indexes created inside the transaction are its own until COMMIT
+                'indexes': dict(data['indexes']),
+                'next_rid': data['next_rid'],
+                'snapshot': self.snapshot,
+            }
+        return view
 
-    def mark_modified(self, table_name: str, data: Dict[str, Any]):
+    def apply(self, table_name: str, data: Dict[str, Any], changes: List[List[Any]]):
         """
-        Updates the table data in the current context.
+        Makes a statement's changes (row-level log entries, see
+        StorageManager.apply_change) in the current context: autocommitted
+        to the shared table, or recorded in the transaction and its view.
         """
-        if self.active_transaction:
-            self.temp_tables[table_name] = data
-        else:
-            # Auto-commit mode
-            self.storage.save_table(table_name, data)
+        if not self.active_transaction:
+            self.storage.log(table_name, data, changes)
+            return
+        rows = data['rows']
+        for change in changes:
+            op = change[0]
+            if self.savepoints:
+                if op in ('I', 'U', 'D'):
+                    self.undo.append(('row', rows, rows.undo_entry(change[2])))
+                else:
+                    self.undo.append(('index', data, change[2], data['indexes'].get(change[2]),
+                                      len(self.index_changes)))
+            if op in ('I', 'U'):
+                rows.write(change[2], data['meta'].row(change[3]), inserted=op == 'I')
+            elif op == 'D':
+                rows.write(change[2], None)
+            else:
+                if op == 'CI':
+                    definition = change[3]
+                    IndexManager.create_index(data, change[2], definition.get('type', 'HASH'),
+                                              definition.get('unique', False))
+                elif op == 'DI':
+                    data['indexes'].pop(change[2], None)
+                self.index_changes.append(change)
+
+    def deltas(self) -> List[List[Any]]:
+        """
+        The open transaction's net changes as log entries: its index changes,
+        then one entry per row it inserted, updated or deleted (a row it
+        inserted and deleted again leaves none).
+        """
+        changes = list(self.index_changes)
+        for table_name, view in self.views.items():
+            rows = view['rows']
+            for rid, row in rows.writes.items():
+                if rid in rows.inserted:
+                    if row is not None:
+                        changes.append(['I', table_name, rid, row])
+                elif row is None:
+                    changes.append(['D', table_name, rid])
+                else:
+                    changes.append(['U', table_name, rid, row])
+        return changes
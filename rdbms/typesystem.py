@@ -1,25 +1,53 @@
-
 import datetime
-from typing import Any
+import functools
+from typing import Any, Callable, Optional
 
 class TypeSystem:
     @staticmethod
     def validate(value: Any, expected_type: str) -> Any:
-        if value is None:
+        return TypeSystem.compile(expected_type)(value)
+
+    @staticmethod
+    def base_type(expected_type: str) -> str:
+        """'VARCHAR(50)' -> 'VARCHAR'"""
+        return expected_type.upper().split("(")[0].strip()
+
+    @staticmethod
+    def max_length(expected_type: str) -> Optional[int]:
+        expected_type = expected_type.upper()
+        if not expected_type.startswith("VARCHAR"):
             return None
         try:
-            expected_type = expected_type.upper()
-            if expected_type.startswith("VARCHAR"):
-                max_len = int(expected_type.split("(")[1].split(")")[0])
+            return int(expected_type.split("(")[1].split(")")[0])
+        except (IndexError, ValueError):
+            raise ValueError(f"{expected_type} needs a length, e.g. VARCHAR(50)")
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def compile(expected_type: str) -> Callable[[Any], Any]:
+        """
+        Returns a validator for expected_type. All string handling of the type
+        happens here, once per distinct type; the validator itself only converts.
+        """
+        expected_type = expected_type.upper()
+
+        if expected_type.startswith("VARCHAR"):
+            try:
+                max_len = TypeSystem.max_length(expected_type)
+            except (IndexError, ValueError) as e:
+                raise ValueError(f"Type validation failed for type {expected_type}: {str(e)}")
+
+            def convert(value):
                 val_str = str(value)
                 if len(val_str) > max_len:
                     raise ValueError(f"Value '{val_str}' exceeds max length {max_len}")
                 return val_str
-            
-            elif expected_type == "INTEGER":
-                return int(value)
-            
-            elif expected_type == "BOOLEAN":
+
+        elif expected_type == "INTEGER":
+            convert = int
+
+        elif expected_type == "BOOLEAN":
+            def convert(value):
                 if isinstance(value, bool):
                      return value
                 if str(value).lower() in ('true', '1', 'yes'):
@@ -27,9 +55,10 @@ class TypeSystem:
                 if str(value).lower() in ('false', '0', 'no'):
                     return False
                 raise ValueError(f"Invalid boolean value: {value}")
-                
-            elif expected_type == "DATE":
-                # Expects 'YYYY-MM-DD'
+
+        elif expected_type == "DATE":
+            # Expects 'YYYY-MM-DD'
+            def convert(value):
                 if isinstance(value, datetime.date):
                     return value.isoformat()
                 try:
@@ -37,9 +66,15 @@ class TypeSystem:
                     return str(value)
                 except ValueError:
                      raise ValueError(f"Invalid date format (expected YYYY-MM-DD): {value}")
-            else:
-                 # Fallback
-                 return value
-                
-        except (ValueError, TypeError) as e:
-            raise ValueError(f"Type validation failed for type {expected_type}: {str(e)}")
+        else:
+            # Fallback
+            return lambda value: value
+
+        def validate(value):
+            if value is None:
+                return None
+            try:
+                return convert(value)
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"Type validation failed for type {expected_type}: {str(e)}")
+        return validate
@@ -0,0 +1,157 @@
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Iterator, List, Tuple
+
+# Frame: payload length, crc32 of payload, lsn; then the payload (compact JSON list of changes)
+FRAME = struct.Struct('<IIQ')
+
+
+class WriteAheadLog:
+    """
+    Append-only redo log in the data directory.
+
+    Each commit (an autocommitted statement or a COMMIT) is one framed record
+    holding all of its row-level changes, so multi-table commits are atomic.
+    Records are written to the OS buffer immediately and fsync'ed in groups:
+    the first waiting caller flushes everything appended so far and wakes the
+    others (group commit).
+
+    The log is split into segments named wal.<first lsn>.log. A checkpoint
+    rotates to a new segment and deletes the old ones once the tables they
+    cover have been written out.
+    """
+
+    def __init__(self, data_dir: str, sync: bool = True):
+        self.data_dir = data_dir
+        self.sync = sync
+        self.lock = threading.Lock()
+        self.flushed = threading.Condition(self.lock)
+        self.flushing = False
+        self.file = None
+
+        last_lsn = 0
+        for start, path in self._segments():
+            last_lsn = max(last_lsn, start - 1)
+            for lsn, _ in self._read_segment(path):
+                last_lsn = lsn
+        self.last_lsn = last_lsn
+        self.written_lsn = last_lsn
+        self.flushed_lsn = last_lsn
+        self.stats = {'records': 0, 'syncs': 0}
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        segments = []
+        for name in os.listdir(self.data_dir):
+            if name.startswith("wal.") and name.endswith(".log"):
+                try:
+                    start = int(name[4:-4])
+                except ValueError:
+                    continue
+                segments.append((start, os.path.join(self.data_dir, name)))
+        return sorted(segments)
+
+    def _read_segment(self, path: str) -> Iterator[Tuple[int, List[Any]]]:
+        with open(path, 'rb') as f:
+            data = f.read()
+        pos = 0
+        while pos + FRAME.size <= len(data):
+            length, crc, lsn = FRAME.unpack_from(data, pos)
+            payload = data[pos + FRAME.size:pos + FRAME.size + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                # Torn write at the tail: everything before it is intact
+                break
+            yield lsn, json.loads(payload)
+            pos += FRAME.size + length
+
+    def records(self) -> Iterator[Tuple[int, List[Any]]]:
+        """Yields (lsn, changes) for every intact record, oldest first."""
+        for _, path in self._segments():
+            yield from self._read_segment(path)
+
+    def open(self):
+        """Starts a fresh segment for new records."""
+        path = os.path.join(self.data_dir, f"wal.{self.last_lsn + 1}.log")
+        self.file = open(path, 'ab')
+
+    def append(self, changes: List[Any]) -> int:
+        """Appends one commit record and returns once it is durable."""
+        lsn = self.write(changes)
+        self.wait(lsn)
+        return lsn
+
+    def write(self, changes: List[Any]) -> int:
+        """
+        Appends one commit record to the log buffer and returns its LSN. The
+        record is not durable until wait(lsn) returns; callers release their
+        own locks in between so concurrent commits can share one fsync.
+        """
+        payload = json.dumps(changes, separators=(',', ':')).encode('utf-8')
+        with self.lock:
+            self.last_lsn += 1
+            lsn = self.last_lsn
+            self.file.write(FRAME.pack(len(payload), zlib.crc32(payload), lsn) + payload)
+            self.written_lsn = lsn
+            self.stats['records'] += 1
+        return lsn
+
+    def wait(self, lsn: int):
+        """Blocks until every record up to lsn has been fsync'ed (group commit)."""
+        with self.lock:
+            while self.flushed_lsn < lsn:
+                if self.flushing:
+                    # Someone else is syncing; our record rides along with the next group
+                    self.flushed.wait()
+                    continue
+                self.flushing = True
+                target = self.written_lsn
+                f = self.file
+                self.lock.release()
+                try:
+                    f.flush()
+                    if self.sync:
+                        os.fsync(f.fileno())
+                finally:
+                    self.lock.acquire()
+                    self.flushing = False
+                self.flushed_lsn = max(self.flushed_lsn, target)
+                self.stats['syncs'] += 1
+                self.flushed.notify_all()
+
+    def rotate(self) -> List[str]:
+        """
+        Switches appends to a new segment; returns the paths of the older
+        segments, which the caller deletes after checkpointing.
+        """
+        with self.lock:
+            while self.flushing:
+                self.flushed.wait()
+            old = [path for _, path in self._segments()]
+            if self.file is not None:
+                # Make whatever is still buffered durable before leaving the segment
+                self.file.flush()
+                if self.sync:
+                    os.fsync(self.file.fileno())
+                self.file.close()
+                self.flushed_lsn = self.written_lsn
+                self.flushed.notify_all()
+            self.open()
+            current = self.file.name
+            return [path for path in old if path != current]
+
+    def remove(self, paths: List[str]):
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def size(self) -> int:
+        return self.file.tell() if self.file is not None else 0
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+                self.file.close()
+                self.file = None
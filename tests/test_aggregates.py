@@ -0,0 +1,57 @@
+import pytest
+import shutil
+import os
+from rdbms.pydb import Database
+
+TEST_DB_DIR = "test_data_aggregates"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR)
+    db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, category_id INTEGER, price INTEGER, name VARCHAR(20))")
+    for i, (category, price) in enumerate([(1, 10), (2, 30), (1, 20), (3, None), (2, 50), (1, 30)]):
+        db.execute(f"INSERT INTO items VALUES ({i}, {category}, {'NULL' if price is None else price}, 'item {i}')")
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def test_aggregates_without_group_by(db):
+    assert db.query("SELECT COUNT(*), COUNT(price), SUM(price), MIN(price), MAX(price), AVG(price) FROM items") == \
+        [[6, 5, 140, 10, 50, 28.0]]
+    assert db.query("SELECT count(*), max(price) FROM items WHERE category_id = 1") == [[3, 30]]
+    # Exactly one row even when nothing matches
+    assert db.query("SELECT COUNT(*), SUM(price) FROM items WHERE price > 100") == [[0, None]]
+
+def test_group_by(db):
+    rows = db.query("SELECT category_id, COUNT(*), SUM(price) FROM items GROUP BY category_id")
+    assert rows == [[1, 3, 60], [2, 2, 80], [3, 1, None]]
+    rows = db.query("SELECT category_id, AVG(price) FROM items WHERE price > 10 GROUP BY category_id "
+                    "ORDER BY AVG(price) DESC LIMIT 1")
+    assert rows == [[2, 40.0]]
+    assert db.query("SELECT items.category_id FROM items GROUP BY category_id ORDER BY category_id DESC") == [[3], [2], [1]]
+
+def test_group_by_on_join(db):
+    db.execute("CREATE TABLE categories (id INTEGER PRIMARY KEY, name VARCHAR(20))")
+    db.execute("INSERT INTO categories VALUES (1, 'Books')")
+    db.execute("INSERT INTO categories VALUES (2, 'Games')")
+    rows = db.query("SELECT categories.name, COUNT(*) FROM items JOIN categories ON items.category_id = categories.id "
+                    "GROUP BY categories.name ORDER BY categories.name")
+    assert rows == [['Books', 3], ['Games', 2]]
+
+def test_min_max_from_btree_index(db):
+    db.execute("CREATE INDEX ON items(price) USING BTREE")
+    assert db.query("SELECT MIN(price), MAX(price), COUNT(*) FROM items") == [[10, 50, 6]]
+    assert db.query("SELECT MAX(price) FROM items WHERE price < 50 AND name != 'item 1'") == [[30]]
+    assert db.query("SELECT MIN(price) FROM items WHERE price > 100") == [[None]]
+    # Matches the scan when another index narrows the rows instead
+    assert db.query("SELECT MAX(price) FROM items WHERE id = 2") == [[20]]
+
+def test_aggregate_errors(db):
+    with pytest.raises(ValueError):
+        db.query("SELECT name, COUNT(*) FROM items GROUP BY category_id")
+    with pytest.raises(ValueError):
+        db.query("SELECT SUM(name) FROM items")
+    with pytest.raises(ValueError):
+        db.query("SELECT * FROM items GROUP BY category_id")
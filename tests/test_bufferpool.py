@@ -0,0 +1,96 @@
+import pytest
+import shutil
+import os
+from rdbms.pydb import Database
+from rdbms.bufferpool import BufferPool
+
+TEST_DB_DIR = "test_data_bufferpool"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR)
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def test_repeated_reads_hit_the_pool(db):
+    db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(50))")
+    db.execute("INSERT INTO users VALUES (1, 'Alice')")
+    stats = db.storage.pool.stats
+    misses = stats['misses']
+
+    for _ in range(5):
+        assert db.query("SELECT name FROM users WHERE id = 1") == [['Alice']]
+    assert stats['misses'] == misses
+    assert stats['hits'] >= 5
+
+def test_lru_eviction_under_budget(db):
+    for name in ("a", "b", "c"):
+        db.execute(f"CREATE TABLE {name} (id INTEGER, note VARCHAR(50))")
+        db.execute(f"INSERT INTO {name} VALUES (1, '{name}')")
+    db.storage.checkpoint()
+
+    small = Database(data_dir=TEST_DB_DIR, cache_bytes=1)
+    pool = small.storage.pool
+    assert small.query("SELECT note FROM a") == [['a']]
+    assert small.query("SELECT note FROM b") == [['b']]
+    # Only the most recently used table fits
+    assert pool.peek("a") is None
+    assert pool.peek("b") is not None
+    assert pool.stats['evictions'] >= 1
+
+    # Evicted tables are simply reloaded
+    assert small.query("SELECT note FROM a") == [['a']]
+
+def test_uncheckpointed_tables_stay_pinned(db):
+    db.execute("CREATE TABLE a (id INTEGER, note VARCHAR(50))")
+    db.execute("CREATE TABLE b (id INTEGER, note VARCHAR(50))")
+    small = Database(data_dir=TEST_DB_DIR, cache_bytes=1, checkpoint_bytes=1 << 30)
+    small.storage.checkpoint_bytes = 1 << 30
+
+    small.execute("INSERT INTO a VALUES (1, 'only in the log')")
+    small.query("SELECT * FROM b")
+    # 'a' holds changes that are not in its file yet, so it cannot be dropped
+    assert small.storage.pool.peek("a") is not None
+    assert small.query("SELECT note FROM a") == [['only in the log']]
+
+    small.storage.checkpoint()
+    small.query("SELECT * FROM b")
+    assert small.storage.pool.peek("a") is None
+    assert small.query("SELECT note FROM a") == [['only in the log']]
+
+def test_pressure_checkpoint_only_when_it_frees_memory(db):
+    db.execute("CREATE TABLE a (id INTEGER, note VARCHAR(50))")
+    db.execute("CREATE TABLE b (id INTEGER, note VARCHAR(50))")
+    small = Database(data_dir=TEST_DB_DIR, cache_bytes=1, checkpoint_bytes=1 << 30)
+
+    # One table over the budget stays cached anyway: checkpointing it frees nothing
+    for i in range(20):
+        small.execute(f"INSERT INTO a VALUES ({i}, 'a')")
+    assert small.storage._checkpointer is None
+
+    # Once it is not the most recent entry, a checkpoint lets it be evicted
+    small.query("SELECT * FROM b")
+    small.execute("INSERT INTO b VALUES (1, 'b')")
+    assert small.storage._checkpointer is not None
+    small.close()
+
+def test_drop_table_invalidates(db):
+    db.execute("CREATE TABLE users (id INTEGER, name VARCHAR(50))")
+    db.execute("INSERT INTO users VALUES (1, 'Alice')")
+    db.storage.drop_table("users")
+    assert db.storage.pool.peek("users") is None
+
+    db.execute("CREATE TABLE users (id INTEGER, name VARCHAR(50))")
+    assert db.query("SELECT * FROM users") == []
+
+def test_pool_keeps_most_recent_entry():
+    pool = BufferPool(10, pinned=lambda name: False)
+    pool.put("a", {}, 8)
+    pool.put("b", {}, 8)
+    assert pool.peek("a") is None
+    pool.put("c", {}, 100)
+    assert pool.peek("c") is not None and pool.peek("b") is None
+    assert pool.stats['evictions'] == 2
@@ -0,0 +1,71 @@
+import pytest
+import shutil
+import os
+from rdbms.pydb import Database
+from rdbms.indexes import IndexManager
+
+TEST_DB_DIR = "test_data_bulk"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR)
+    db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR(50) NOT NULL, price INTEGER)")
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def test_multi_row_insert(db):
+    records = db.storage.wal.stats['records']
+    assert db.execute("INSERT INTO items VALUES (1, 'a, with comma', 10), (2, 'b', NULL),\n (3, 'c', 30)") == \
+        "3 rows inserted."
+    assert db.query("SELECT * FROM items") == [[1, 'a, with comma', 10], [2, 'b', None], [3, 'c', 30]]
+    # One statement, one log record
+    assert db.storage.wal.stats['records'] == records + 1
+
+    with pytest.raises(ValueError):
+        db.execute("INSERT INTO items VALUES (4, 'd', 1), (5, 'e')")
+    # A duplicate within the batch or against the table rejects the whole statement
+    with pytest.raises(ValueError, match="Duplicate"):
+        db.execute("INSERT INTO items VALUES (4, 'd', 1), (4, 'e', 2)")
+    with pytest.raises(ValueError, match="Duplicate"):
+        db.execute("INSERT INTO items VALUES (5, 'e', 1), (1, 'f', 2)")
+    with pytest.raises(ValueError, match="NULL"):
+        db.execute("INSERT INTO items VALUES (6, 'g', 1), (7, NULL, 2)")
+    assert db.query("SELECT COUNT(*) FROM items") == [[3]]
+
+def test_insert_many(db):
+    db.execute("CREATE INDEX ON items(price) USING BTREE")
+    db.insert_many("items", [(i, f"item {i}", i % 7) for i in range(0, 200, 2)])
+    # A second batch merges into the ordered index
+    assert db.insert_many("items", ((i, f"item {i}", i % 7) for i in range(1, 200, 2))) == "100 rows inserted."
+
+    idx = db.tm.get_table_data("items")['indexes']['price']
+    assert idx['keys'] == list(range(7))
+    rows = db.tm.get_table_data("items")['rows']
+    for key, rids in zip(idx['keys'], idx['rids']):
+        assert sorted(rows[rid][0] for rid in rids) == [i for i in range(200) if i % 7 == key]
+    assert db.query("SELECT COUNT(*) FROM items WHERE price >= 6") == [[28]]
+
+    with pytest.raises(ValueError):
+        db.insert_many("items", [(500, 'x', 1), (0, 'dup', 1)])
+    assert db.query("SELECT COUNT(*) FROM items") == [[200]]
+
+    reopened = Database(data_dir=TEST_DB_DIR)
+    assert reopened.query("SELECT name FROM items WHERE id = 199") == [['item 199']]
+
+def test_merge_matches_one_by_one():
+    from rdbms.schema import TableSchema
+    def table():
+        data = {'schema': {'k': 'INTEGER'}, 'rows': {i: (i % 5,) for i in range(10)}, 'indexes': {}}
+        TableSchema.attach(data)
+        IndexManager.create_index(data, 'k', 'BTREE')
+        return data
+    added = [(100 + i, ((i * 3) % 11 if i % 4 else None,)) for i in range(IndexManager.MERGE_MIN_ROWS)]
+    merged, single = table(), table()
+    IndexManager.insert_rows(merged, added)
+    for rid, row in added:
+        IndexManager.insert_row(single, rid, row)
+    assert merged['indexes']['k']['keys'] == single['indexes']['k']['keys']
+    assert [sorted(r) for r in merged['indexes']['k']['rids']] == [sorted(r) for r in single['indexes']['k']['rids']]
@@ -0,0 +1,55 @@
+import pytest
+import shutil
+import os
+from rdbms.pydb import Database
+from rdbms.columnar import ColumnarTable
+
+np = pytest.importorskip("numpy")
+
+TEST_DB_DIR = "test_data_columnar"
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(ColumnarTable, 'MIN_ROWS', 4)
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR, columnar=True)
+    db.execute("CREATE TABLE items (id INTEGER, name VARCHAR(20), price INTEGER, active BOOLEAN, added DATE)")
+    rows = [(1, "'bolt'", 10, 'true', "'2024-01-05'"), (2, "'nut'", 'NULL', 'false', "'2024-02-01'"),
+            (3, "'screw'", 30, 'true', 'NULL'), (4, 'NULL', 40, 'NULL', "'2023-12-31'"),
+            (5, "'bolt'", 50, 'false', "'2024-01-05'"), (6, "'washer'", 10, 'true', "'2024-03-10'")]
+    for row in rows:
+        db.execute(f"INSERT INTO items VALUES ({', '.join(map(str, row))})")
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def both(db, sql):
+    """Runs sql through the row path and the columnar path; they must agree."""
+    db.executor.columnar = False
+    expected = db.query(sql)
+    db.executor.columnar = True
+    assert db.query(sql) == expected
+    return expected
+
+def test_vectorized_where_matches_row_path(db):
+    for where in ("price > 10", "price <= 30 AND active = true", "price != 10", "name = 'bolt'",
+                  "name > 'bolt' AND name < 't'", "name >= 'c'", "name = 'missing'", "name != 'nut'",
+                  "added >= '2024-01-05'", "added < '2024-02-01'", "active = NULL", "price = 1.5"):
+        both(db, f"SELECT id FROM items WHERE {where}")
+    assert both(db, "SELECT id FROM items WHERE name > 'bolt' AND price >= 30") == [[3]]
+    assert 'columnar' in db.tm.get_table_data('items')
+
+def test_vectorized_aggregates(db):
+    rows = both(db, "SELECT COUNT(*), COUNT(price), SUM(price), MIN(price), MAX(name), AVG(price), MIN(added) "
+                    "FROM items WHERE id > 1")
+    assert rows == [[5, 4, 130, 10, 'washer', 32.5, '2023-12-31']]
+    assert both(db, "SELECT SUM(price), MAX(active) FROM items WHERE price > 100") == [[None, None]]
+
+def test_writes_invalidate_columnar_copy(db):
+    assert db.query("SELECT id FROM items WHERE price > 40") == [[5]]
+    db.execute("UPDATE items SET price = 45 WHERE id = 1")
+    assert 'columnar' not in db.tm.get_table_data('items')
+    assert db.query("SELECT id FROM items WHERE price > 40") == [[1], [5]]
+    db.execute("DELETE FROM items WHERE id = 5")
+    assert db.query("SELECT COUNT(*), MAX(price) FROM items WHERE price > 0") == [[4, 45]]
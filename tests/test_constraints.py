@@ -62,3 +62,53 @@ def test_composite_constraints(db):
         
     with pytest.raises(Exception): # Fail Not Null
         db.execute("INSERT INTO users VALUES (3, NULL)")
+
+def test_unique_columns_get_backing_index(db):
+    db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(50) UNIQUE, name VARCHAR(50))")
+
+    indexes = db.tm.get_table_data("users")['indexes']
+    assert set(indexes) == {'id', 'email'}
+    assert indexes['id']['unique'] is True
+
+    # Constraint indexes cannot be dropped out from under the constraint
+    with pytest.raises(ValueError):
+        db.execute("DROP INDEX ON users(id)")
+
+def test_update_enforces_unique(db):
+    db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(50) UNIQUE NOT NULL)")
+    db.execute("INSERT INTO users VALUES (1, 'a@test.com')")
+    db.execute("INSERT INTO users VALUES (2, 'b@test.com')")
+
+    with pytest.raises(Exception) as exc:
+        db.execute("UPDATE users SET email = 'a@test.com' WHERE id = 2")
+    assert "Duplicate value 'a@test.com'" in str(exc.value)
+
+    with pytest.raises(Exception) as exc:
+        db.execute("UPDATE users SET email = NULL WHERE id = 2")
+    assert "cannot be NULL" in str(exc.value)
+
+    # Setting a row to its own value is not a conflict
+    db.execute("UPDATE users SET email = 'b@test.com' WHERE id = 2")
+    db.execute("UPDATE users SET email = 'c@test.com' WHERE id = 2")
+    db.execute("INSERT INTO users VALUES (3, 'b@test.com')")
+
+def test_failed_update_changes_nothing(db):
+    db.execute("CREATE TABLE users (id INTEGER, email VARCHAR(50) UNIQUE)")
+    db.execute("INSERT INTO users VALUES (1, 'a@test.com')")
+    db.execute("INSERT INTO users VALUES (1, 'b@test.com')")
+
+    # Both rows would end up with the same email
+    db.execute("BEGIN")
+    with pytest.raises(Exception):
+        db.execute("UPDATE users SET email = 'z@test.com' WHERE id = 1")
+    emails = sorted(r[0] for r in db.query("SELECT email FROM users"))
+    db.execute("ROLLBACK")
+    assert emails == ['a@test.com', 'b@test.com']
+
+def test_varchar_needs_a_length(db):
+    with pytest.raises(ValueError, match="needs a length"):
+        db.execute("CREATE TABLE notes (id INTEGER, body VARCHAR)")
+    # Nothing was created, so the name is still free
+    assert "notes" not in db.storage.list_tables()
+    db.execute("CREATE TABLE notes (id INTEGER, body VARCHAR(20))")
+    assert db.query("SELECT * FROM notes") == []
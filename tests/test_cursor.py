@@ -0,0 +1,81 @@
+import pytest
+import shutil
+import os
+from rdbms.pydb import Database
+
+TEST_DB_DIR = "test_data_cursor"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR)
+    db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR(50))")
+    for i in range(10):
+        db.execute(f"INSERT INTO items VALUES ({i}, 'item {i}')")
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def test_cursor_fetch_methods(db):
+    cursor = db.cursor("SELECT id FROM items WHERE id >= 3")
+    assert cursor.status is None
+    assert cursor.fetchone() == [3]
+    assert cursor.fetchmany(2) == [[4], [5]]
+    assert [row for row in cursor] == [[6], [7], [8], [9]]
+    assert cursor.fetchone() is None
+    assert cursor.fetchall() == []
+    assert cursor.rowcount == 7
+
+def test_cursor_is_lazy(db):
+    cursor = db.cursor("SELECT * FROM items")
+    assert cursor.fetchmany(3) == [[0, 'item 0'], [1, 'item 1'], [2, 'item 2']]
+    # Later rows are only read when fetched, so they see this update
+    db.execute("UPDATE items SET name = 'changed' WHERE id = 5")
+    assert cursor.fetchall()[2] == [5, 'changed']
+
+def test_cursor_survives_concurrent_delete(db):
+    cursor = db.cursor("SELECT id FROM items")
+    assert cursor.fetchmany(2) == [[0], [1]]
+    db.execute("DELETE FROM items WHERE id = 5")
+    assert [row[0] for row in cursor] == [2, 3, 4, 6, 7, 8, 9]
+
+def test_cursor_join_and_errors(db):
+    db.execute("CREATE TABLE tags (item_id INTEGER, tag VARCHAR(20))")
+    db.execute("INSERT INTO tags VALUES (1, 'red')")
+    cursor = db.cursor("SELECT items.name, tags.tag FROM items LEFT JOIN tags ON items.id = tags.item_id")
+    assert cursor.fetchmany(2) == [['item 0', None], ['item 1', 'red']]
+
+    # Planning errors surface when the cursor is created, not on first fetch
+    with pytest.raises(ValueError):
+        db.cursor("SELECT * FROM missing")
+
+    status = db.cursor("INSERT INTO items VALUES (10, 'item 10')")
+    assert status.status == "1 row inserted."
+    assert status.fetchall() == []
+
+def test_limit_offset(db):
+    assert db.query("SELECT id FROM items LIMIT 3") == [[0], [1], [2]]
+    assert db.query("SELECT id FROM items LIMIT 3 OFFSET 8") == [[8], [9]]
+    assert db.query("SELECT id FROM items WHERE id > 2 LIMIT 2 OFFSET 1") == [[4], [5]]
+    assert db.query("SELECT id FROM items LIMIT 0") == []
+
+def test_limit_walks_ordered_index_lazily(db):
+    db.execute("CREATE TABLE prices (id INTEGER, price INTEGER)")
+    for i in range(10):
+        db.execute(f"INSERT INTO prices VALUES ({i}, {i * 10})")
+    db.execute("CREATE INDEX ON prices(price) USING BTREE")
+    assert db.query("SELECT id FROM prices WHERE price >= 30 LIMIT 2") == [[3], [4]]
+
+    # The walk resumes by key, so deletes between fetches don't derail it
+    cursor = db.cursor("SELECT id FROM prices WHERE price > 0")
+    assert cursor.fetchone() == [1]
+    db.execute("DELETE FROM prices WHERE price = 20")
+    assert cursor.fetchmany(2) == [[3], [4]]
+
+def test_limit_on_join(db):
+    db.execute("CREATE TABLE tags (item_id INTEGER, tag VARCHAR(20))")
+    for i in range(10):
+        db.execute(f"INSERT INTO tags VALUES ({i}, 'tag {i}')")
+    rows = db.query("SELECT items.id, tags.tag FROM items JOIN tags ON items.id = tags.item_id WHERE items.id > 3 LIMIT 2 OFFSET 1")
+    assert rows == [[5, 'tag 5'], [6, 'tag 6']]
@@ -0,0 +1,110 @@
+import pytest
+import shutil
+import os
+from rdbms.pydb import Database
+
+TEST_DB_DIR = "test_data_indexes"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR)
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def test_create_index_and_lookup(db):
+    db.execute("CREATE TABLE items (id INTEGER, name VARCHAR(50))")
+    for i in range(20):
+        db.execute(f"INSERT INTO items VALUES ({i}, 'item{i}')")
+
+    db.execute("CREATE INDEX ON items(id)")
+
+    results = db.query("SELECT name FROM items WHERE id = 7")
+    assert results == [['item7']]
+
+    # Remaining predicates still apply to the index candidates
+    assert db.query("SELECT name FROM items WHERE id = 7 AND name = 'other'") == []
+
+def test_index_maintained_by_writes(db):
+    db.execute("CREATE TABLE items (id INTEGER, name VARCHAR(50))")
+    db.execute("CREATE INDEX ON items(name)")
+
+    db.execute("INSERT INTO items VALUES (1, 'a')")
+    db.execute("INSERT INTO items VALUES (2, 'b')")
+    db.execute("INSERT INTO items VALUES (3, 'a')")
+    assert sorted(r[0] for r in db.query("SELECT id FROM items WHERE name = 'a'")) == [1, 3]
+
+    db.execute("UPDATE items SET name = 'b' WHERE id = 1")
+    assert db.query("SELECT id FROM items WHERE name = 'a'") == [[3]]
+    assert sorted(r[0] for r in db.query("SELECT id FROM items WHERE name = 'b'")) == [1, 2]
+
+    db.execute("DELETE FROM items WHERE name = 'b'")
+    assert db.query("SELECT id FROM items WHERE name = 'b'") == []
+    assert db.query("SELECT id FROM items WHERE name = 'a'") == [[3]]
+
+def test_index_persisted_and_dropped(db):
+    db.execute("CREATE TABLE items (id INTEGER, name VARCHAR(50))")
+    db.execute("INSERT INTO items VALUES (1, 'a')")
+    db.execute("CREATE INDEX ON items(id)")
+
+    reopened = Database(data_dir=TEST_DB_DIR)
+    table_data = reopened.tm.get_table_data("items")
+    assert table_data['indexes']['id']['map'] == {'1': [0]}
+
+    with pytest.raises(ValueError):
+        reopened.execute("CREATE INDEX ON items(id)")
+
+    reopened.execute("DROP INDEX ON items(id)")
+    assert Database(data_dir=TEST_DB_DIR).tm.get_table_data("items")['indexes'] == {}
+
+def test_index_rolled_back_with_transaction(db):
+    db.execute("CREATE TABLE items (id INTEGER, name VARCHAR(50))")
+    db.execute("CREATE INDEX ON items(id)")
+    db.execute("INSERT INTO items VALUES (1, 'a')")
+
+    db.execute("BEGIN")
+    db.execute("INSERT INTO items VALUES (2, 'b')")
+    assert db.query("SELECT name FROM items WHERE id = 2") == [['b']]
+    db.execute("ROLLBACK")
+
+    assert db.query("SELECT name FROM items WHERE id = 2") == []
+
+def test_ordered_index_range_lookup(db):
+    db.execute("CREATE TABLE items (id INTEGER, price INTEGER, restocked DATE)")
+    for i in range(1, 11):
+        db.execute(f"INSERT INTO items VALUES ({i}, {i * 10}, '2025-01-{i:02d}')")
+    db.execute("CREATE INDEX ON items(price) USING BTREE")
+    db.execute("CREATE INDEX ON items(restocked) USING BTREE")
+
+    ids = [r[0] for r in db.query("SELECT id FROM items WHERE price > 20 AND price <= 50")]
+    assert ids == [3, 4, 5]
+
+    ids = [r[0] for r in db.query("SELECT id FROM items WHERE restocked >= '2025-01-08'")]
+    assert ids == [8, 9, 10]
+
+    assert db.query("SELECT id FROM items WHERE price = 70") == [[7]]
+    assert db.query("SELECT id FROM items WHERE price < 10") == []
+
+def test_ordered_index_maintained_by_writes(db):
+    db.execute("CREATE TABLE items (id INTEGER, price INTEGER)")
+    db.execute("CREATE INDEX ON items(price) USING BTREE")
+    db.execute("INSERT INTO items VALUES (1, 30)")
+    db.execute("INSERT INTO items VALUES (2, 10)")
+    db.execute("INSERT INTO items VALUES (3, 20)")
+
+    db.execute("UPDATE items SET price = 40 WHERE id = 2")
+    db.execute("DELETE FROM items WHERE id = 3")
+
+    idx = db.tm.get_table_data("items")['indexes']['price']
+    assert idx['keys'] == [30, 40]
+    assert [r[0] for r in db.query("SELECT id FROM items WHERE price >= 30")] == [1, 2]
+
+    reopened = Database(data_dir=TEST_DB_DIR)
+    assert reopened.tm.get_table_data("items")['indexes']['price']['type'] == 'BTREE'
+
+def test_unknown_index_type(db):
+    db.execute("CREATE TABLE items (id INTEGER)")
+    with pytest.raises(ValueError):
+        db.execute("CREATE INDEX ON items(id) USING RTREE")
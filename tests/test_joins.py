@@ -68,3 +68,119 @@ def test_join_with_where(db):
     
     assert len(results) == 1
     assert results[0][1] == 'Alice Post'
+
+def _join_algorithms():
+    from rdbms.joins import JoinExecutor
+    left = [(i, i % 4 if i % 5 else None) for i in range(30)]
+    right = [(c, f"cat {c}") for c in (0, 1, 1, 2)]
+    cond = {'left_pos': 1, 'right_pos': 0, 'right_width': 2}
+    return JoinExecutor, left, right, cond
+
+def test_join_algorithms_agree():
+    JoinExecutor, left, right, cond = _join_algorithms()
+    key = lambda r: [str(v) for v in r]
+    for join_type in ('INNER', 'LEFT'):
+        expected = list(JoinExecutor.nested_loop_join(left, right, cond, join_type))
+        # Build on either side
+        assert list(JoinExecutor.hash_join(left, right, cond, join_type)) == expected
+        swapped = {'left_pos': 0, 'right_pos': 1, 'right_width': 2}
+        assert list(JoinExecutor.hash_join(right, left, swapped, join_type)) == \
+            list(JoinExecutor.nested_loop_join(right, left, swapped, join_type))
+        merged = JoinExecutor.merge_join(left, right, cond, join_type)
+        assert sorted(map(key, merged)) == sorted(map(key, expected))
+
+    # Joined rows are the left values followed by the right values
+    inner = list(JoinExecutor.hash_join(left, right, cond, 'INNER'))
+    assert inner[0] == (1, 1, 1, 'cat 1')
+    # NULL join values never match; LEFT keeps those rows
+    assert all(r[1] is not None for r in inner)
+    left_rows = list(JoinExecutor.hash_join(left, right, cond, 'LEFT'))
+    assert len(left_rows) > len(inner)
+    assert (0, None, None, None) in left_rows
+
+def test_join_algorithm_choice():
+    from rdbms.joins import JoinExecutor
+    assert JoinExecutor.choose(3, 3) == 'NESTED_LOOP'
+    assert JoinExecutor.choose(1000, 50) == 'HASH'
+    assert JoinExecutor.choose(1000, 50, presorted=True) == 'MERGE'
+
+def test_merge_join_on_btree_indexes(db):
+    db.execute("CREATE TABLE users (id INTEGER, name VARCHAR(50))")
+    db.execute("CREATE TABLE posts (id INTEGER, user_id INTEGER, title VARCHAR(50))")
+    db.execute("CREATE INDEX ON users(id) USING BTREE")
+    db.execute("CREATE INDEX ON posts(user_id) USING BTREE")
+    for i in range(12, 0, -1):
+        db.execute(f"INSERT INTO users VALUES ({i}, 'user {i}')")
+        db.execute(f"INSERT INTO posts VALUES ({i}, {i % 6}, 'post {i}')")
+    db.execute("INSERT INTO users VALUES (NULL, 'nobody')")
+
+    results = db.query("SELECT users.id, posts.id FROM users LEFT JOIN posts ON users.id = posts.user_id")
+    # Rows come back in join-column order, unmatched users last with NULLs
+    matched = [r for r in results if r[1] is not None]
+    assert matched == sorted(matched, key=lambda r: r[0])
+    assert sorted(r[1] for r in matched) == [i for i in range(1, 13) if i % 6]
+    assert sorted(r[0] for r in results if r[1] is None and r[0] is not None) == list(range(6, 13))
+    assert [None, None] in results
+
+def test_index_nested_loop_join(db, monkeypatch):
+    from rdbms.joins import JoinExecutor
+    db.execute("CREATE TABLE customers (id INTEGER PRIMARY KEY, name VARCHAR(50))")
+    db.execute("CREATE TABLE orders (id INTEGER, customer_id INTEGER)")
+    for i in range(40):
+        db.execute(f"INSERT INTO customers VALUES ({i}, 'customer {i}')")
+    for i in range(10):
+        db.execute(f"INSERT INTO orders VALUES ({i}, {i * 7})")
+    db.execute("INSERT INTO orders VALUES (10, NULL)")
+
+    # customers.id has a unique hash index, so only the matching customers are fetched
+    assert JoinExecutor.choose(11, 40, right_indexed=True) == 'INDEX'
+    def no_scan(*args, **kwargs):
+        raise AssertionError("right table scanned")
+    monkeypatch.setattr(JoinExecutor, "hash_join", no_scan)
+    monkeypatch.setattr(JoinExecutor, "nested_loop_join", no_scan)
+
+    results = db.query("SELECT orders.id, customers.name FROM orders LEFT JOIN customers ON orders.customer_id = customers.id")
+    assert results[:3] == [[0, 'customer 0'], [1, 'customer 7'], [2, 'customer 14']]
+    assert [r[1] for r in results[6:]] == [None] * 5
+
+def test_predicate_pushdown_plan():
+    from rdbms.planner import QueryPlanner
+    from rdbms.parser import SQLParser
+    ast = SQLParser().parse("SELECT * FROM users JOIN posts ON posts.user_id = users.id "
+                            "WHERE posts.title = 'X' AND name = 'Alice' AND missing = 1")
+    plan = QueryPlanner.plan_join(ast, ['id', 'name'], ['id', 'user_id', 'title'])
+    # ON operands written right-to-left are oriented to (FROM table, JOIN table)
+    assert (plan['join']['left_col'], plan['join']['right_col']) == ('id', 'user_id')
+    assert plan['left'] == [{'column': 'name', 'operator': '=', 'value': 'Alice'}]
+    assert plan['right'] == [{'column': 'title', 'operator': '=', 'value': 'X'}]
+    assert [c['column'] for c in plan['where']] == ['missing']
+
+    ast['join']['type'] = 'LEFT'
+    plan = QueryPlanner.plan_join(ast, ['id', 'name'], ['id', 'user_id', 'title'])
+    assert plan['right'] == []
+    assert [c['column'] for c in plan['where']] == ['posts.title', 'missing']
+
+def test_pushdown_shrinks_join_inputs(db, monkeypatch):
+    from rdbms.joins import JoinExecutor
+    db.execute("CREATE TABLE users (id INTEGER, name VARCHAR(50))")
+    db.execute("CREATE TABLE posts (id INTEGER, user_id INTEGER, title VARCHAR(50))")
+    for i in range(10):
+        db.execute(f"INSERT INTO users VALUES ({i}, 'user {i}')")
+        db.execute(f"INSERT INTO posts VALUES ({i}, {i % 3}, 'post {i}')")
+
+    sizes = []
+    real_nested_loop = JoinExecutor.nested_loop_join
+    def spy(left_rows, right_rows, *args):
+        sizes.append((len(left_rows), len(right_rows)))
+        return real_nested_loop(left_rows, right_rows, *args)
+    monkeypatch.setattr(JoinExecutor, "nested_loop_join", spy)
+
+    results = db.query("SELECT users.name, posts.title FROM users JOIN posts ON users.id = posts.user_id "
+                       "WHERE posts.title = 'post 4' AND users.id < 5")
+    assert results == [['user 1', 'post 4']]
+    assert sizes == [(5, 1)]
+
+    # LEFT JOIN: a right-table condition still removes NULL-extended rows instead of producing them
+    results = db.query("SELECT users.name, posts.title FROM users LEFT JOIN posts ON users.id = posts.user_id "
+                       "WHERE posts.title = 'post 4'")
+    assert results == [['user 1', 'post 4']]
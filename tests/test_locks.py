@@ -0,0 +1,77 @@
+import pytest
+import shutil
+import os
+import threading
+from rdbms.pydb import Database
+from rdbms.locks import LockManager
+
+TEST_DB_DIR = "test_data_locks"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR, sync=False)
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def test_shared_and_exclusive_locks():
+    locks = LockManager()
+    # Two readers hold the table at the same time
+    both_in = threading.Barrier(2, timeout=5)
+    def reader():
+        with locks.hold(shared=['t']):
+            both_in.wait()
+    threads = [threading.Thread(target=reader) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # A writer waits for the reader, and readers arriving meanwhile wait behind the writer
+    events = []
+    def write():
+        with locks.hold(exclusive=['t']):
+            events.append('write')
+    def late_read():
+        with locks.hold(shared=['t']):
+            events.append('late read')
+    with locks.hold(shared=['t', 'u']):
+        writer = threading.Thread(target=write)
+        writer.start()
+        while not locks.get('t').waiting_writers:
+            pass
+        late = threading.Thread(target=late_read)
+        late.start()
+        # Other tables are unaffected
+        with locks.hold(exclusive=['other']):
+            pass
+        events.append('read done')
+    writer.join()
+    late.join()
+    assert events == ['read done', 'write', 'late read']
+
+def test_concurrent_writers_lose_nothing(db):
+    db.execute("CREATE TABLE hits (id INTEGER PRIMARY KEY, worker INTEGER)")
+    db.execute("CREATE INDEX ON hits(worker) USING BTREE")
+    errors = []
+    def work(worker):
+        try:
+            for i in range(50):
+                db.execute(f"INSERT INTO hits VALUES ({worker * 1000 + i}, {worker})")
+                db.query(f"SELECT COUNT(*) FROM hits WHERE worker = {worker}")
+            db.execute(f"UPDATE hits SET worker = {worker + 100} WHERE worker = {worker}")
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=work, args=(w,)) for w in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert db.query("SELECT COUNT(*) FROM hits") == [[400]]
+    assert db.query("SELECT worker, COUNT(*) FROM hits GROUP BY worker ORDER BY worker") == \
+        [[w + 100, 50] for w in range(8)]
+    assert len(set(db.tm.get_table_data("hits")['rows'])) == 400
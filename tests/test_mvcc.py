@@ -0,0 +1,133 @@
+import pytest
+import shutil
+import os
+from rdbms.pydb import Database
+from rdbms.executor import Executor
+from rdbms.transactions import TransactionManager
+
+TEST_DB_DIR = "test_data_mvcc"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR, sync=False)
+    db.execute("CREATE TABLE accounts (id INTEGER PRIMARY KEY, owner VARCHAR(20), balance INTEGER)")
+    db.execute("CREATE INDEX ON accounts(balance) USING BTREE")
+    db.insert_many("accounts", [(i, f"owner {i}", i * 10) for i in range(1, 6)])
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def session(db):
+    """A second session over the same storage, with its own transaction state."""
+    executor = Executor(TransactionManager(db.storage))
+    def run(sql):
+        return executor.execute(db.parser.parse(sql))
+    run.tm = executor.tm
+    return run
+
+def test_snapshot_reads(db):
+    a = session(db)
+    a("BEGIN")
+    assert a("SELECT COUNT(*) FROM accounts") == [[5]]
+    # Nothing is copied: the view reads the shared table
+    assert a.tm.get_table_data("accounts")['rows'].data is db.storage.load_table("accounts")
+
+    db.execute("INSERT INTO accounts VALUES (6, 'owner 6', 60)")
+    db.execute("UPDATE accounts SET balance = 5 WHERE id = 3")
+    db.execute("DELETE FROM accounts WHERE id = 1")
+    a("UPDATE accounts SET owner = 'mine' WHERE id = 2")
+
+    # The transaction still sees the table as it began, plus its own write
+    assert a("SELECT COUNT(*) FROM accounts") == [[5]]
+    assert a("SELECT id, balance FROM accounts WHERE balance < 35 ORDER BY balance") == \
+        [[1, 10], [2, 20], [3, 30]]
+    assert a("SELECT owner FROM accounts WHERE id = 2") == [['mine']]
+    assert a("SELECT MAX(balance) FROM accounts") == [[50]]
+    assert a("SELECT * FROM accounts WHERE id = 6") == []
+    assert db.query("SELECT id, owner, balance FROM accounts WHERE id <= 3 ORDER BY id") == \
+        [[2, 'owner 2', 20], [3, 'owner 3', 5]]
+
+    a("COMMIT")
+    assert db.query("SELECT id, owner, balance FROM accounts ORDER BY id") == \
+        [[2, 'mine', 20], [3, 'owner 3', 5], [4, 'owner 4', 40], [5, 'owner 5', 50], [6, 'owner 6', 60]]
+    # With no snapshot open, no old versions are kept
+    assert 'versions' not in db.tm.get_table_data("accounts")
+    assert not db.storage.versions.pinned("accounts")
+
+def test_first_committer_wins(db):
+    a, b = session(db), session(db)
+    a("BEGIN")
+    b("BEGIN")
+    a("UPDATE accounts SET balance = 11 WHERE id = 1")
+    b("UPDATE accounts SET balance = 12 WHERE id = 1")
+    b("INSERT INTO accounts VALUES (7, 'b', 70)")
+    a("COMMIT")
+    with pytest.raises(ValueError, match="conflict"):
+        b("COMMIT")
+    # The losing transaction changed nothing and is over
+    assert db.query("SELECT balance FROM accounts WHERE id = 1") == [[11]]
+    assert db.query("SELECT COUNT(*) FROM accounts") == [[5]]
+    with pytest.raises(ValueError):
+        b("ROLLBACK")
+
+    # Transactions changing different rows both commit
+    a("BEGIN")
+    b("BEGIN")
+    a("UPDATE accounts SET balance = 21 WHERE id = 2")
+    b("UPDATE accounts SET balance = 31 WHERE id = 3")
+    a("COMMIT")
+    b("COMMIT")
+    assert db.query("SELECT balance FROM accounts WHERE id >= 2 AND id <= 3 ORDER BY id") == [[21], [31]]
+
+def test_unique_checked_at_commit(db):
+    a, b = session(db), session(db)
+    a("BEGIN")
+    b("BEGIN")
+    a("INSERT INTO accounts VALUES (8, 'a', 1)")
+    b("INSERT INTO accounts VALUES (8, 'b', 2)")
+    # Within a transaction its own rows count
+    with pytest.raises(ValueError, match="Duplicate"):
+        a("INSERT INTO accounts VALUES (8, 'again', 3)")
+    # A key it deletes can be reused
+    a("DELETE FROM accounts WHERE id = 5")
+    a("INSERT INTO accounts VALUES (5, 'new five', 5)")
+    a("COMMIT")
+    with pytest.raises(ValueError, match="Duplicate"):
+        b("COMMIT")
+    assert db.query("SELECT id, owner FROM accounts WHERE id >= 5 ORDER BY id") == [[5, 'new five'], [8, 'a']]
+
+def test_commit_applies_net_deltas(db):
+    db.execute("BEGIN")
+    for i in range(50):
+        db.execute(f"UPDATE accounts SET balance = {i} WHERE id = 1")
+    db.execute("INSERT INTO accounts VALUES (9, 'temporary', 0)")
+    db.execute("DELETE FROM accounts WHERE id = 9")
+    db.execute("INSERT INTO accounts VALUES (10, 'kept', 0)")
+    db.execute("DELETE FROM accounts WHERE id = 2")
+    # One entry per row changed, however many statements changed it
+    deltas = db.tm.deltas()
+    assert sorted(change[0] for change in deltas) == ['D', 'I', 'U']
+    assert ['U', 'accounts', 0, (1, 'owner 1', 49)] in deltas
+    db.execute("COMMIT")
+
+    assert db.query("SELECT id, balance FROM accounts WHERE id <= 2") == [[1, 49]]
+    assert db.query("SELECT id, owner FROM accounts WHERE id >= 9") == [[10, 'kept']]
+    reopened = Database(data_dir=TEST_DB_DIR, sync=False)
+    assert reopened.query("SELECT id FROM accounts ORDER BY id") == [[1], [3], [4], [5], [10]]
+
+def test_lookups_check_only_matching_writes(db):
+    db.execute("BEGIN")
+    for i in range(1, 6):
+        db.execute(f"UPDATE accounts SET balance = {i} WHERE id = {i}")
+    db.execute("INSERT INTO accounts VALUES (6, 'owner 6', 3)")
+    rows = db.tm.get_table_data("accounts")['rows']
+    balance = db.tm.get_table_data("accounts")['meta'].positions['balance']
+    # An equality lookup adds the writes holding its value, not every write
+    assert rows.candidates([], (balance, 3)) == [2, 5]
+    assert len(rows.candidates([])) == 6
+    assert db.query("SELECT id FROM accounts WHERE balance = 3 ORDER BY id") == [[3], [6]]
+    assert db.query("SELECT id FROM accounts WHERE id = 4 AND balance = 4") == [[4]]
+    assert db.query("SELECT id FROM accounts WHERE balance = 40") == []
+    db.execute("COMMIT")
@@ -0,0 +1,74 @@
+import pytest
+import shutil
+import os
+from rdbms.pydb import Database
+from rdbms.pages import PAGE_SIZE
+
+TEST_DB_DIR = "test_data_pages"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR, engine="page")
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def test_round_trip_across_pages(db):
+    db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR(100), active BOOLEAN, restocked DATE)")
+    for i in range(300):
+        db.execute(f"INSERT INTO items VALUES ({i}, 'item number {i}', {'true' if i % 2 else 'false'}, '2025-01-01')")
+
+    db.storage.checkpoint()
+    path = os.path.join(TEST_DB_DIR, "items.db")
+    assert os.path.getsize(path) > 2 * PAGE_SIZE
+
+    db.execute("DELETE FROM items WHERE id = 10")
+    db.execute("UPDATE items SET name = 'renamed to something considerably longer than before' WHERE id = 20")
+
+    reopened = Database(data_dir=TEST_DB_DIR, engine="page")
+    rows = reopened.query("SELECT * FROM items")
+    assert len(rows) == 299
+    assert reopened.query("SELECT * FROM items WHERE id = 10") == []
+    assert reopened.query("SELECT name, active FROM items WHERE id = 20") == [['renamed to something considerably longer than before', False]]
+    assert reopened.query("SELECT active, restocked FROM items WHERE id = 21") == [[True, '2025-01-01']]
+
+    # The primary key index is rebuilt from the catalog
+    with pytest.raises(Exception):
+        reopened.execute("INSERT INTO items VALUES (21, 'dup', true, '2025-01-01')")
+
+def test_checkpoint_writes_only_dirty_pages(db):
+    db.execute("CREATE TABLE items (id INTEGER, name VARCHAR(100))")
+    for i in range(500):
+        db.execute(f"INSERT INTO items VALUES ({i}, 'item number {i}')")
+    db.storage.checkpoint()
+
+    # Tail page plus the header page (which records the checkpoint LSN)
+    before = db.storage.stats['pages_written']
+    db.execute("INSERT INTO items VALUES (500, 'one more')")
+    db.storage.checkpoint()
+    assert db.storage.stats['pages_written'] - before <= 2
+
+    before = db.storage.stats['pages_written']
+    db.execute("UPDATE items SET name = 'x' WHERE id = 3")
+    db.storage.checkpoint()
+    assert db.storage.stats['pages_written'] - before == 2
+
+def test_rows_too_large_for_a_page_are_rejected(db):
+    db.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body VARCHAR(70000))")
+    db.execute("INSERT INTO notes VALUES (1, 'short')")
+    # Rejected when the statement runs, before anything is logged
+    with pytest.raises(ValueError, match="too large"):
+        db.execute(f"INSERT INTO notes VALUES (2, '{'x' * 5000}')")
+    with pytest.raises(ValueError, match="too large"):
+        db.execute(f"UPDATE notes SET body = '{'x' * 66000}' WHERE id = 1")
+    assert db.query("SELECT body FROM notes") == [['short']]
+
+    db.close()
+    reopened = Database(data_dir=TEST_DB_DIR, engine="page")
+    assert reopened.query("SELECT id, body FROM notes") == [[1, 'short']]
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        Database(data_dir=TEST_DB_DIR, engine="rocks")
@@ -0,0 +1,48 @@
+import pytest
+from rdbms.parser import SQLParser
+
+def test_statement_cache():
+    parser = SQLParser(cache_size=2)
+    first = parser.parse("SELECT name FROM users WHERE id = 1")
+    # Same text up to surrounding whitespace and ';' is served from the cache
+    assert parser.parse("  SELECT name FROM users WHERE id = 1; ") is first
+    assert parser.stats == {'hits': 1, 'misses': 1, 'evictions': 0}
+    assert parser.hit_rate() == 0.5
+    # So is text spaced differently outside string literals
+    assert parser.parse("SELECT name\n  FROM users WHERE   id = 1") is first
+    assert SQLParser.normalize("SELECT  *  FROM t WHERE name = 'a  b'") == "SELECT * FROM t WHERE name = 'a  b'"
+    # Case is kept: an unquoted word may be a value whose case matters
+    assert parser.parse("SELECT id FROM t WHERE flag = ASC") != parser.parse("SELECT id FROM t WHERE flag = asc")
+    parser = SQLParser(cache_size=2)
+    first = parser.parse("SELECT name FROM users WHERE id = 1")
+
+    parser.parse("SELECT * FROM users")
+    parser.parse("SELECT * FROM posts")
+    # Least recently used statement is dropped
+    assert parser.stats['evictions'] == 1
+    assert parser.parse("SELECT name FROM users WHERE id = 1") is not first
+
+    uncached = SQLParser(cache_size=0)
+    assert uncached.parse("BEGIN") is not uncached.parse("BEGIN")
+    assert uncached.stats['hits'] == 0
+
+def test_keyword_dispatch():
+    parser = SQLParser()
+    assert parser.parse("create index on users(name) using btree") == \
+        {'type': 'CREATE_INDEX', 'table': 'users', 'column': 'name', 'index_type': 'BTREE'}
+    assert parser.parse("DROP INDEX ON users(name)")['type'] == 'DROP_INDEX'
+    assert parser.parse("ROLLBACK;") == {'type': 'ROLLBACK'}
+    assert parser.parse("rollback to savepoint batch") == {'type': 'ROLLBACK_TO', 'name': 'batch'}
+    assert parser.parse("RELEASE batch") == {'type': 'RELEASE', 'name': 'batch'}
+    # A malformed ROLLBACK TO is an error, not a full ROLLBACK
+    for sql in ("ROLLBACK TO a-b", "ROLLBACK TO", "COMMIT everything", "BEGIN now"):
+        with pytest.raises(ValueError, match="Syntax error"):
+            parser.parse(sql)
+    assert parser.parse("delete from users where id >= 3")['where'] == \
+        [{'column': 'id', 'operator': '>=', 'value': 3}]
+
+    for sql in ("", "DROP TABLE users", "EXPLAIN SELECT * FROM users", "SELECT 1"):
+        with pytest.raises(ValueError):
+            parser.parse(sql)
+    # Failed statements are not cached
+    assert "SELECT 1" not in parser.cache
@@ -0,0 +1,76 @@
+import pytest
+import shutil
+import os
+from rdbms.pydb import Database
+from rdbms.predicates import PredicateCompiler
+from rdbms.schema import TableSchema
+
+TEST_DB_DIR = "test_data_predicates"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR)
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def compile_where(conditions):
+    meta = TableSchema({'id': 'INTEGER', 'name': 'VARCHAR(20)', 'active': 'BOOLEAN'})
+    return PredicateCompiler.compile(conditions, PredicateCompiler.columns([('t', meta)]))
+
+def cond(column, operator, value):
+    return {'column': column, 'operator': operator, 'value': value}
+
+def test_compiled_predicate_semantics():
+    row = (5, 'Alice', True)
+    null_row = (None, None, None)
+
+    assert compile_where([cond('id', '=', 5), cond('t.name', '=', 'Alice')])(row)
+    # Quoted literals compare like their string form, as before
+    assert compile_where([cond('id', '=', '5')])(row)
+    assert not compile_where([cond('id', '=', '05')])(row)
+    # Lossy conversions are not applied: 5.0 is not '5'
+    assert not compile_where([cond('id', '=', 5.0)])(row)
+    assert compile_where([cond('active', '=', True)])(row)
+    assert compile_where([cond('id', '!=', 4)])(null_row)
+
+    assert compile_where([cond('id', '>', 4), cond('id', '<=', 5)])(row)
+    assert not compile_where([cond('id', '>', 4)])(null_row)
+    assert compile_where([cond('id', '>', 4.5)])(row)
+    # Unknown columns read as NULL
+    assert not compile_where([cond('missing', '>', 1)])(row)
+    assert compile_where([cond('missing', '=', None)])(row)
+
+    with pytest.raises(ValueError):
+        compile_where([cond('id', '~', 1)])
+    # A range literal that doesn't convert to the column type is rejected when compiled
+    with pytest.raises(ValueError, match="Cannot compare"):
+        compile_where([cond('id', '>', 'abc')])
+
+def test_select_update_delete_filter_alike(db):
+    db.execute("CREATE TABLE items (id INTEGER, price INTEGER, name VARCHAR(20))")
+    for i in range(1, 7):
+        db.execute(f"INSERT INTO items VALUES ({i}, {i * 10}, 'item {i}')")
+
+    where = "price >= 20 AND price < 50 AND name != 'item 3'"
+    assert db.query(f"SELECT id FROM items WHERE {where}") == [[2], [4]]
+    # UPDATE used to ignore range conditions and update every row
+    assert db.execute(f"UPDATE items SET name = 'sale' WHERE {where}") == "2 rows updated."
+    assert db.query("SELECT id FROM items WHERE name = 'sale'") == [[2], [4]]
+    assert db.execute("DELETE FROM items WHERE price >= 20 AND price <= 40") == "3 rows deleted."
+    assert db.query("SELECT id FROM items") == [[1], [5], [6]]
+
+def test_unconvertible_range_literal_fails_on_every_plan(db):
+    db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, price INTEGER, stock INTEGER)")
+    db.execute("CREATE INDEX ON items(price) USING BTREE")
+    db.insert_many("items", [(i, i * 10, i) for i in range(1, 6)])
+    # Indexed, unindexed, and UPDATE / DELETE alike
+    for sql in ("SELECT id FROM items WHERE price > 'abc'",
+                "SELECT id FROM items WHERE stock > 'abc'",
+                "UPDATE items SET stock = 0 WHERE price > 'abc'",
+                "DELETE FROM items WHERE stock <= 'abc'"):
+        with pytest.raises(ValueError, match="Cannot compare"):
+            db.execute(sql)
+    assert db.query("SELECT COUNT(*) FROM items WHERE stock > 0") == [[5]]
@@ -0,0 +1,47 @@
+import pytest
+import shutil
+import os
+from rdbms.pydb import Database
+
+TEST_DB_DIR = "test_data_prepared"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR)
+    db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR(50), price INTEGER)")
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def test_prepared_statements(db):
+    insert = db.prepare("INSERT INTO items VALUES (?, ?, ?)")
+    assert insert.parameters == [1, 2, 3]
+    # Values are bound, not spliced into SQL: quotes and commas need no escaping
+    insert.execute((1, "O'Brien, deluxe", 10))
+    insert.execute((2, "plain", "20"))
+    insert.execute((3, "? and :name", None))
+
+    select = db.prepare("SELECT name FROM items WHERE price >= :low AND name != 'x?' LIMIT :n")
+    assert select.parameters == ['low', 'n']
+    assert select.query({'low': 10, 'n': 5}) == [["O'Brien, deluxe"], ['plain']]
+    assert select.query({'low': 15, 'n': 1}) == [['plain']]
+    assert list(select.cursor({'low': 0, 'n': 1})) == [["O'Brien, deluxe"]]
+
+    db.prepare("UPDATE items SET price = ? WHERE id = ?").execute((30, 3))
+    db.execute("DELETE FROM items WHERE id = ?", (1,))
+    assert db.query("SELECT * FROM items ORDER BY id") == [[2, 'plain', 20], [3, '? and :name', 30]]
+    # Parsed once, however many times it runs
+    assert db.parser.stats['misses'] == 6
+
+def test_parameter_errors(db):
+    select = db.prepare("SELECT * FROM items WHERE id = ?")
+    with pytest.raises(ValueError):
+        select.query()
+    with pytest.raises(ValueError):
+        select.query((1, 2))
+    with pytest.raises(ValueError):
+        db.query("SELECT * FROM items WHERE id = :id", {'other': 1})
+    with pytest.raises(ValueError):
+        db.query("SELECT * FROM items LIMIT ?", ('3',))
@@ -57,3 +57,15 @@ def test_persistence(db):
     loaded_table = new_db.get_table("persistent")
     assert len(loaded_table.rows) == 1
     assert loaded_table.rows[0]["id"] == 100
+
+def test_compiled_schema_metadata():
+    from rdbms.schema import TableSchema
+    meta = TableSchema({"id": "INTEGER PRIMARY KEY", "name": "VARCHAR(5) UNIQUE NOT NULL", "active": "BOOLEAN"})
+    assert meta.names == ["id", "name", "active"]
+    assert meta.by_name["name"].type == "VARCHAR"
+    assert meta.by_name["name"].max_length == 5
+    assert meta.unique_columns == ["id", "name"]
+    assert meta.not_null_columns == ["id", "name"]
+    assert meta.by_name["id"].validate("7") == 7
+    with pytest.raises(ValueError):
+        meta.by_name["name"].validate("toolong")
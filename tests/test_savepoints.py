@@ -0,0 +1,73 @@
+import pytest
+import shutil
+import os
+from rdbms.pydb import Database
+
+TEST_DB_DIR = "test_data_savepoints"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR, sync=False)
+    db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR(50), qty INTEGER)")
+    db.insert_many("items", [(i, f"item {i}", i) for i in range(5)])
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def ids(db):
+    return [row[0] for row in db.query("SELECT id FROM items ORDER BY id")]
+
+def test_rollback_to_savepoint(db):
+    with pytest.raises(ValueError):
+        db.execute("SAVEPOINT outside")
+    db.execute("BEGIN")
+    db.execute("INSERT INTO items VALUES (5, 'five', 5)")
+    # No savepoint yet: nothing to undo is recorded
+    assert db.tm.undo == []
+    db.execute("SAVEPOINT a")
+    db.execute("UPDATE items SET qty = 50 WHERE id = 5")
+    db.execute("DELETE FROM items WHERE id = 0")
+    db.execute("INSERT INTO items VALUES (6, 'six', 6)")
+    db.execute("SAVEPOINT b")
+    db.execute("DELETE FROM items WHERE id = 6")
+    db.execute("CREATE INDEX ON items(qty) USING BTREE")
+    assert ids(db) == [1, 2, 3, 4, 5]
+
+    assert db.execute("ROLLBACK TO SAVEPOINT b") == "Rolled Back to Savepoint b"
+    assert ids(db) == [1, 2, 3, 4, 5, 6]
+    assert 'qty' not in db.tm.get_table_data("items")['indexes']
+    db.execute("ROLLBACK TO a")
+    assert ids(db) == [0, 1, 2, 3, 4, 5]
+    assert db.query("SELECT qty FROM items WHERE id = 5") == [[5]]
+    # The value the undone insert held is free again, and b is gone
+    db.execute("INSERT INTO items VALUES (6, 'six again', 6)")
+    with pytest.raises(ValueError, match="savepoint"):
+        db.execute("ROLLBACK TO b")
+    # a is still set: it can be rolled back to again
+    db.execute("ROLLBACK TO a")
+    assert ids(db) == [0, 1, 2, 3, 4, 5]
+
+    db.execute("INSERT INTO items VALUES (7, 'seven', 7)")
+    db.execute("RELEASE SAVEPOINT a")
+    assert db.tm.undo == []
+    db.execute("COMMIT")
+    assert ids(db) == [0, 1, 2, 3, 4, 5, 7]
+
+def test_batches_with_savepoints(db):
+    # An import that keeps each good batch and skips a failing one
+    db.execute("BEGIN")
+    for batch in range(4):
+        db.execute("SAVEPOINT batch")
+        rows = [(100 + batch * 10 + i, f"b{batch}", i) for i in range(10)]
+        if batch == 2:
+            rows.append((0, 'duplicate', 0))
+        try:
+            db.insert_many("items", rows)
+        except ValueError:
+            db.execute("ROLLBACK TO batch")
+        db.execute("RELEASE batch")
+    db.execute("COMMIT")
+    assert db.query("SELECT name, COUNT(*) FROM items WHERE id >= 100 GROUP BY name ORDER BY name") == \
+        [['b0', 10], ['b1', 10], ['b3', 10]]
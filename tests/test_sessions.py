@@ -0,0 +1,76 @@
+import pytest
+import shutil
+import os
+import threading
+from rdbms.pydb import Database, SessionPool
+
+TEST_DB_DIR = "test_data_sessions"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR, sync=False)
+    db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR(50))")
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def test_sessions_have_their_own_transactions(db):
+    a, b = db.connect(), db.connect()
+    a.execute("BEGIN")
+    a.execute("INSERT INTO items VALUES (1, 'from a')")
+    # Other sessions neither see a's uncommitted row nor join its transaction
+    b.execute("INSERT INTO items VALUES (2, 'from b')")
+    assert db.query("SELECT id FROM items") == [[2]]
+    assert a.query("SELECT id FROM items ORDER BY id") == [[1]]
+    a.execute("COMMIT")
+    assert b.query("SELECT id FROM items ORDER BY id") == [[1], [2]]
+
+    # Statements are prepared once per session
+    insert = a.prepare("INSERT INTO items VALUES (?, ?)")
+    assert a.prepare("INSERT INTO items VALUES (?, ?)") is insert
+    assert b.prepare("INSERT INTO items VALUES (?, ?)") is not insert
+    insert.execute((3, 'three'))
+
+    # Leaving a session's block rolls back what it left open
+    with db.connect() as c:
+        c.execute("BEGIN")
+        c.execute("DELETE FROM items WHERE id > 0")
+    assert c.tm.active_transaction is False
+    assert db.query("SELECT COUNT(*) FROM items") == [[3]]
+
+def test_session_pool(db):
+    pool = SessionPool(db, size=2, timeout=0.2)
+    with pool.session() as first:
+        first.execute("BEGIN")
+        first.execute("INSERT INTO items VALUES (1, 'abandoned')")
+        with pool.session() as second:
+            assert second is not first
+            # Both sessions are taken
+            with pytest.raises(TimeoutError):
+                pool.acquire()
+    # Sessions are reused, their open transactions rolled back
+    with pool.session() as again:
+        assert again in (first, second)
+        assert again.tm.active_transaction is False
+    assert db.query("SELECT COUNT(*) FROM items") == [[0]]
+
+    errors = []
+    def work(worker):
+        try:
+            for i in range(20):
+                with pool.session() as session:
+                    session.execute("BEGIN")
+                    session.prepare("INSERT INTO items VALUES (?, ?)").execute((worker * 100 + i, f"w{worker}"))
+                    assert session.query("SELECT COUNT(*) FROM items WHERE name = ?", (f"w{worker}",)) == [[i + 1]]
+                    session.execute("COMMIT")
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=work, args=(w,)) for w in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert db.query("SELECT COUNT(*) FROM items") == [[120]]
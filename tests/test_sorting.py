@@ -0,0 +1,61 @@
+import pytest
+import shutil
+import os
+from rdbms.pydb import Database
+from rdbms.sorting import SortExecutor
+
+TEST_DB_DIR = "test_data_sorting"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR)
+    db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, price INTEGER, name VARCHAR(20))")
+    for i, price in enumerate([30, 10, None, 20, 10, 40]):
+        db.execute(f"INSERT INTO items VALUES ({i}, {'NULL' if price is None else price}, 'item {i}')")
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def test_order_by(db):
+    # Stable, NULLs last ascending and first descending
+    assert db.query("SELECT id FROM items ORDER BY price") == [[1], [4], [3], [0], [5], [2]]
+    assert db.query("SELECT id FROM items ORDER BY price DESC") == [[2], [5], [0], [3], [1], [4]]
+    assert db.query("SELECT id FROM items WHERE price > 10 ORDER BY items.price ASC") == [[3], [0], [5]]
+    with pytest.raises(ValueError):
+        db.query("SELECT id FROM items ORDER BY missing")
+
+def test_order_by_with_limit_is_top_k(db):
+    assert db.query("SELECT id FROM items ORDER BY price LIMIT 2") == [[1], [4]]
+    assert db.query("SELECT id FROM items ORDER BY price DESC LIMIT 2 OFFSET 1") == [[5], [0]]
+
+def test_order_by_uses_btree_index(db):
+    expected = {sql: db.query(sql) for sql in (
+        "SELECT id FROM items ORDER BY price",
+        "SELECT id FROM items ORDER BY price DESC LIMIT 3",
+        "SELECT id FROM items WHERE price >= 20 ORDER BY price DESC",
+        "SELECT id FROM items WHERE name != 'item 0' ORDER BY price",
+    )}
+    db.execute("CREATE INDEX ON items(price) USING BTREE")
+    assert db.executor._ordered_scan('items', db.tm.get_table_data('items'), [],
+                                     {'column': 'price', 'descending': False}) is not None
+    for sql, rows in expected.items():
+        assert db.query(sql) == rows
+
+def test_order_by_on_join(db):
+    db.execute("CREATE TABLE stock (item_id INTEGER, qty INTEGER)")
+    for item_id, qty in [(0, 5), (1, 3), (3, 9)]:
+        db.execute(f"INSERT INTO stock VALUES ({item_id}, {qty})")
+    rows = db.query("SELECT items.name, stock.qty FROM items JOIN stock ON items.id = stock.item_id ORDER BY stock.qty DESC")
+    assert rows == [['item 3', 9], ['item 0', 5], ['item 1', 3]]
+
+def test_external_sort(monkeypatch):
+    monkeypatch.setattr(SortExecutor, 'BUFFER_ROWS', 4)
+    rows = [(v, i) for i, v in enumerate([5, None, 3, 8, 3, 1, 9, None, 2, 3])]
+    result = list(SortExecutor.sort(rows, 0))
+    assert result == sorted(rows, key=SortExecutor.sort_key(0))
+    result = list(SortExecutor.sort(rows, 0, descending=True))
+    assert result == sorted(rows, key=SortExecutor.sort_key(0), reverse=True)
+    # A LIMIT beyond the buffer still sorts externally
+    assert list(SortExecutor.sort(rows, 0, limit=6))[:6] == sorted(rows, key=SortExecutor.sort_key(0))[:6]
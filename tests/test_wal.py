@@ -0,0 +1,192 @@
+import pytest
+import shutil
+import os
+import json
+import threading
+import time
+from rdbms.pydb import Database
+from rdbms.wal import WriteAheadLog
+
+TEST_DB_DIR = "test_data_wal"
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    db = Database(data_dir=TEST_DB_DIR)
+    yield db
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+
+def table_file_rows(name):
+    with open(os.path.join(TEST_DB_DIR, f"{name}.json")) as f:
+        return json.load(f)['rows']
+
+def test_writes_are_logged_not_rewritten(db):
+    db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(50))")
+    db.execute("INSERT INTO users VALUES (1, 'Alice')")
+
+    # The table file is untouched until a checkpoint; the row lives in the log
+    assert table_file_rows("users") == []
+    assert db.query("SELECT name FROM users WHERE id = 1") == [['Alice']]
+    assert db.storage.wal.stats['records'] == 1
+
+    db.storage.checkpoint()
+    assert table_file_rows("users") == [{'id': 1, 'name': 'Alice'}]
+
+def test_recovery_replays_log(db):
+    db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(50))")
+    db.execute("INSERT INTO users VALUES (1, 'Alice')")
+    db.execute("INSERT INTO users VALUES (2, 'Bob')")
+    db.execute("UPDATE users SET name = 'Bobby' WHERE id = 2")
+    db.execute("DELETE FROM users WHERE id = 1")
+    db.execute("CREATE INDEX ON users(name)")
+
+    # No close(): simulate a crash and reopen
+    reopened = Database(data_dir=TEST_DB_DIR)
+    assert reopened.query("SELECT * FROM users") == [[2, 'Bobby']]
+    assert 'name' in reopened.tm.get_table_data("users")['indexes']
+    assert table_file_rows("users") == [{'id': 2, 'name': 'Bobby'}]
+
+    # Row ids continue where the log left off
+    reopened.execute("INSERT INTO users VALUES (3, 'Carol')")
+    assert Database(data_dir=TEST_DB_DIR).query("SELECT id FROM users") == [[2], [3]]
+
+def test_torn_log_tail_is_ignored(db):
+    db.execute("CREATE TABLE users (id INTEGER, name VARCHAR(50))")
+    db.execute("INSERT INTO users VALUES (1, 'Alice')")
+    with open(db.storage.wal.file.name, 'ab') as f:
+        f.write(b'\x40\x00\x00\x00garbage')
+
+    reopened = Database(data_dir=TEST_DB_DIR)
+    assert reopened.query("SELECT * FROM users") == [[1, 'Alice']]
+
+def test_replays_dict_row_images(db):
+    db.execute("CREATE TABLE users (id INTEGER, name VARCHAR(50))")
+    # Logs written before rows became tuples hold {column: value} row images
+    db.storage.wal.append([['I', 'users', 0, {'name': 'Alice', 'id': 1}]])
+
+    rows = Database(data_dir=TEST_DB_DIR).tm.get_table_data("users")['rows']
+    assert rows == {0: (1, 'Alice')}
+
+def test_multi_table_commit_is_one_record(db):
+    db.execute("CREATE TABLE users (id INTEGER, name VARCHAR(50))")
+    db.execute("CREATE TABLE posts (id INTEGER, user_id INTEGER)")
+    records = db.storage.wal.stats['records']
+
+    db.execute("BEGIN")
+    db.execute("INSERT INTO users VALUES (1, 'Alice')")
+    db.execute("INSERT INTO posts VALUES (10, 1)")
+    db.execute("COMMIT")
+    assert db.storage.wal.stats['records'] == records + 1
+
+    db.execute("BEGIN")
+    db.execute("INSERT INTO users VALUES (2, 'Bob')")
+    db.execute("ROLLBACK")
+    assert db.storage.wal.stats['records'] == records + 1
+
+    reopened = Database(data_dir=TEST_DB_DIR)
+    assert reopened.query("SELECT * FROM users") == [[1, 'Alice']]
+    assert reopened.query("SELECT * FROM posts") == [[10, 1]]
+
+def test_background_checkpoint(db):
+    small = Database(data_dir=TEST_DB_DIR, checkpoint_bytes=512)
+    small.execute("CREATE TABLE users (id INTEGER, name VARCHAR(50))")
+    for i in range(20):
+        small.execute(f"INSERT INTO users VALUES ({i}, 'user {i}')")
+
+    deadline = time.time() + 5
+    while not table_file_rows("users") and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(table_file_rows("users")) > 0
+
+    small.close()
+    assert len(table_file_rows("users")) == 20
+
+def test_group_commit_shares_fsync(monkeypatch):
+    if os.path.exists(TEST_DB_DIR):
+        shutil.rmtree(TEST_DB_DIR)
+    os.makedirs(TEST_DB_DIR)
+    real_fsync = os.fsync
+
+    def slow_fsync(fd):
+        time.sleep(0.02)
+        real_fsync(fd)
+    monkeypatch.setattr(os, "fsync", slow_fsync)
+
+    wal = WriteAheadLog(TEST_DB_DIR)
+    wal.open()
+    threads = [threading.Thread(target=wal.append, args=([['I', 't', i, {'id': i}]],)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wal.close()
+
+    assert wal.stats['records'] == 16
+    assert wal.stats['syncs'] < 16
+    assert sorted(lsn for lsn, _ in WriteAheadLog(TEST_DB_DIR).records()) == list(range(1, 17))
+    shutil.rmtree(TEST_DB_DIR)
+
+@pytest.mark.parametrize("engine", ["json", "page"])
+def test_checkpoint_syncs_files_before_dropping_the_log(monkeypatch, engine):
+    data_dir = f"{TEST_DB_DIR}_{engine}"
+    if os.path.exists(data_dir):
+        shutil.rmtree(data_dir)
+    db = Database(data_dir=data_dir, engine=engine)
+    db.execute("CREATE TABLE users (id INTEGER, name VARCHAR(50))")
+    db.execute("INSERT INTO users VALUES (1, 'Alice')")
+
+    storage = db.storage
+    events = []
+    real_fsync, real_rotate, real_remove = os.fsync, storage.wal.rotate, storage.wal.remove
+    def fsync(fd):
+        events.append('fsync')
+        real_fsync(fd)
+    def rotate():
+        old = real_rotate()
+        events.append('rotate')
+        return old
+    def remove(paths):
+        events.append('remove')
+        real_remove(paths)
+    monkeypatch.setattr(os, "fsync", fsync)
+    monkeypatch.setattr(storage.wal, "rotate", rotate)
+    monkeypatch.setattr(storage.wal, "remove", remove)
+    storage.checkpoint()
+
+    # After the log is rotated (which syncs it), the table file is synced (for
+    # JSON, the temp file and then the directory) before old segments go
+    written = events[events.index('rotate') + 1:events.index('remove')]
+    assert written == (['fsync', 'fsync'] if engine == "json" else ['fsync'])
+    db.close()
+    shutil.rmtree(data_dir)
+
+@pytest.mark.parametrize("engine", ["json", "page"])
+def test_created_table_survives_a_crash(monkeypatch, engine):
+    data_dir = f"{TEST_DB_DIR}_{engine}"
+    if os.path.exists(data_dir):
+        shutil.rmtree(data_dir)
+    db = Database(data_dir=data_dir, engine=engine)
+    synced = []
+    real_fsync = os.fsync
+    def fsync(fd):
+        synced.append(fd)
+        real_fsync(fd)
+    monkeypatch.setattr(os, "fsync", fsync)
+    db.execute("CREATE TABLE users (id INTEGER, name VARCHAR(50))")
+    # The new file, then the directory, before CREATE TABLE returns
+    assert len(synced) == 2
+    db.execute("INSERT INTO users VALUES (1, 'Alice')")
+
+    # Crash without a checkpoint, in the middle of writing a table file
+    db.storage.wal.close()
+    ext = "json" if engine == "json" else "db"
+    with open(os.path.join(data_dir, f"users.{ext}.tmp"), "w") as f:
+        f.write('{"sche')
+
+    reopened = Database(data_dir=data_dir, engine=engine)
+    assert reopened.query("SELECT name FROM users") == [['Alice']]
+    assert not [name for name in os.listdir(data_dir) if name.endswith(".tmp")]
+    reopened.close()
+    shutil.rmtree(data_dir)